@@ -1,17 +1,24 @@
+import hmac
 import logging
+import math
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import wraps
 from typing import Optional, Union, Any, cast
 
-from flask import Blueprint, jsonify, request
-from pydantic import ValidationError
+from flask import Blueprint, Response, jsonify, request
+from pydantic import BaseModel, ValidationError
 
 from config.settings import active_config
-from schemas.dashboard import DashboardMetrics
-from core.application.services.metrics_facade import MetricsFacade
+from core.application.queries.metrics_query import DASHBOARD_METRICS_ADAPTER
+from core.application.services.metrics_facade import BATCH_MAX_QUERIES, DASHBOARD_BUNDLE_SECTIONS, MetricsFacade
+from utils.async_logging import get_async_log_pipeline
 from utils.date_decorators import standard_date_validation
 from utils.performance import cache_with_filters, monitor_performance, performance_monitor
 from utils.prometheus_metrics import monitor_api_endpoint
+from utils.json_provider import RawJSON
+from utils.sampling_profiler import ProfilerBusyError, sampling_profiler
+from utils.tracing import tracer
 from utils.response_formatter import ResponseFormatter
 
 # Usar cache unificado da nova arquitetura (singleton)
@@ -26,6 +33,24 @@ metrics_facade = MetricsFacade()  # Clean Architecture metrics service
 logger = logging.getLogger("api")
 
 
+def require_debug_token(func):
+    """Protect /debug endpoints: X-Debug-Token must match DEBUG_API_TOKEN (open only in DEBUG when unset)."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        config_obj = active_config()
+        expected = getattr(config_obj, "DEBUG_API_TOKEN", "")
+        if expected:
+            provided = request.headers.get("X-Debug-Token", "")
+            if not hmac.compare_digest(provided.encode(), expected.encode()):
+                return jsonify({"success": False, "error": "Token de debug inválido"}), 401
+        elif not getattr(config_obj, "DEBUG", False):
+            return jsonify({"success": False, "error": "Endpoints de debug desabilitados (DEBUG_API_TOKEN não configurado)"}), 403
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
 # Parameter validation helper functions
 def safe_string_param(value: Union[str, Any, None], default: Optional[str] = None) -> Optional[str]:
     """Safely convert parameter to string or return default."""
@@ -49,6 +74,17 @@ def safe_int_param(value: Union[int, str, Any, None], default: Optional[int] = N
         return default
 
 
+def safe_float_param(value: Union[float, str, Any, None], default: Optional[float] = None) -> Optional[float]:
+    """Safely convert parameter to a finite float or return default ("nan"/"inf" are rejected)."""
+    if value is None or value == "":
+        return default
+    try:
+        result = float(value)
+    except (ValueError, TypeError):
+        return default
+    return result if math.isfinite(result) else default
+
+
 def validate_optional_string_for_service(value: Union[str, Any, None]) -> Optional[str]:
     """
     Validate and convert optional parameter for service functions that expect str or None.
@@ -396,25 +432,17 @@ def get_metrics(validated_start_date=None, validated_end_date=None, validated_fi
                 # Already a Pydantic model, validation passed
                 pass
             elif isinstance(metrics_data, dict):
-                if "data" in metrics_data:
-                    DashboardMetrics(**metrics_data["data"])
-                else:
-                    DashboardMetrics(**metrics_data)
+                DASHBOARD_METRICS_ADAPTER.validate_python(metrics_data.get("data", metrics_data))
         except ValidationError as ve:
             logger.warning(f"[{correlation_id}] Dados não seguem o schema esperado: {ve}")
 
-        # Convert Pydantic model to dict for proper serialization
-        if hasattr(metrics_data, "model_dump"):
-            metrics_dict = metrics_data.model_dump()
-        elif hasattr(metrics_data, "dict"):
-            metrics_dict = metrics_data.dict()
-        else:
-            metrics_dict = metrics_data if isinstance(metrics_data, dict) else {}
+        # Codificar o payload uma única vez: respostas do cache reutilizam os bytes
+        metrics_json = RawJSON.encode(metrics_data if isinstance(metrics_data, (BaseModel, dict)) else {})
 
         # Add metadata to response
         response_data = {
             "success": True,
-            "data": metrics_dict,
+            "data": metrics_json,
             "correlation_id": correlation_id,
             "cached": False,
             "timestamp": datetime.now().isoformat(),
@@ -538,10 +566,7 @@ def get_filtered_metrics(validated_start_date=None, validated_end_date=None, val
                 # Already a Pydantic model, validation passed
                 pass
             elif isinstance(metrics_data, dict):
-                if "data" in metrics_data:
-                    DashboardMetrics(**metrics_data["data"])
-                else:
-                    DashboardMetrics(**metrics_data)
+                DASHBOARD_METRICS_ADAPTER.validate_python(metrics_data.get("data", metrics_data))
         except ValidationError as ve:
             logger.warning(f"[{correlation_id}] Dados não seguem o schema esperado: {ve}")
 
@@ -577,6 +602,205 @@ def get_filtered_metrics(validated_start_date=None, validated_end_date=None, val
         return jsonify(error_response), 500
 
 
+# Janela padrão de /metrics/series quando start não é informado
+SERIES_DEFAULT_SPANS = {"day": timedelta(days=29), "week": timedelta(weeks=11), "month": timedelta(days=334)}
+
+
+@api_bp.route("/metrics/series")
+@monitor_api_endpoint("get_metrics_series")
+@monitor_performance
+def get_metrics_series():
+    """Série de métricas por nível e status em janelas dia/semana/mês, a partir de uma única busca"""
+    from utils.date_validator import DateValidator
+    from utils.observability import ObservabilityLogger
+
+    correlation_id = ObservabilityLogger.generate_correlation_id()
+    start_time = time.time()
+
+    granularity = request.args.get("granularity", "day")
+    if granularity not in SERIES_DEFAULT_SPANS:
+        error_response = ResponseFormatter.format_error_response(
+            "Granularidade inválida", ["granularity deve ser day, week ou month"], correlation_id=correlation_id
+        )
+        return jsonify(error_response), 400
+
+    # start/end (aceita também start_date/end_date, como nos demais endpoints)
+    end_date = request.args.get("end") or request.args.get("end_date") or datetime.now().strftime("%Y-%m-%d")
+    start_date = request.args.get("start") or request.args.get("start_date")
+    if not start_date and DateValidator.validate_date_format(end_date):
+        start_date = (datetime.strptime(end_date, "%Y-%m-%d") - SERIES_DEFAULT_SPANS[granularity]).strftime("%Y-%m-%d")
+
+    errors = [
+        f"Formato de {name} inválido. Use YYYY-MM-DD"
+        for name, value in (("start", start_date), ("end", end_date))
+        if not DateValidator.validate_date_format(value)
+    ]
+    if not errors and not DateValidator.validate_date_range(start_date, end_date):
+        errors.append("start deve ser anterior ou igual a end")
+    if errors:
+        error_response = ResponseFormatter.format_error_response(errors[0], errors, correlation_id=correlation_id)
+        return jsonify(error_response), 400
+
+    filter_type = request.args.get("filter_type", "creation")
+    level = safe_filter_string(request.args.get("level"))
+
+    try:
+        series = metrics_facade.get_metrics_series(
+            start_date=start_date,
+            end_date=end_date,
+            granularity=granularity,
+            use_modification_date=filter_type == "modification",
+            level=level,
+            correlation_id=correlation_id,
+        )
+    except ValueError as e:
+        # Intervalo com buckets demais para a granularidade
+        error_response = ResponseFormatter.format_error_response(str(e), [str(e)], correlation_id=correlation_id)
+        return jsonify(error_response), 400
+
+    if series is None:
+        error_response = ResponseFormatter.format_error_response(
+            "Não foi possível conectar ou obter dados do GLPI", ["Erro de conexão"], correlation_id=correlation_id
+        )
+        return jsonify(error_response), 503
+
+    response_time = (time.time() - start_time) * 1000
+    logger.info(
+        f"[{correlation_id}] Série {granularity} com {len(series['buckets'])} buckets obtida em {response_time:.2f}ms"
+    )
+
+    return jsonify(
+        {
+            "success": True,
+            "data": series,
+            "correlation_id": correlation_id,
+            "cached": False,
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
+
+
+@api_bp.route("/dashboard/bundle")
+@monitor_api_endpoint("get_dashboard_bundle")
+@monitor_performance
+@standard_date_validation(support_predefined=True, log_usage=True)
+def get_dashboard_bundle(validated_start_date=None, validated_end_date=None, validated_filters=None):
+    """Endpoint composto: métricas, ranking, tickets novos e status em uma única requisição"""
+    from utils.observability import ObservabilityLogger
+
+    correlation_id = ObservabilityLogger.generate_correlation_id()
+    start_time = time.time()
+    filters = validated_filters or {}
+
+    requested = request.args.get("sections")
+    sections = [s.strip() for s in requested.split(",") if s.strip()] if requested else list(DASHBOARD_BUNDLE_SECTIONS)
+    sections = list(dict.fromkeys(sections))
+    invalid_sections = [section for section in sections if section not in DASHBOARD_BUNDLE_SECTIONS]
+    if invalid_sections or not sections:
+        error_response = ResponseFormatter.format_error_response(
+            "Seções inválidas",
+            [f"Seções disponíveis: {', '.join(DASHBOARD_BUNDLE_SECTIONS)}"] + [f"Seção desconhecida: {s}" for s in invalid_sections],
+            correlation_id=correlation_id,
+        )
+        return jsonify(error_response), 400
+
+    ranking_limit = max(1, min(safe_int_param(request.args.get("ranking_limit"), 100) or 100, 200))
+    tickets_limit = max(1, min(safe_int_param(request.args.get("tickets_limit"), 5) or 5, 50))
+
+    try:
+        bundle = metrics_facade.get_dashboard_bundle(
+            sections=sections,
+            start_date=safe_date_string(validated_start_date),
+            end_date=safe_date_string(validated_end_date),
+            status=safe_filter_string(filters.get("status")),
+            priority=safe_filter_string(filters.get("priority")),
+            category=safe_filter_string(filters.get("category")),
+            technician=safe_filter_string(filters.get("technician")),
+            level=safe_filter_string(filters.get("level")),
+            entity_id=safe_entity_id(filters.get("entity_id")),
+            modification_date=filters.get("filter_type") == "modification",
+            ranking_limit=ranking_limit,
+            tickets_limit=tickets_limit,
+            correlation_id=correlation_id,
+        )
+    except ValueError as e:
+        # Filtros que não formam um MetricsFilterDTO válido (ex.: intervalo invertido)
+        error_response = ResponseFormatter.format_error_response(str(e), [str(e)], correlation_id=correlation_id)
+        return jsonify(error_response), 400
+
+    section_results = bundle["sections"]
+    if not any(result["success"] for result in section_results.values()):
+        error_response = ResponseFormatter.format_error_response(
+            "Não foi possível conectar ou obter dados do GLPI",
+            [f"{section}: {result['error']}" for section, result in section_results.items()],
+            correlation_id=correlation_id,
+        )
+        return jsonify(error_response), 503
+
+    response_time = (time.time() - start_time) * 1000
+    logger.info(
+        f"[{correlation_id}] Bundle {','.join(sections)} em {response_time:.2f}ms "
+        f"({bundle['fetch_plan']['upstream_calls']} chamadas upstream, {bundle['fetch_plan']['shared_calls']} compartilhadas)"
+    )
+
+    return jsonify(
+        {
+            "success": all(result["success"] for result in section_results.values()),
+            "data": section_results,
+            "fetch_plan": bundle["fetch_plan"],
+            "response_time_ms": round(response_time, 2),
+            "correlation_id": correlation_id,
+            "cached": all(result["cached"] for result in section_results.values()),
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
+
+
+@api_bp.route("/batch", methods=["POST"])
+@monitor_api_endpoint("execute_batch")
+@monitor_performance
+def execute_batch():
+    """Executa várias queries heterogêneas ({id, type, filters}) em paralelo, com deduplicação"""
+    from utils.observability import ObservabilityLogger
+
+    correlation_id = ObservabilityLogger.generate_correlation_id()
+    start_time = time.time()
+
+    payload = request.get_json(silent=True)
+    queries = payload.get("queries") if isinstance(payload, dict) else payload
+    if not isinstance(queries, list) or not queries:
+        error_response = ResponseFormatter.format_error_response(
+            "Corpo inválido", ['Envie {"queries": [{"id", "type", "filters"}, ...]}'], correlation_id=correlation_id
+        )
+        return jsonify(error_response), 400
+
+    if len(queries) > BATCH_MAX_QUERIES:
+        error_response = ResponseFormatter.format_error_response(
+            "Batch muito grande", [f"Máximo de {BATCH_MAX_QUERIES} queries por batch"], correlation_id=correlation_id
+        )
+        return jsonify(error_response), 400
+
+    batch = metrics_facade.execute_batch(queries, correlation_id=correlation_id)
+
+    response_time = (time.time() - start_time) * 1000
+    fetch_plan = batch["fetch_plan"]
+    logger.info(
+        f"[{correlation_id}] Batch com {fetch_plan['queries']} queries ({fetch_plan['unique_queries']} únicas, "
+        f"{fetch_plan['upstream_calls']} chamadas upstream) em {response_time:.2f}ms"
+    )
+
+    return jsonify(
+        {
+            "success": all(item["status"] == "ok" for item in batch["results"]),
+            "data": batch["results"],
+            "fetch_plan": fetch_plan,
+            "response_time_ms": round(response_time, 2),
+            "correlation_id": correlation_id,
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
+
+
 @api_bp.route("/test")
 def test_endpoint():
     """Endpoint de teste simples"""
@@ -895,21 +1119,14 @@ def get_technician_ranking(validated_start_date=None, validated_end_date=None, v
             )
             logger.warning(f"[{correlation_id}] Resposta lenta: {response_time:.2f}ms")
 
-        # Converter objetos Pydantic para dicionários se necessário
-        serializable_data = []
-        for item in ranking_data:
-            if hasattr(item, "model_dump"):  # Pydantic model
-                serializable_data.append(item.model_dump())
-            elif isinstance(item, dict):
-                serializable_data.append(item)
-            else:
-                # Fallback para outros tipos
-                serializable_data.append(dict(item) if hasattr(item, "__dict__") else item)
+        # Codificar o ranking uma única vez (modelos Pydantic via model_dump_json);
+        # respostas do cache reutilizam os bytes
+        ranking_json = RawJSON.encode(list(ranking_data))
 
         # Preparar dados de resposta
         response_data = {
             "success": True,
-            "data": serializable_data,
+            "data": ranking_json,
             "response_time_ms": round(response_time, 2),
             "correlation_id": correlation_id,
             "cached": False,
@@ -1017,19 +1234,8 @@ def get_new_tickets(validated_start_date=None, validated_end_date=None, validate
         if response_time > target_p95:
             logger.warning(f"Resposta lenta: {response_time:.2f}ms")
 
-        # Converter objetos NewTicket para dicionários para serialização JSON
-        tickets_data = []
-        if new_tickets:
-            for ticket in new_tickets:
-                if hasattr(ticket, 'model_dump'):
-                    # Pydantic v2
-                    tickets_data.append(ticket.model_dump())
-                elif hasattr(ticket, 'dict'):
-                    # Pydantic v1
-                    tickets_data.append(ticket.dict())
-                else:
-                    # Fallback para dicionário simples
-                    tickets_data.append(dict(ticket))
+        # Modelos NewTicket são serializados direto para bytes pelo JSON provider
+        tickets_data = [ticket if isinstance(ticket, (BaseModel, dict)) else dict(ticket) for ticket in new_tickets]
 
         return jsonify(
             {
@@ -1115,21 +1321,34 @@ def get_alerts():
         # Verificar performance do sistema
         try:
             stats = performance_monitor.get_stats()
-            avg_response_time = stats.get("avg_response_time", 0)
+            p95_response_time = stats.get("p95_response_time", 0)
 
             try:
                 config_obj = active_config()
                 target_p95 = config_obj.PERFORMANCE_TARGET_P95
             except:
                 target_p95 = 300
-            if avg_response_time > target_p95:
+            if p95_response_time > target_p95:
+                # Endpoints acima do alvo na janela atual, do mais lento para o mais rápido
+                slow_endpoints = sorted(
+                    (
+                        (endpoint, endpoint_stats["p95_response_time"])
+                        for endpoint, endpoint_stats in stats.get("endpoints", {}).items()
+                        if endpoint_stats["p95_response_time"] > target_p95
+                    ),
+                    key=lambda item: item[1],
+                    reverse=True,
+                )
                 alerts_data.append(
                     {
                         "id": "performance_warning",
                         "type": "warning",
                         "severity": "medium",
                         "title": "Performance",
-                        "message": f"Tempo de resposta médio elevado: {avg_response_time:.2f}ms",
+                        "message": f"P95 do tempo de resposta elevado: {p95_response_time:.2f}ms (alvo: {target_p95}ms)",
+                        "slow_endpoints": [
+                            {"endpoint": endpoint, "p95_response_time": p95} for endpoint, p95 in slow_endpoints[:5]
+                        ],
                         "timestamp": current_time,
                         "acknowledged": False,
                     }
@@ -1169,12 +1388,16 @@ def get_performance_stats():
             "cache_status": "active" if unified_cache else "disabled",
         }
 
+        # Fila de logs assíncrona: descartes por nível e profundidade (None com logs síncronos)
+        log_pipeline = get_async_log_pipeline()
+
         return jsonify(
             {
                 "success": True,
                 "data": {
                     **stats,
                     **cache_info,
+                    "log_pipeline": log_pipeline.get_stats() if log_pipeline else None,
                     "target_p95_ms": getattr(active_config(), "PERFORMANCE_TARGET_P95", 300),
                 },
             }
@@ -1188,6 +1411,81 @@ def get_performance_stats():
         )
 
 
+@api_bp.route("/debug/trace")
+@require_debug_token
+def list_traces():
+    """Lista os correlation IDs dos traces guardados neste worker (mais recentes primeiro)"""
+    limit = safe_int_param(request.args.get("limit"), 50) or 50
+    return jsonify({"success": True, "data": {"enabled": tracer.enabled, "traces": tracer.recent_trace_ids(limit)}})
+
+
+@api_bp.route("/debug/trace/<correlation_id>")
+@require_debug_token
+def get_trace(correlation_id: str):
+    """
+    Árvore de spans de uma requisição (buffer circular do worker que a atendeu).
+
+    ``?format=otlp`` devolve o mesmo trace no formato JSON do OTLP.
+    """
+    trace = tracer.get_trace(correlation_id)
+    if trace is None:
+        return (
+            jsonify({"success": False, "error": f"Trace não encontrado: {correlation_id}"}),
+            404,
+        )
+
+    if request.args.get("format") == "otlp":
+        return jsonify(tracer.to_otlp([trace]))
+    return jsonify({"success": True, "data": trace.to_dict()})
+
+
+def _profile_response(session, top_n: int, output_format: Optional[str]):
+    if output_format == "collapsed":
+        return Response("\n".join(session.collapsed()) + "\n", mimetype="text/plain")
+    return jsonify({"success": True, "data": session.to_dict(top_n)})
+
+
+@api_bp.route("/debug/profile")
+@require_debug_token
+def run_profile():
+    """
+    Profiler estatístico dos threads deste worker por ``seconds`` segundos.
+
+    Parâmetros: ``seconds`` (limitado a PROFILE_MAX_SECONDS), ``interval_ms``,
+    ``top`` (top-N funções), ``idle=1`` (inclui threads em espera),
+    ``format=collapsed`` (texto para flamegraph.pl/speedscope) e
+    ``background=1``: responde 202 na hora e deixa o worker livre para atender
+    as requisições que se quer observar; o resultado fica em
+    ``/api/debug/profile/last`` (do mesmo worker).
+    """
+    seconds = safe_float_param(request.args.get("seconds"), 5.0) or 5.0
+    interval_ms = safe_float_param(request.args.get("interval_ms"), None)
+    top_n = min(safe_int_param(request.args.get("top"), 20) or 20, 200)
+    include_idle = request.args.get("idle") in ("1", "true")
+    background = request.args.get("background") in ("1", "true")
+
+    try:
+        if background:
+            session = sampling_profiler.start(seconds, interval_ms / 1000 if interval_ms else None, include_idle)
+            return jsonify({"success": True, "data": session.to_dict(top_n, include_collapsed=False)}), 202
+        session = sampling_profiler.profile(seconds, interval_ms / 1000 if interval_ms else None, include_idle)
+    except ProfilerBusyError as e:
+        return jsonify({"success": False, "error": str(e)}), 409
+
+    return _profile_response(session, top_n, request.args.get("format"))
+
+
+@api_bp.route("/debug/profile/last")
+@require_debug_token
+def get_last_profile():
+    """Resultado (ou progresso) da última sessão de profiling deste worker"""
+    session = sampling_profiler.last_session
+    if session is None:
+        return jsonify({"success": False, "error": "Nenhum profiling executado neste worker"}), 404
+    top_n = min(safe_int_param(request.args.get("top"), 20) or 20, 200)
+    return _profile_response(session, top_n, request.args.get("format"))
+
+
 # All status caching now handled by unified_cache from new architecture
 
 
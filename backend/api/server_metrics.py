@@ -8,45 +8,45 @@ import time
 import os
 from datetime import datetime
 from typing import Dict, Any
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+
+from api.routes import require_debug_token
+from utils.resource_sampler import resource_sampler
 
 metrics_bp = Blueprint("metrics", __name__, url_prefix="/api/metrics")
 
-# Global metrics collection
+# Global metrics collection (process resources are sampled in the background, see utils.resource_sampler)
 _server_metrics = {
     "start_time": time.time(),
     "request_count": 0,
     "total_response_time": 0.0,
-    "peak_memory_mb": 0.0,
-    "peak_cpu_percent": 0.0,
 }
 
 
 def update_server_metrics(response_time: float):
-    """Update server-side metrics."""
-    global _server_metrics
+    """Update server-side metrics.
 
+    Only counters here: memory/CPU peaks come from the background resource sampler.
+    """
     _server_metrics["request_count"] += 1
     _server_metrics["total_response_time"] += response_time
-
-    # Update peak metrics
-    try:
-        process = psutil.Process()
-        memory_mb = process.memory_info().rss / 1024 / 1024
-        cpu_percent = process.cpu_percent()
-
-        _server_metrics["peak_memory_mb"] = max(_server_metrics["peak_memory_mb"], memory_mb)
-        _server_metrics["peak_cpu_percent"] = max(_server_metrics["peak_cpu_percent"], cpu_percent)
-    except:
-        pass
+    resource_sampler.ensure_started()
 
 
 @metrics_bp.route("/server/stats")
 def get_server_stats():
-    """Get comprehensive server-side performance statistics."""
+    """Get comprehensive server-side performance statistics.
+
+    Process figures are served from the resource sampler history. Query params:
+    ``window`` (seconds) limits the rollups/series, ``series=1`` adds the time series
+    and ``fields`` (comma separated) restricts the series columns.
+    """
     try:
-        process = psutil.Process(os.getpid())
-        memory_info = process.memory_info()
+        resource_sampler.ensure_started()
+        sample = resource_sampler.latest() or resource_sampler.sample_now()
+        window = request.args.get("window", type=float)
+        rollups = resource_sampler.rollups(window)
+        peaks = resource_sampler.peaks
 
         # Calculate uptime
         uptime_seconds = time.time() - _server_metrics["start_time"]
@@ -58,6 +58,7 @@ def get_server_stats():
             else 0
         )
 
+        virtual_memory = psutil.virtual_memory()
         stats = {
             "server_info": {
                 "pid": os.getpid(),
@@ -65,15 +66,23 @@ def get_server_stats():
                 "uptime_formatted": f"{uptime_seconds/3600:.1f}h",
             },
             "memory": {
-                "current_rss_mb": memory_info.rss / 1024 / 1024,
-                "current_vms_mb": memory_info.vms / 1024 / 1024,
-                "peak_memory_mb": _server_metrics["peak_memory_mb"],
-                "memory_percent": process.memory_percent(),
+                "current_rss_mb": sample.get("rss_mb"),
+                "current_vms_mb": sample.get("vms_mb"),
+                "peak_memory_mb": peaks.get("rss_mb", 0.0),
+                "memory_percent": sample.get("memory_percent"),
             },
             "cpu": {
-                "current_percent": process.cpu_percent(),
-                "peak_cpu_percent": _server_metrics["peak_cpu_percent"],
-                "num_threads": process.num_threads(),
+                "current_percent": sample.get("cpu_percent"),
+                "peak_cpu_percent": peaks.get("cpu_percent", 0.0),
+                "num_threads": sample.get("num_threads"),
+            },
+            "resources": {
+                "open_fds": sample.get("open_fds"),
+                "gc_objects": [sample.get("gc_objects_gen0"), sample.get("gc_objects_gen1"), sample.get("gc_objects_gen2")],
+                "sample_interval_seconds": resource_sampler.interval,
+                "sample_count": len(resource_sampler.samples),
+                "sampled_at": datetime.fromtimestamp(sample["timestamp"]).isoformat(),
+                "rollups": rollups,
             },
             "requests": {
                 "total_count": _server_metrics["request_count"],
@@ -83,13 +92,21 @@ def get_server_stats():
             },
             "system": {
                 "cpu_count": psutil.cpu_count(),
-                "available_memory_mb": psutil.virtual_memory().available / 1024 / 1024,
-                "total_memory_mb": psutil.virtual_memory().total / 1024 / 1024,
-                "memory_usage_percent": psutil.virtual_memory().percent,
+                "available_memory_mb": virtual_memory.available / 1024 / 1024,
+                "total_memory_mb": virtual_memory.total / 1024 / 1024,
+                "memory_usage_percent": virtual_memory.percent,
             },
             "timestamp": datetime.now().isoformat(),
         }
 
+        if request.args.get("series", "").lower() in ("1", "true", "yes"):
+            fields = [field for field in request.args.get("fields", "").split(",") if field]
+            stats["history"] = {
+                "interval_seconds": resource_sampler.interval,
+                "window_seconds": window,
+                "samples": resource_sampler.series(window, fields),
+            }
+
         return jsonify(stats)
 
     except Exception as e:
@@ -107,18 +124,18 @@ def get_server_stats():
         )
 
 
-@metrics_bp.route("/server/reset")
+@metrics_bp.route("/server/reset", methods=["POST"])
+@require_debug_token
 def reset_server_metrics():
-    """Reset server metrics counters."""
+    """Reset server metrics counters (state-changing: POST with X-Debug-Token)."""
     global _server_metrics
 
     _server_metrics = {
         "start_time": time.time(),
         "request_count": 0,
         "total_response_time": 0.0,
-        "peak_memory_mb": 0.0,
-        "peak_cpu_percent": 0.0,
     }
+    resource_sampler.reset()
 
     return jsonify({"message": "Server metrics reset successfully", "reset_time": datetime.now().isoformat()})
 
@@ -3,9 +3,14 @@ from flask import Flask
 from flask_cors import CORS
 
 from api.routes import api_bp
+from api.server_metrics import metrics_bp, track_request_metrics
 from config.settings import active_config
 from config.logging_config import configure_structured_logging
+from utils.async_logging import setup_async_logging
+from utils.json_provider import setup_json_provider
 from utils.observability_middleware import setup_observability
+from utils.sampling_profiler import configure_profiler
+from utils.tracing import configure_tracing
 
 # from utils.structured_logger import StructuredLogger
 
@@ -28,14 +33,47 @@ app = Flask(__name__)
 # Configurações do aplicativo
 app.config.from_object(active_config())
 
+# Serialização JSON rápida (orjson + Pydantic direto para bytes)
+setup_json_provider(app)
+
 # Configura CORS
 CORS(app, resources={r"/api/*": {"origins": active_config().CORS_ORIGINS}})
 
 # Configura o middleware de observabilidade
-setup_observability(app)
+setup_observability(
+    app,
+    {
+        "deep_sample_rate": active_config().OBSERVABILITY_DEEP_SAMPLE_RATE,
+        "slow_request_threshold": active_config().OBSERVABILITY_SLOW_REQUEST_SECONDS,
+        "cost_header": active_config().OBSERVABILITY_COST_HEADER,
+    },
+)
+
+# Tracer por requisição (antes do pipeline assíncrono: a exportação OTLP também sai da thread da requisição)
+configure_tracing(
+    enabled=active_config().TRACING_ENABLED,
+    max_traces=active_config().TRACE_BUFFER_SIZE,
+    max_spans_per_trace=active_config().TRACE_MAX_SPANS,
+    export_path=active_config().TRACE_EXPORT_PATH or None,
+)
+
+# Limites do profiler sob demanda (/api/debug/profile)
+configure_profiler(
+    max_seconds=active_config().PROFILE_MAX_SECONDS,
+    default_interval=active_config().PROFILE_INTERVAL_MS / 1000,
+    max_overhead=active_config().PROFILE_MAX_OVERHEAD,
+)
+
+# Move formatação/escrita dos logs para a thread de fundo (após todos os handlers configurados)
+if active_config().LOG_ASYNC_ENABLED:
+    setup_async_logging(active_config().LOG_QUEUE_SIZE, active_config().LOG_BATCH_SIZE)
+
+# Contadores por requisição de /api/metrics/server/stats (também inicia o amostrador de recursos no worker)
+track_request_metrics(app)
 
 # Registra blueprints
 app.register_blueprint(api_bp)
+app.register_blueprint(metrics_bp)
 # app.register_blueprint(dashboard_bp, url_prefix='/dashboard') # Removendo esta linha
 
 if __name__ == "__main__":
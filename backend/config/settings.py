@@ -68,6 +68,18 @@ class Config:
     GLPI_USER_TOKEN = os.environ.get("GLPI_USER_TOKEN")
     GLPI_APP_TOKEN = os.environ.get("GLPI_APP_TOKEN")
 
+    # Token de sessão GLPI compartilhado entre workers: auto (/dev/shm), file, redis ou memory
+    GLPI_SESSION_STORE = os.environ.get("GLPI_SESSION_STORE", "auto")
+    GLPI_SESSION_STORE_DIR = os.environ.get("GLPI_SESSION_STORE_DIR", "/dev/shm")
+
+    # Pool HTTP e fan-out em lote do cliente GLPI legado
+    GLPI_HTTP_POOL_MAXSIZE = int(os.environ.get("GLPI_HTTP_POOL_MAXSIZE", "16"))
+    GLPI_BULK_CHUNK_SIZE = int(os.environ.get("GLPI_BULK_CHUNK_SIZE", "50"))
+    GLPI_BULK_MAX_WORKERS = int(os.environ.get("GLPI_BULK_MAX_WORKERS", "4"))
+
+    # Decodificação incremental (item a item) das respostas grandes de tickets do GLPI
+    GLPI_STREAM_RESPONSES = os.environ.get("GLPI_STREAM_RESPONSES", "True").lower() == "true"
+
     # Mock Data Mode - Para desenvolvimento e testes da interface
     USE_MOCK_DATA = os.environ.get("USE_MOCK_DATA", "False").lower() == "true"
 
@@ -80,6 +92,13 @@ class Config:
     PROMETHEUS_JOB_NAME = os.environ.get("PROMETHEUS_JOB_NAME", "glpi_dashboard")
     STRUCTURED_LOGGING = os.environ.get("STRUCTURED_LOGGING", "True").lower() == "true"
 
+    # Middleware: captura detalhada (headers, params, corpo redigidos) só para uma amostra,
+    # requisições lentas e erros; as demais registram apenas contadores e tempos
+    OBSERVABILITY_DEEP_SAMPLE_RATE = float(os.environ.get("OBSERVABILITY_DEEP_SAMPLE_RATE", "0.01"))
+    OBSERVABILITY_SLOW_REQUEST_SECONDS = float(os.environ.get("OBSERVABILITY_SLOW_REQUEST_SECONDS", "1.0"))
+    # Header X-Request-Cost (chamadas GLPI, bytes, linhas, cache por camada, serialização); histogramas sempre ativos
+    OBSERVABILITY_COST_HEADER = os.environ.get("OBSERVABILITY_COST_HEADER", "True").lower() == "true"
+
     @property
     def LOG_FILE_PATH(self) -> str:
         """Log file path with directory validation"""
@@ -95,6 +114,11 @@ class Config:
 
         return log_path
 
+    # Logs assíncronos: formatação e escrita em thread de fundo, fila limitada (descarta no overload)
+    LOG_ASYNC_ENABLED = os.environ.get("LOG_ASYNC_ENABLED", "True").lower() == "true"
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+    LOG_BATCH_SIZE = int(os.environ.get("LOG_BATCH_SIZE", "256"))
+
     LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", "10485760"))  # 10MB
     LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", "5"))
 
@@ -171,6 +195,24 @@ class Config:
         except ValueError as e:
             raise ConfigValidationError(f"Erro na configuração PERFORMANCE_TARGET_P95: {e}")
 
+    # Janela deslizante dos quantis de tempo de resposta (PerformanceMonitor)
+    PERFORMANCE_WINDOW_SECONDS = int(os.environ.get("PERFORMANCE_WINDOW_SECONDS", "300"))
+    # Diretório compartilhado entre workers do gunicorn (ex.: /dev/shm/glpi_performance); vazio = só o processo local
+    PERFORMANCE_SHARED_DIR = os.environ.get("PERFORMANCE_SHARED_DIR", "")
+
+    # Tracer por requisição (Server-Timing e /api/debug/trace); exportação OTLP JSON desativada se vazio
+    TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "True").lower() == "true"
+    TRACE_BUFFER_SIZE = int(os.environ.get("TRACE_BUFFER_SIZE", "256"))
+    TRACE_MAX_SPANS = int(os.environ.get("TRACE_MAX_SPANS", "512"))
+    TRACE_EXPORT_PATH = os.environ.get("TRACE_EXPORT_PATH", "")
+
+    # Endpoints /api/debug/*: exigem header X-Debug-Token; sem token configurado, só com DEBUG ativo
+    DEBUG_API_TOKEN = os.environ.get("DEBUG_API_TOKEN", "")
+    # Profiler sob demanda: duração máxima, intervalo padrão e teto de overhead (fração do tempo de parede)
+    PROFILE_MAX_SECONDS = float(os.environ.get("PROFILE_MAX_SECONDS", "30"))
+    PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "10"))
+    PROFILE_MAX_OVERHEAD = float(os.environ.get("PROFILE_MAX_OVERHEAD", "0.02"))
+
     # Configurações de segurança
     @property
     def MAX_CONTENT_LENGTH(self) -> int:
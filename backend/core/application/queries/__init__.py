@@ -18,6 +18,7 @@ from .metrics_query import (  # Classes base; Queries específicas; Factory; Moc
     QueryExecutionError,
     TechnicianRankingQuery,
 )
+from .shared_fetch import SharedFetchDataSource
 
 __all__ = [
     # Classes base
@@ -32,6 +33,8 @@ __all__ = [
     "DashboardMetricsQuery",
     # Factory
     "MetricsQueryFactory",
+    # Compartilhamento de chamadas entre queries
+    "SharedFetchDataSource",
     # Mock para testes
     "MockMetricsDataSource",
 ]
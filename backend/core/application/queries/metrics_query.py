@@ -8,15 +8,19 @@ de métricas, fornecendo uma interface limpa e testável para obtenção de dado
 
 import logging
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from decimal import Decimal
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+from pydantic import TypeAdapter
+
+from utils.request_cost import RequestCost, current_request_cost
+from utils.tracing import tracer
+
 from ..dto.metrics_dto import (
     MetricsFilterDTO,
-    create_empty_dashboard_metrics,
     create_error_response,
     create_success_response,
 )
@@ -26,7 +30,7 @@ from schemas.dashboard import (
     DashboardMetrics,
     TechnicianRanking,
     NewTicket,
-    LevelMetrics,
+    NiveisMetrics,
     ApiResponse,
     ApiError,
     TicketStatus,
@@ -35,6 +39,18 @@ from schemas.dashboard import (
 
 logger = logging.getLogger(__name__)
 
+# Níveis aceitos no ranking (calculado uma vez, não por linha)
+VALID_TECHNICIAN_LEVELS = frozenset(level.value for level in TechnicianLevel)
+
+# Validação do ranking inteiro em uma única chamada ao pydantic-core
+TECHNICIAN_RANKING_LIST_ADAPTER = TypeAdapter(List[TechnicianRanking])
+
+# Os quatro níveis validados em uma única chamada
+NIVEIS_METRICS_ADAPTER = TypeAdapter(NiveisMetrics)
+
+# Validador do DashboardMetrics compilado uma vez (queries e payloads dict das rotas)
+DASHBOARD_METRICS_ADAPTER = TypeAdapter(DashboardMetrics)
+
 
 class QueryExecutionError(Exception):
     """Exceção para erros de execução de query."""
@@ -58,11 +74,18 @@ class QueryContext:
     timeout_seconds: int = 30
     cache_enabled: bool = True
     cache_ttl_seconds: int = 300
+    # Acumulador de custo da requisição que originou a query (None fora de requisições)
+    cost: Optional[RequestCost] = field(default_factory=current_request_cost)
 
     def __post_init__(self):
         if self.start_time is None:
             self.start_time = datetime.now()
 
+    def record_cache(self, layer: str, hit: bool) -> None:
+        """Contabiliza um hit/miss de cache no custo da requisição."""
+        if self.cost is not None:
+            self.cost.record_cache(layer, hit)
+
 
 class MetricsDataSource(ABC):
     """Interface abstrata para fonte de dados de métricas."""
@@ -248,56 +271,43 @@ class GeneralMetricsQuery(BaseMetricsQuery):
     ) -> DashboardMetrics:
         """Processa dados brutos em DTO de métricas."""
 
-        # Inicializar DTO vazio
-        metrics = create_empty_dashboard_metrics()
-
-        # Processar dados por nível
+        # Contagens vindas do adapter: níveis ausentes ficam zerados
         level_data = ticket_data.get("levels", {})
-
-        total_tickets = 0
-        total_technicians = len(technician_hierarchy)
+        niveis = {key: {} for key in ("n1", "n2", "n3", "n4")}
 
         for level_name, level_info in level_data.items():
             if level_name not in ["N1", "N2", "N3", "N4"]:
                 continue
 
-            # Contar técnicos por nível
-            technicians_in_level = sum(1 for tech_level in technician_hierarchy.values() if tech_level == level_name)
-
-            # Criar métricas de tickets para o nível
-            level_metrics = LevelMetrics(
-                total=level_info.get("total", 0),
-                novos=level_info.get("new", 0),
-                pendentes=level_info.get("pending", 0),
-                progresso=level_info.get("in_progress", 0),
-                resolvidos=level_info.get("resolved", 0),
-            )
-
-            # Atribuir às métricas por nível
-            if level_name == "N1":
-                metrics.niveis.n1 = level_metrics
-            elif level_name == "N2":
-                metrics.niveis.n2 = level_metrics
-            elif level_name == "N3":
-                metrics.niveis.n3 = level_metrics
-            elif level_name == "N4":
-                metrics.niveis.n4 = level_metrics
-
-            total_tickets += level_metrics.total
-
-        # Atualizar totais gerais
-        metrics.total = total_tickets
-        metrics.novos = sum(level.novos for level in metrics.niveis.values())
-        metrics.pendentes = sum(level.pendentes for level in metrics.niveis.values())
-        metrics.progresso = sum(level.progresso for level in metrics.niveis.values())
-        metrics.resolvidos = sum(level.resolvidos for level in metrics.niveis.values())
+            niveis[level_name.lower()] = {
+                "total": level_info.get("total", 0),
+                "novos": level_info.get("new", 0),
+                "pendentes": level_info.get("pending", 0),
+                "progresso": level_info.get("in_progress", 0),
+                "resolvidos": level_info.get("resolved", 0),
+            }
 
-        # Definir período se filtros foram aplicados
-        if filters:
-            metrics.period_start = filters.start_date
-            metrics.period_end = filters.end_date
+        # Fronteira de validação: os quatro níveis em uma única chamada ao pydantic-core
+        with tracer.span("pydantic.validate", model="NiveisMetrics", rows=len(niveis)):
+            niveis_metrics = NIVEIS_METRICS_ADAPTER.validate_python(niveis)
+        levels = niveis_metrics.values()
 
-        return metrics
+        # Totais derivados dos níveis validados; a instância de NiveisMetrics não é revalidada
+        # (model_construct, em Python, sai mais caro que o validador compilado)
+        return DASHBOARD_METRICS_ADAPTER.validate_python(
+            {
+                "novos": sum(level.novos for level in levels),
+                "pendentes": sum(level.pendentes for level in levels),
+                "progresso": sum(level.progresso for level in levels),
+                "resolvidos": sum(level.resolvidos for level in levels),
+                "total": sum(level.total for level in levels),
+                "niveis": niveis_metrics,
+                "tendencias": {},
+                # Período definido se filtros foram aplicados
+                "period_start": filters.start_date if filters else None,
+                "period_end": filters.end_date if filters else None,
+            }
+        )
 
 
 class TechnicianRankingQuery(BaseMetricsQuery):
@@ -352,9 +362,9 @@ class TechnicianRankingQuery(BaseMetricsQuery):
     ) -> List[TechnicianRanking]:
         """Processa dados de técnicos em ranking."""
 
-        ranking = []
+        rows = []
 
-        for idx, tech_data in enumerate(technician_data, 1):
+        for tech_data in technician_data:
             tech_id = tech_data.get("id")
             # Ensure tech_id is int or use default
             tech_id_int = tech_id if isinstance(tech_id, int) else 0
@@ -367,25 +377,26 @@ class TechnicianRankingQuery(BaseMetricsQuery):
             if total_tickets > 0:
                 efficiency_score = (resolvidos / total_tickets) * 100
 
-            # Criar DTO do técnico usando TechnicianRanking
-            technician_dto = TechnicianRanking(
-                id=tech_id or 0,
-                name=tech_data.get("name", "Desconhecido"),
-                ticket_count=total_tickets,
-                level=tech_level if tech_level in [l.value for l in TechnicianLevel] else TechnicianLevel.UNKNOWN.value,
-                performance_score=efficiency_score,
+            rows.append(
+                {
+                    "id": tech_id or 0,
+                    "name": tech_data.get("name", "Desconhecido"),
+                    "ticket_count": total_tickets,
+                    "level": tech_level if tech_level in VALID_TECHNICIAN_LEVELS else TechnicianLevel.UNKNOWN.value,
+                    "performance_score": efficiency_score,
+                }
             )
 
-            ranking.append(technician_dto)
-
         # Ordenar por total de tickets (descendente)
-        ranking.sort(key=lambda x: x.ticket_count, reverse=True)
+        rows.sort(key=lambda row: row["ticket_count"], reverse=True)
 
-        # Aplicar limite se especificado
+        # Aplicar limite se especificado (antes da validação: só as linhas retornadas viram DTO)
         if filters and filters.limit:
-            ranking = ranking[: filters.limit]
+            rows = rows[: filters.limit]
 
-        return ranking
+        # Criar DTOs TechnicianRanking validando a lista inteira de uma vez
+        with tracer.span("pydantic.validate", model="TechnicianRanking", rows=len(rows)):
+            return TECHNICIAN_RANKING_LIST_ADAPTER.validate_python(rows)
 
 
 class NewTicketsQuery(BaseMetricsQuery):
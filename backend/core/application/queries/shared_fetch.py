@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Shared Fetch - Compartilhamento de chamadas à fonte de dados entre queries.
+
+Quando várias queries rodam no mesmo plano (bundle do dashboard, batch),
+chamadas idênticas à fonte de dados (mesmo método, mesmos filtros) são
+executadas uma única vez e o resultado é entregue a todas as queries.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..dto.metrics_dto import MetricsFilterDTO
+from utils.request_cost import CACHE_LAYER_SHARED_FETCH, record_cache
+
+from .metrics_query import MetricsDataSource, QueryContext
+
+
+class SharedFetchDataSource(MetricsDataSource):
+    """Wrapper de MetricsDataSource que deduplica chamadas idênticas em andamento ou concluídas."""
+
+    def __init__(self, data_source: MetricsDataSource):
+        self.data_source = data_source
+        self._calls: Dict[Tuple[Any, ...], asyncio.Future] = {}
+        self.stats = {"upstream_calls": 0, "shared_calls": 0}
+
+    @staticmethod
+    def _filters_key(filters: Optional[MetricsFilterDTO]) -> Optional[str]:
+        return filters.model_dump_json() if filters is not None else None
+
+    async def _shared(self, method: str, filters: Optional[MetricsFilterDTO] = None, **kwargs: Any) -> Any:
+        """Executa ``method`` uma vez por chave; chamadas repetidas aguardam o mesmo resultado."""
+        context = kwargs.pop("context", None)
+        key = (method, self._filters_key(filters), tuple(sorted(kwargs.items())))
+
+        call = self._calls.get(key)
+        if context is not None:
+            context.record_cache(CACHE_LAYER_SHARED_FETCH, hit=call is not None)
+        else:
+            record_cache(CACHE_LAYER_SHARED_FETCH, hit=call is not None)
+        if call is None:
+            self.stats["upstream_calls"] += 1
+            if filters is not None:
+                kwargs["filters"] = filters
+            call = asyncio.ensure_future(getattr(self.data_source, method)(context=context, **kwargs))
+            self._calls[key] = call
+        else:
+            self.stats["shared_calls"] += 1
+
+        return await asyncio.shield(call)
+
+    async def prefetch(self, context: Optional[QueryContext] = None) -> None:
+        """Aquece metadados usados por todas as queries (hierarquia e IDs de campos) em paralelo."""
+        await asyncio.gather(
+            self.get_technician_hierarchy(context=context),
+            self.discover_field_ids(context=context),
+        )
+
+    async def get_ticket_count_by_hierarchy(
+        self,
+        filters: Optional[MetricsFilterDTO] = None,
+        context: Optional[QueryContext] = None,
+    ) -> Dict[str, Any]:
+        return await self._shared("get_ticket_count_by_hierarchy", filters, context=context)
+
+    async def get_technician_metrics(
+        self,
+        technician_id: Optional[int] = None,
+        filters: Optional[MetricsFilterDTO] = None,
+        context: Optional[QueryContext] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self._shared("get_technician_metrics", filters, technician_id=technician_id, context=context)
+
+    async def get_ticket_metrics(
+        self,
+        filters: Optional[MetricsFilterDTO] = None,
+        context: Optional[QueryContext] = None,
+    ) -> Dict[str, Any]:
+        return await self._shared("get_ticket_metrics", filters, context=context)
+
+    async def get_technician_hierarchy(self, context: Optional[QueryContext] = None) -> Dict[int, str]:
+        return await self._shared("get_technician_hierarchy", context=context)
+
+    async def get_new_tickets(
+        self,
+        filters: Optional[MetricsFilterDTO] = None,
+        context: Optional[QueryContext] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self._shared("get_new_tickets", filters, context=context)
+
+    async def get_system_status(self, context: Optional[QueryContext] = None) -> Dict[str, Any]:
+        return await self._shared("get_system_status", context=context)
+
+    async def discover_field_ids(self, context: Optional[QueryContext] = None) -> Dict[str, int]:
+        return await self._shared("discover_field_ids", context=context)
@@ -7,16 +7,32 @@ Provides sync wrappers for Flask while using async core internally.
 """
 
 import asyncio
+import contextvars
 import logging
+import time
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 from ...application.contracts.metrics_contracts import UnifiedGLPIServiceContract
 from ...application.dto.metrics_dto import MetricsFilterDTO
-from ...application.queries.metrics_query import MetricsQueryFactory, QueryContext, MetricsDataSource
+from ...application.queries.metrics_query import (
+    MetricsDataSource,
+    MetricsQueryFactory,
+    MockMetricsDataSource,
+    QueryContext,
+)
+from ...application.queries.shared_fetch import SharedFetchDataSource
 from ...infrastructure.cache.unified_cache import unified_cache
-from ...infrastructure.external.glpi.metrics_adapter import GLPIMetricsAdapter, GLPIConfig
+from ...infrastructure.external.glpi.metrics_adapter import (
+    HIERARCHY_LEVELS,
+    TICKET_STATUS_KEYS,
+    GLPIMetricsAdapter,
+    GLPIConfig,
+)
+from ...infrastructure.external.glpi.ticket_series import TicketSeries
 from config.settings import active_config, Config
+from utils.json_provider import RawJSON
+from utils.tracing import tracer
 from utils.mock_data_generator import (
     get_mock_dashboard_metrics,
     get_mock_technician_ranking,
@@ -27,6 +43,19 @@ from utils.mock_data_generator import (
 # Import schema models
 from schemas.dashboard import DashboardMetrics, TechnicianRanking, NewTicket, ApiResponse, TicketStatus, TechnicianLevel
 
+# Seções do bundle do dashboard: seção -> (tipo de query, TTL do cache em segundos)
+DASHBOARD_BUNDLE_SECTIONS = {
+    "metrics": ("general", 180),
+    "ranking": ("ranking", 300),
+    "new_tickets": ("new_tickets", 60),
+    "status": ("system_status", 30),
+}
+
+# Batch de queries: tamanho máximo, execuções simultâneas e TTL por resultado
+BATCH_MAX_QUERIES = 50
+BATCH_MAX_CONCURRENCY = 8
+BATCH_CACHE_TTL = 120
+
 
 class MetricsFacade(UnifiedGLPIServiceContract):
     """
@@ -49,6 +78,7 @@ class MetricsFacade(UnifiedGLPIServiceContract):
             app_token=config.GLPI_APP_TOKEN,
             user_token=config.GLPI_USER_TOKEN,
             timeout=getattr(config, "API_TIMEOUT", 30),
+            stream_responses=getattr(config, "GLPI_STREAM_RESPONSES", True),
         )
 
         # Import GLPIMetricsAdapter directly instead of using factory
@@ -63,9 +93,16 @@ class MetricsFacade(UnifiedGLPIServiceContract):
         self.TECHNICIANS_CACHE_NS = "technicians"
         self.TICKETS_CACHE_NS = "tickets"
         self.SYSTEM_CACHE_NS = "system"
+        self.BUNDLE_CACHE_NS = "dashboard_bundle"
+        self.BATCH_CACHE_NS = "batch_query"
 
     def _run_async(self, coro):
         """Run async coroutine in sync context."""
+        name = getattr(coro, "__qualname__", "coroutine").replace(".<locals>", "")
+        with tracer.span(f"facade.{name}"):
+            return self._run_coroutine(coro)
+
+    def _run_coroutine(self, coro):
         try:
             # Try to get existing event loop
             loop = asyncio.get_running_loop()
@@ -81,8 +118,10 @@ class MetricsFacade(UnifiedGLPIServiceContract):
                 finally:
                     new_loop.close()
 
+            # Copy the context so the request trace and correlation ID follow the coroutine
+            context = contextvars.copy_context()
             with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(run_in_new_loop)
+                future = executor.submit(context.run, run_in_new_loop)
                 return future.result()
 
         except RuntimeError:
@@ -113,6 +152,8 @@ class MetricsFacade(UnifiedGLPIServiceContract):
             except ValueError:
                 self.logger.warning(f"Invalid start_date format: {start_date}")
 
+        # A bare YYYY-MM-DD end date covers the whole day on every path
+        end_date = self._inclusive_end_date(end_date)
         if end_date:
             try:
                 end_datetime = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
@@ -153,6 +194,18 @@ class MetricsFacade(UnifiedGLPIServiceContract):
             offset=0,
         )
 
+    @staticmethod
+    def _inclusive_end_date(end_date: Optional[str]) -> Optional[str]:
+        """End of day for a YYYY-MM-DD end date (the search API criterion is "lessthan")."""
+        if not end_date:
+            return None
+        return f"{end_date[:10]}T23:59:59" if len(end_date) <= 10 else end_date
+
+    @staticmethod
+    def _filters_cache_key(method: str, filters: MetricsFilterDTO) -> Dict[str, Any]:
+        """Cache key from the parsed filters, shared by the endpoint methods and the bundle."""
+        return {"method": method, "filters": filters.model_dump_json()}
+
     # Metrics Service Methods
 
     def get_dashboard_metrics(self, correlation_id: Optional[str] = None) -> DashboardMetrics:
@@ -240,19 +293,14 @@ class MetricsFacade(UnifiedGLPIServiceContract):
         correlation_id: Optional[str] = None,
     ) -> DashboardMetrics:
         """Get dashboard metrics with date filter."""
-        cache_key = {
-            "method": "dashboard_metrics_date_filter",
-            "start_date": start_date,
-            "end_date": end_date,
-            "correlation_id": correlation_id,
-        }
+        filters = self._create_filters_dto(start_date=start_date, end_date=end_date)
+        cache_key = self._filters_cache_key("dashboard_metrics", filters)
 
         cached_result = unified_cache.get(self.METRICS_CACHE_NS, cache_key)
         if cached_result:
             return cached_result
 
         async def _get_metrics():
-            filters = self._create_filters_dto(start_date=start_date, end_date=end_date)
             query = self.query_factory.create_dashboard_metrics_query()
             context = QueryContext(correlation_id=correlation_id)
             return await query.execute(filters=filters, context=context)
@@ -283,19 +331,14 @@ class MetricsFacade(UnifiedGLPIServiceContract):
         correlation_id: Optional[str] = None,
     ) -> DashboardMetrics:
         """Get dashboard metrics with modification date filter."""
-        cache_key = {
-            "method": "dashboard_metrics_mod_date_filter",
-            "start_date": start_date,
-            "end_date": end_date,
-            "correlation_id": correlation_id,
-        }
+        filters = self._create_filters_dto(start_date=start_date, end_date=end_date, modification_date=True)
+        cache_key = self._filters_cache_key("dashboard_metrics", filters)
 
         cached_result = unified_cache.get(self.METRICS_CACHE_NS, cache_key)
         if cached_result:
             return cached_result
 
         async def _get_metrics():
-            filters = self._create_filters_dto(start_date=start_date, end_date=end_date, modification_date=True)
             query = self.query_factory.create_dashboard_metrics_query()
             context = QueryContext(correlation_id=correlation_id)
             return await query.execute(filters=filters, context=context)
@@ -331,32 +374,22 @@ class MetricsFacade(UnifiedGLPIServiceContract):
         correlation_id: Optional[str] = None,
     ) -> DashboardMetrics:
         """Get dashboard metrics with multiple filters."""
-        cache_key = {
-            "method": "dashboard_metrics_filters",
-            "start_date": start_date,
-            "end_date": end_date,
-            "status": status,
-            "priority": priority,
-            "category": category,
-            "technician": technician,
-            "entity_id": entity_id,
-            "correlation_id": correlation_id,
-        }
+        filters = self._create_filters_dto(
+            start_date=start_date,
+            end_date=end_date,
+            status=status,
+            priority=priority,
+            category=category,
+            technician=technician,
+            entity_id=entity_id,
+        )
+        cache_key = self._filters_cache_key("dashboard_metrics", filters)
 
         cached_result = unified_cache.get(self.METRICS_CACHE_NS, cache_key)
         if cached_result:
             return cached_result
 
         async def _get_metrics():
-            filters = self._create_filters_dto(
-                start_date=start_date,
-                end_date=end_date,
-                status=status,
-                priority=priority,
-                category=category,
-                technician=technician,
-                entity_id=entity_id,
-            )
             query = self.query_factory.create_dashboard_metrics_query()
             context = QueryContext(correlation_id=correlation_id)
             return await query.execute(filters=filters, context=context)
@@ -380,6 +413,361 @@ class MetricsFacade(UnifiedGLPIServiceContract):
 
             return create_empty_dashboard_metrics()
 
+    def get_metrics_series(
+        self,
+        start_date: str,
+        end_date: str,
+        granularity: str = "day",
+        use_modification_date: bool = False,
+        level: Optional[str] = None,
+        correlation_id: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get level × status counts for every day/week/month window in [start_date, end_date].
+
+        All windows are answered from one covering fetch. Raises ValueError for an
+        invalid granularity or a range with too many buckets; returns None when GLPI fails.
+        """
+        # Valida granularidade e número de buckets antes de ir ao GLPI
+        empty_series = TicketSeries(start_date, end_date, granularity, HIERARCHY_LEVELS, TICKET_STATUS_KEYS.values())
+
+        if self.use_mock_data:
+            result = empty_series.to_dict()
+            result.update({"date_field": "modification" if use_modification_date else "creation", "truncated": False})
+            return result
+
+        cache_key = {
+            "method": "metrics_series",
+            "start_date": start_date,
+            "end_date": end_date,
+            "granularity": granularity,
+            "use_modification_date": use_modification_date,
+            "level": level,
+        }
+
+        cached_result = unified_cache.get(self.METRICS_CACHE_NS, cache_key)
+        if cached_result:
+            return cached_result
+
+        async def _get_series():
+            filters = self._create_filters_dto(
+                start_date=start_date,
+                end_date=end_date,
+                level=level,
+                modification_date=use_modification_date,
+            )
+            context = QueryContext(correlation_id=correlation_id)
+            return await self.glpi_adapter.get_ticket_series(filters, granularity, context)
+
+        try:
+            result = self._run_async(_get_series())
+            unified_cache.set(self.METRICS_CACHE_NS, cache_key, result, ttl_seconds=180)
+            return result
+
+        except Exception as e:
+            self.logger.error(f"Error getting metrics series: {e}")
+            return None
+
+    @staticmethod
+    def _serialize_section_data(data: Any) -> RawJSON:
+        """Encode one section's query result for the bundle response."""
+        return RawJSON.encode(data)
+
+    def _get_mock_bundle_section(self, section: str, ranking_limit: int, tickets_limit: int) -> Any:
+        """Mock data for one dashboard bundle section."""
+        if section == "metrics":
+            return get_mock_dashboard_metrics()
+        if section == "ranking":
+            return get_mock_technician_ranking(limit=ranking_limit)
+        if section == "new_tickets":
+            return get_mock_new_tickets(limit=tickets_limit)
+        return get_mock_system_status()
+
+    def _bundle_section_cache(self, section: str, filters: MetricsFilterDTO, limit: Optional[int]) -> Tuple[str, Any]:
+        """
+        Cache namespace and key for one bundle section.
+
+        Metrics and ranking share the entries of their endpoint methods, so a
+        bundle warms the endpoints and vice versa. Sections without an
+        equivalent endpoint cache keep their own namespace.
+        """
+        if section == "metrics":
+            return self.METRICS_CACHE_NS, self._filters_cache_key("dashboard_metrics", filters)
+        if section == "ranking":
+            return self.TECHNICIANS_CACHE_NS, self._filters_cache_key("technician_ranking", filters)
+        return self.BUNDLE_CACHE_NS, {"section": section, "filters": filters.model_dump_json(), "limit": limit}
+
+    def get_dashboard_bundle(
+        self,
+        sections: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        category: Optional[str] = None,
+        technician: Optional[str] = None,
+        level: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        modification_date: bool = False,
+        ranking_limit: int = 100,
+        tickets_limit: int = 5,
+        correlation_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Compute several dashboard sections in one pass.
+
+        Filters are parsed once; sections missing from cache run concurrently on one
+        event loop over a SharedFetchDataSource, so identical upstream calls
+        (hierarchy, field IDs, ticket searches) are made only once.
+        """
+        filters = self._create_filters_dto(
+            start_date=start_date,
+            end_date=end_date,
+            status=status,
+            priority=priority,
+            category=category,
+            technician=technician,
+            entity_id=entity_id,
+            level=level,
+            modification_date=modification_date,
+        )
+        section_limits = {"ranking": ranking_limit, "new_tickets": tickets_limit}
+
+        def section_payload(section: str, data: Any) -> Any:
+            # O ranking fica inteiro no cache (como no endpoint); o limite vale só para a resposta
+            if section == "ranking" and isinstance(data, list):
+                data = data[:ranking_limit]
+            return self._serialize_section_data(data)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        for section in sections:
+            namespace, cache_key = self._bundle_section_cache(section, filters, section_limits.get(section))
+            cached_result = None if self.use_mock_data else unified_cache.get(namespace, cache_key)
+            if cached_result is not None:
+                results[section] = {
+                    "success": True,
+                    "data": section_payload(section, cached_result),
+                    "error": None,
+                    "execution_time_ms": 0.0,
+                    "cached": True,
+                }
+            else:
+                pending.append((section, namespace, cache_key))
+
+        shared_source = SharedFetchDataSource(self.glpi_adapter)
+        query_factory = MetricsQueryFactory(shared_source)
+
+        async def _run_section(section: str) -> Dict[str, Any]:
+            started = time.perf_counter()
+            query_type = DASHBOARD_BUNDLE_SECTIONS[section][0]
+            if query_type == "system_status":
+                section_filters = None
+            elif query_type == "new_tickets":
+                section_filters = filters.model_copy(update={"limit": tickets_limit})
+            else:
+                section_filters = filters
+
+            try:
+                query = query_factory.create_query_by_type(query_type)
+                api_response = await query.execute(
+                    filters=section_filters, context=QueryContext(correlation_id=correlation_id)
+                )
+                return {
+                    "success": api_response.success,
+                    "data": api_response.data,
+                    "error": None if api_response.success else api_response.message,
+                    "execution_time_ms": round((time.perf_counter() - started) * 1000, 2),
+                }
+            except Exception as e:
+                return {
+                    "success": False,
+                    "data": None,
+                    "error": str(e),
+                    "execution_time_ms": round((time.perf_counter() - started) * 1000, 2),
+                }
+
+        async def _run_pending():
+            # Metadados compartilhados primeiro, depois todas as seções em paralelo
+            await shared_source.prefetch(QueryContext(correlation_id=correlation_id))
+            return await asyncio.gather(*(_run_section(section) for section, _, _ in pending))
+
+        if pending:
+            if self.use_mock_data:
+                computed = [
+                    {
+                        "success": True,
+                        "data": self._get_mock_bundle_section(section, ranking_limit, tickets_limit),
+                        "error": None,
+                        "execution_time_ms": 0.0,
+                    }
+                    for section, _, _ in pending
+                ]
+            else:
+                try:
+                    computed = self._run_async(_run_pending())
+                except Exception as e:
+                    self.logger.error(f"Error computing dashboard bundle: {e}")
+                    computed = [
+                        {"success": False, "data": None, "error": str(e), "execution_time_ms": None}
+                        for _ in pending
+                    ]
+
+            for (section, namespace, cache_key), section_result in zip(pending, computed):
+                if section_result["success"] and not self.use_mock_data:
+                    unified_cache.set(
+                        namespace, cache_key, section_result["data"], ttl_seconds=DASHBOARD_BUNDLE_SECTIONS[section][1]
+                    )
+                data = section_result["data"]
+                results[section] = {
+                    **section_result,
+                    "data": section_payload(section, data) if data is not None else None,
+                    "cached": False,
+                }
+
+        return {
+            "sections": {section: results[section] for section in sections},
+            "fetch_plan": {
+                "sections_computed": len(pending),
+                "sections_cached": len(sections) - len(pending),
+                **shared_source.stats,
+            },
+        }
+
+    def _create_batch_filters(self, spec_filters: Dict[str, Any]) -> Optional[MetricsFilterDTO]:
+        """MetricsFilterDTO for one batch query spec (None when the spec has no filters)."""
+        if not spec_filters:
+            return None
+
+        def as_str(key: str) -> Optional[str]:
+            value = spec_filters.get(key)
+            return str(value) if value is not None and str(value).strip() else None
+
+        filters = self._create_filters_dto(
+            start_date=as_str("start_date"),
+            end_date=as_str("end_date"),
+            status=as_str("status"),
+            priority=as_str("priority"),
+            category=as_str("category"),
+            technician=as_str("technician"),
+            entity_id=spec_filters.get("entity_id"),
+            level=as_str("level"),
+            modification_date=spec_filters.get("filter_type") == "modification",
+        )
+        if spec_filters.get("limit") is not None:
+            filters = filters.model_copy(update={"limit": int(spec_filters["limit"])})
+        return filters
+
+    def execute_batch(self, queries: List[Dict[str, Any]], correlation_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Execute heterogeneous query specs ({"id", "type", "filters"}) concurrently.
+
+        Identical specs run once, all queries share one SharedFetchDataSource so
+        identical upstream calls are collapsed, and every item reports its own
+        status, timing and cache hit. Invalid specs fail individually.
+        """
+        if len(queries) > BATCH_MAX_QUERIES:
+            raise ValueError(f"Batch com {len(queries)} queries excede o limite de {BATCH_MAX_QUERIES}")
+
+        data_source = MockMetricsDataSource() if self.use_mock_data else self.glpi_adapter
+        shared_source = SharedFetchDataSource(data_source)
+        query_factory = MetricsQueryFactory(shared_source)
+
+        items: List[Dict[str, Any]] = []
+        executions: Dict[str, Dict[str, Any]] = {}  # chave da spec -> query a executar
+        item_keys: List[Optional[str]] = []
+
+        for idx, spec in enumerate(queries):
+            spec = spec if isinstance(spec, dict) else {}
+            item = {"id": spec.get("id", idx), "type": spec.get("type")}
+            items.append(item)
+            try:
+                query = query_factory.create_query_by_type(spec.get("type"))
+                filters = self._create_batch_filters(spec.get("filters") or {})
+            except Exception as e:
+                item.update(
+                    {
+                        "status": "error",
+                        "data": None,
+                        "error": str(e),
+                        "cached": False,
+                        "execution_time_ms": 0.0,
+                        "deduplicated": False,
+                    }
+                )
+                item_keys.append(None)
+                continue
+
+            key = f"{spec['type']}:{filters.model_dump_json() if filters else ''}"
+            item_keys.append(key)
+            if key in executions:
+                continue
+
+            cached_result = None if self.use_mock_data else unified_cache.get(self.BATCH_CACHE_NS, key)
+            executions[key] = {"query": query, "filters": filters, "cached_result": cached_result}
+
+        semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+        async def _execute(execution: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    api_response = await execution["query"].execute(
+                        filters=execution["filters"], context=QueryContext(correlation_id=correlation_id)
+                    )
+                    result = {
+                        "status": "ok" if api_response.success else "error",
+                        "data": self._serialize_section_data(api_response.data),
+                        "error": None if api_response.success else api_response.message,
+                    }
+                except Exception as e:
+                    result = {"status": "error", "data": None, "error": str(e)}
+                result["execution_time_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                return result
+
+        to_run = [(key, execution) for key, execution in executions.items() if execution["cached_result"] is None]
+
+        async def _run_all():
+            await shared_source.prefetch(QueryContext(correlation_id=correlation_id))
+            return await asyncio.gather(*(_execute(execution) for _, execution in to_run))
+
+        results: Dict[str, Dict[str, Any]] = {
+            key: {**execution["cached_result"], "cached": True}
+            for key, execution in executions.items()
+            if execution["cached_result"] is not None
+        }
+        if to_run:
+            try:
+                computed = self._run_async(_run_all())
+            except Exception as e:
+                self.logger.error(f"Error executing query batch: {e}")
+                computed = [{"status": "error", "data": None, "error": str(e), "execution_time_ms": None} for _ in to_run]
+
+            for (key, _), result in zip(to_run, computed):
+                if result["status"] == "ok" and not self.use_mock_data:
+                    unified_cache.set(self.BATCH_CACHE_NS, key, result, ttl_seconds=BATCH_CACHE_TTL)
+                results[key] = {**result, "cached": False}
+
+        # Specs idênticas recebem o mesmo resultado; só a primeira conta como execução
+        seen = set()
+        for item, key in zip(items, item_keys):
+            if key is None:
+                continue
+            item.update(results[key])
+            item["deduplicated"] = key in seen
+            seen.add(key)
+
+        return {
+            "results": items,
+            "fetch_plan": {
+                "queries": len(queries),
+                "unique_queries": len(executions),
+                "queries_cached": len(executions) - len(to_run),
+                "queries_executed": len(to_run),
+                **shared_source.stats,
+            },
+        }
+
     # Technician Service Methods
 
     def get_all_technician_ids_and_names(self, entity_id: Optional[int] = None) -> Tuple[List[int], List[str]]:
@@ -458,22 +846,15 @@ class MetricsFacade(UnifiedGLPIServiceContract):
         correlation_id: Optional[str] = None,
     ) -> List[TechnicianRanking]:
         """Get technician ranking with filters."""
-        cache_key = {
-            "method": "technician_ranking_filters",
-            "start_date": start_date,
-            "end_date": end_date,
-            "level": level,
-            "limit": limit,
-            "entity_id": entity_id,
-            "correlation_id": correlation_id,
-        }
+        filters = self._create_filters_dto(start_date=start_date, end_date=end_date, level=level, entity_id=entity_id)
+        # Ranking completo: o limite não faz parte da query nem da chave
+        cache_key = self._filters_cache_key("technician_ranking", filters)
 
         cached_result = unified_cache.get(self.TECHNICIANS_CACHE_NS, cache_key)
         if cached_result:
             return cached_result
 
         async def _get_ranking():
-            filters = self._create_filters_dto(start_date=start_date, end_date=end_date, level=level, entity_id=entity_id)
             query = self.query_factory.create_technician_ranking_query()
             context = QueryContext(correlation_id=correlation_id)
             return await query.execute(filters=filters, context=context)
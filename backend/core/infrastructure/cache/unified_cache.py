@@ -14,6 +14,9 @@ from typing import Any, Dict, Optional, Union
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+from utils.request_cost import CACHE_LAYER_UNIFIED, record_cache
+from utils.tracing import tracer
+
 
 @dataclass
 class CacheEntry:
@@ -57,6 +60,14 @@ class UnifiedCache:
 
     def get(self, namespace: str, key_data: Union[str, Dict]) -> Optional[Any]:
         """Obtém valor do cache."""
+        with tracer.span("cache.get", namespace=namespace) as span:
+            value = self._get(namespace, key_data)
+            record_cache(CACHE_LAYER_UNIFIED, hit=value is not None)
+            if span is not None:
+                span.set_attribute("hit", value is not None)
+            return value
+
+    def _get(self, namespace: str, key_data: Union[str, Dict]) -> Optional[Any]:
         cache_key = self._generate_key(namespace, key_data)
 
         entry = self._storage.get(cache_key)
@@ -90,6 +101,10 @@ class UnifiedCache:
         ttl_seconds: Optional[int] = None,
     ) -> None:
         """Define valor no cache."""
+        with tracer.span("cache.set", namespace=namespace):
+            self._set(namespace, key_data, value, ttl_seconds)
+
+    def _set(self, namespace: str, key_data: Union[str, Dict], value: Any, ttl_seconds: Optional[int]) -> None:
         cache_key = self._generate_key(namespace, key_data)
         ttl = ttl_seconds or self._default_ttl
 
@@ -5,6 +5,7 @@ GLPI External Integration Module.
 Este módulo contém adaptadores e integrações com a API externa do GLPI.
 """
 
+from .count_planner import CountCell, CountQueryPlan, CountQueryPlanner
 from .metrics_adapter import (
     GLPIAPIClient,
     GLPIAPIError,
@@ -15,6 +16,8 @@ from .metrics_adapter import (
     GLPISessionManager,
     create_glpi_metrics_adapter,
 )
+from .ticket_batch import TicketBatch
+from .ticket_series import SERIES_GRANULARITIES, TicketSeries
 
 __all__ = [
     # Adapter principal
@@ -24,6 +27,15 @@ __all__ = [
     # Componentes internos
     "GLPISessionManager",
     "GLPIAPIClient",
+    # Planejamento de contagens
+    "CountQueryPlanner",
+    "CountQueryPlan",
+    "CountCell",
+    # Representação compacta de tickets
+    "TicketBatch",
+    # Séries temporais
+    "TicketSeries",
+    "SERIES_GRANULARITIES",
     # Exceções
     "GLPIConnectionError",
     "GLPIAuthenticationError",
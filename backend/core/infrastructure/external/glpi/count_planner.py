@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Count Query Planner - Escolha de estratégia para contagens agregadas no GLPI.
+
+Para cada célula nível × status o adapter pode fazer uma busca count-only
+(``range=0-0`` + ``totalcount``) ou baixar uma única projeção de tickets e
+agregar localmente. O planner compara o custo estimado das duas opções a
+partir da cardinalidade estimada e do número de células necessárias.
+
+A cardinalidade vem da última execução com os mesmos critérios; sem ela
+(``None``) o custo do bulk é tomado pelo mínimo (uma requisição) e a própria
+página do bulk informa o totalcount - não há busca de sondagem.
+"""
+
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Estratégias possíveis
+STRATEGY_EMPTY = "empty"
+STRATEGY_COUNT_FANOUT = "count_fanout"
+STRATEGY_BULK_FETCH = "bulk_fetch"
+
+
+@dataclass
+class CountCell:
+    """Célula nível × status a ser contada."""
+
+    level: str
+    status_key: str
+    status_id: int
+
+
+@dataclass
+class CountQueryPlan:
+    """Plano escolhido para uma consulta de contagem."""
+
+    strategy: str
+    cells: List[CountCell]
+    estimated_rows: Optional[int]
+    fanout_requests: int
+    fanout_cost_ms: float
+    bulk_cost_ms: float
+    reason: str
+    skipped_cells: List[CountCell] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representação serializável para debug."""
+        return {
+            "strategy": self.strategy,
+            "cells": len(self.cells),
+            "fanout_requests": self.fanout_requests,
+            "estimated_rows": self.estimated_rows,
+            "fanout_cost_ms": round(self.fanout_cost_ms, 2),
+            "bulk_cost_ms": round(self.bulk_cost_ms, 2),
+            "reason": self.reason,
+            "skipped_cells": [asdict(cell) for cell in self.skipped_cells],
+        }
+
+
+class CountQueryPlanner:
+    """Escolhe entre fan-out de buscas count-only e um bulk fetch projetado."""
+
+    def __init__(
+        self,
+        request_overhead_ms: float = 120.0,
+        row_cost_ms: float = 0.05,
+        max_concurrency: int = 8,
+        max_bulk_rows: int = 10000,
+        max_criteria_per_cell: int = 50,
+    ):
+        self.request_overhead_ms = request_overhead_ms
+        self.row_cost_ms = row_cost_ms
+        self.max_concurrency = max_concurrency
+        self.max_bulk_rows = max_bulk_rows
+        self.max_criteria_per_cell = max_criteria_per_cell
+
+    def plan(
+        self,
+        cells: List[CountCell],
+        estimated_rows: Optional[int],
+        level_sizes: Optional[Dict[str, int]] = None,
+    ) -> CountQueryPlan:
+        """Gera o plano para as células pedidas."""
+        level_sizes = level_sizes or {}
+
+        # Células de níveis sem técnicos são sempre zero - não geram requisição
+        fanout_cells = [cell for cell in cells if level_sizes.get(cell.level, 0) > 0]
+        skipped_cells = [cell for cell in cells if level_sizes.get(cell.level, 0) == 0]
+
+        fanout_requests = len(fanout_cells)
+        waves = math.ceil(fanout_requests / self.max_concurrency) if fanout_requests else 0
+        fanout_cost_ms = waves * self.request_overhead_ms
+        bulk_cost_ms = self.request_overhead_ms + (estimated_rows or 0) * self.row_cost_ms
+
+        def build(strategy: str, reason: str) -> CountQueryPlan:
+            return CountQueryPlan(
+                strategy=strategy,
+                cells=cells,
+                estimated_rows=estimated_rows,
+                fanout_requests=fanout_requests if strategy == STRATEGY_COUNT_FANOUT else 0,
+                fanout_cost_ms=fanout_cost_ms,
+                bulk_cost_ms=bulk_cost_ms,
+                reason=reason,
+                skipped_cells=skipped_cells,
+            )
+
+        if not fanout_cells:
+            return build(STRATEGY_EMPTY, "nenhum técnico para contar")
+
+        widest_level = max(level_sizes.get(cell.level, 0) for cell in fanout_cells)
+        if widest_level > self.max_criteria_per_cell:
+            if estimated_rows is not None and estimated_rows > self.max_bulk_rows:
+                # Nenhuma opção é exata; o bulk ao menos mantém o comportamento anterior
+                return build(STRATEGY_BULK_FETCH, "nível com técnicos demais para critério e cardinalidade acima do range")
+            return build(STRATEGY_BULK_FETCH, f"nível com {widest_level} técnicos excede o limite de critérios")
+
+        if estimated_rows is not None and estimated_rows > self.max_bulk_rows:
+            return build(STRATEGY_COUNT_FANOUT, f"cardinalidade {estimated_rows} excede o range máximo do bulk")
+
+        if fanout_cost_ms <= bulk_cost_ms:
+            return build(STRATEGY_COUNT_FANOUT, "fan-out count-only mais barato que o bulk")
+
+        if estimated_rows is None:
+            return build(STRATEGY_BULK_FETCH, "cardinalidade desconhecida: o bulk informa o totalcount")
+        return build(STRATEGY_BULK_FETCH, "bulk projetado mais barato que o fan-out")
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+JSON Stream - Decodificação incremental de arrays JSON grandes.
+
+Respostas do GLPI com milhares de tickets são arrays (REST ``Ticket``) ou
+objetos com o array em uma chave (search API: ``{"totalcount": ..., "data": [...]}``).
+O decoder recebe os bytes em pedaços, conforme chegam do httpx, e entrega
+cada item do array assim que ele está completo - sem materializar o texto
+inteiro nem a lista completa. As demais chaves do objeto vão para ``envelope``.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Caracteres que podem seguir um valor completo; qualquer outro depois de um
+# número no fim do pedaço (ex.: "350." ou "1e") indica que ele continua
+_VALUE_TERMINATORS = frozenset(" \t\n\r,]}:")
+
+# Estados do decoder
+_START = "start"
+_OBJECT = "object"
+_ARRAY = "array"
+_DONE = "done"
+
+
+class JSONStreamError(ValueError):
+    """Documento JSON inválido ou incompleto no stream."""
+
+
+class StreamingJSONArrayDecoder:
+    """
+    Decoder incremental dos itens de um array JSON.
+
+    O array pode ser o documento inteiro ou o valor de ``item_key`` em um
+    objeto de topo. ``feed`` devolve os itens completados por cada pedaço;
+    ``close`` valida que o documento terminou.
+    """
+
+    def __init__(self, item_key: Optional[str] = "data"):
+        self.item_key = item_key
+        self.envelope: Dict[str, Any] = {}
+        self.items_decoded = 0
+        self.bytes_received = 0
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = _START
+        self._top_level_array = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Processa mais um pedaço de bytes; retorna os itens completos."""
+        self.bytes_received += len(chunk)
+        self._buffer += self._utf8.decode(chunk)
+        return self._drain(final=False)
+
+    def close(self) -> List[Any]:
+        """Fim do stream: processa o restante e valida o documento."""
+        self._buffer += self._utf8.decode(b"", final=True)
+        items = self._drain(final=True)
+        if self._state != _DONE:
+            raise JSONStreamError("JSON incompleto no fim do stream")
+        if self._buffer.strip():
+            raise JSONStreamError("Conteúdo extra após o documento JSON")
+        return items
+
+    def _skip_whitespace(self, pos: int) -> int:
+        return _WHITESPACE.match(self._buffer, pos).end()
+
+    def _decode_value(self, pos: int, final: bool):
+        """raw_decode a partir de ``pos``; None se o valor ainda pode estar incompleto."""
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise JSONStreamError(f"JSON inválido no stream: {self._buffer[pos:pos + 40]!r}")
+            return None
+        if not final:
+            # Número/literal colado no fim do buffer pode continuar no próximo pedaço
+            if end == len(self._buffer):
+                return None
+            # raw_decode aceita o prefixo numérico de "350." ou "1e": espera o resto
+            if self._buffer[end - 1].isdigit() and self._buffer[end] not in _VALUE_TERMINATORS:
+                return None
+        return value, end
+
+    def _drain(self, final: bool) -> List[Any]:
+        items = []
+        buffer_len = len(self._buffer)
+        pos = 0
+
+        while True:
+            pos = self._skip_whitespace(pos)
+            if pos >= buffer_len or self._state == _DONE:
+                break
+            char = self._buffer[pos]
+
+            if self._state == _START:
+                if char == "[":
+                    self._top_level_array = True
+                    self._state = _ARRAY
+                elif char == "{":
+                    self._state = _OBJECT
+                else:
+                    raise JSONStreamError("Documento JSON não é objeto nem array")
+                pos += 1
+
+            elif self._state == _OBJECT:
+                if char == ",":
+                    pos += 1
+                    continue
+                if char == "}":
+                    self._state = _DONE
+                    pos += 1
+                    continue
+
+                # "chave": valor
+                decoded = self._decode_value(pos, final)
+                if decoded is None:
+                    break
+                key, key_end = decoded
+                colon = self._skip_whitespace(key_end)
+                value_start = self._skip_whitespace(colon + 1)
+                if value_start >= buffer_len:
+                    break
+                if self._buffer[colon] != ":":
+                    raise JSONStreamError("Esperado ':' após chave do objeto JSON")
+
+                if key == self.item_key and self._buffer[value_start] == "[":
+                    self._state = _ARRAY
+                    pos = value_start + 1
+                    continue
+
+                decoded = self._decode_value(value_start, final)
+                if decoded is None:
+                    break
+                self.envelope[key], pos = decoded
+
+            elif self._state == _ARRAY:
+                if char == ",":
+                    pos += 1
+                    continue
+                if char == "]":
+                    self._state = _DONE if self._top_level_array else _OBJECT
+                    pos += 1
+                    continue
+
+                decoded = self._decode_value(pos, final)
+                if decoded is None:
+                    break
+                item, pos = decoded
+                items.append(item)
+                self.items_decoded += 1
+
+        # Descarta o que já foi consumido (um slice por pedaço, não por item)
+        self._buffer = self._buffer[pos:]
+        return items
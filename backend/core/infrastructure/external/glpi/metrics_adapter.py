@@ -9,10 +9,12 @@ fornecendo uma interface limpa e testável para consultas de métricas.
 import json
 import logging
 import time
+from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode
 
 import httpx
@@ -21,9 +23,66 @@ import asyncio
 # Importar DTOs centrais para evitar duplicação
 from ....application.dto.metrics_dto import MetricsFilterDTO, TechnicianLevel
 from ....application.queries.metrics_query import QueryContext, MetricsDataSource
+from utils.session_token_store import SessionTokenStore, get_session_token_store, session_store_key
+from utils.request_cost import CACHE_LAYER_FIELD_IDS, CACHE_LAYER_HIERARCHY, count_rows, record_glpi_call
+from utils.tracing import tracer
+
+from .json_stream import JSONStreamError, StreamingJSONArrayDecoder
+from .count_planner import (
+    STRATEGY_BULK_FETCH,
+    STRATEGY_COUNT_FANOUT,
+    CountCell,
+    CountQueryPlan,
+    CountQueryPlanner,
+)
+from .ticket_batch import (
+    EPOCH_ORDINAL,
+    MISSING,
+    SECONDS_PER_DAY,
+    TicketBatch,
+    format_glpi_timestamp,
+    user_name_key,
+)
+from .ticket_series import TicketSeries
 
 logger = logging.getLogger(__name__)
 
+# Search option do GLPI para o ID do ticket (fixo em todas as versões)
+GLPI_TICKET_ID_FIELD = 2
+
+# Status GLPI (ID -> chave das métricas)
+TICKET_STATUS_KEYS = {
+    1: "new",
+    2: "in_progress",
+    3: "cancelled",
+    4: "pending",
+    5: "resolved",
+    6: "closed",
+}
+
+# Status recebidos nos filtros (pt-BR) -> ID GLPI
+FILTER_STATUS_IDS = {
+    "novo": 1,
+    "pendente": 4,
+    "progresso": 2,
+    "resolvido": 5,
+    "fechado": 6,
+    "cancelado": 3,
+}
+
+HIERARCHY_LEVELS = ("N1", "N2", "N3", "N4")
+
+# GLPI responde 206 (Partial Content) quando o range não cobre todos os itens
+SUCCESS_STATUS_CODES = (200, 206)
+
+# Paginação de buscas projetadas que cobrem janelas longas (séries)
+SEARCH_PAGE_SIZE = 10000
+MAX_SERIES_ROWS = 100000
+
+# Cardinalidades observadas (totalcount) reaproveitadas pelo planner de contagens
+CARDINALITY_ESTIMATE_TTL = timedelta(minutes=10)
+MAX_CARDINALITY_ESTIMATES = 256
+
 
 class GLPIConnectionError(Exception):
     """Exceção para erros de conexão com GLPI."""
@@ -54,6 +113,8 @@ class GLPIConfig:
     max_retries: int = 3
     retry_delay_seconds: float = 1.0
     session_timeout_minutes: int = 60
+    # Decodificar buscas grandes de tickets item a item, direto do stream HTTP
+    stream_responses: bool = True
 
     def __post_init__(self):
         # Remover trailing slash da URL
@@ -63,35 +124,68 @@ class GLPIConfig:
 class GLPISessionManager:
     """Gerenciador de sessão GLPI com renovação automática."""
 
-    def __init__(self, config: GLPIConfig):
+    def __init__(self, config: GLPIConfig, token_store: Optional[SessionTokenStore] = None):
         self.config = config
         self.session_token: Optional[str] = None
         self.session_expires_at: Optional[datetime] = None
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
+        # Token compartilhado entre workers do gunicorn (e com o serviço legado)
+        self.token_store = token_store or get_session_token_store()
+        self.token_store_key = session_store_key(config.base_url, config.user_token)
+
     async def get_session_token(self, correlation_id: Optional[str] = None) -> str:
         """Obtém token de sessão válido, renovando se necessário."""
-        if self._is_session_valid():
-            if self.session_token is None:
-                raise GLPIAuthenticationError("Token de sessão inválido")
-            return self.session_token
+        # O store é a fonte da verdade: outro worker pode ter renovado ou invalidado o token
+        record = self.token_store.get(self.token_store_key)
+        if record:
+            if record.remaining() <= self.token_store.refresh_margin_seconds:
+                self.token_store.refresh_in_background(
+                    self.token_store_key,
+                    partial(self._request_session_token, correlation_id),
+                    self._session_ttl_seconds(),
+                )
+            self._set_session(record)
+            return record.token
 
         await self._create_new_session(correlation_id)
         if self.session_token is None:
             raise GLPIAuthenticationError("Falha ao obter token de sessão")
         return self.session_token
 
-    def _is_session_valid(self) -> bool:
-        """Verifica se a sessão atual é válida."""
-        if not self.session_token or not self.session_expires_at:
-            return False
+    def _session_ttl_seconds(self) -> float:
+        return self.config.session_timeout_minutes * 60
+
+    def _set_session(self, record) -> None:
+        """Espelha localmente o registro do store compartilhado."""
+        self.session_token = record.token
+        self.session_expires_at = datetime.fromtimestamp(record.expires_at)
+
+    def invalidate(self, session_token: Optional[str], correlation_id: Optional[str] = None) -> None:
+        """Invalida token recusado (401) para que nenhum worker volte a usá-lo."""
+        self.token_store.invalidate(self.token_store_key, session_token)
+        if self.session_token == session_token:
+            self.session_token = None
+            self.session_expires_at = None
 
-        # Renovar 5 minutos antes do vencimento
-        buffer_time = timedelta(minutes=5)
-        return datetime.now() < (self.session_expires_at - buffer_time)
+        self.logger.info("Token de sessão GLPI invalidado", extra={"correlation_id": correlation_id})
 
     async def _create_new_session(self, correlation_id: Optional[str] = None) -> None:
-        """Cria nova sessão GLPI."""
+        """Cria nova sessão GLPI (single-flight entre processos via store compartilhado)."""
+        # Lock do store pode bloquear enquanto outro worker autentica - fora do event loop
+        record = await asyncio.to_thread(
+            self.token_store.get_or_refresh,
+            self.token_store_key,
+            partial(self._request_session_token, correlation_id),
+            self._session_ttl_seconds(),
+        )
+        if not record:
+            raise GLPIAuthenticationError("Falha ao obter token de sessão")
+
+        self._set_session(record)
+
+    def _request_session_token(self, correlation_id: Optional[str] = None) -> str:
+        """Executa o initSession no GLPI."""
         headers = {
             "Content-Type": "application/json",
             "App-Token": self.config.app_token,
@@ -104,36 +198,47 @@ class GLPISessionManager:
         url = f"{self.config.base_url}/apirest.php/initSession"
 
         try:
-            async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-                response = await client.get(url, headers=headers)
+            with httpx.Client(timeout=self.config.timeout) as client:
+                response = client.get(url, headers=headers)
 
                 if response.status_code == 200:
                     data = response.json()
-                    self.session_token = data.get("session_token")
-
-                    # Definir expiração da sessão
-                    self.session_expires_at = datetime.now() + timedelta(minutes=self.config.session_timeout_minutes)
+                    session_token = data.get("session_token")
 
                     self.logger.info(
                         "Nova sessão GLPI criada",
-                        extra={
-                            "correlation_id": correlation_id,
-                            "expires_at": self.session_expires_at.isoformat(),
-                        },
+                        extra={"correlation_id": correlation_id},
                     )
+                    return session_token
                 else:
                     raise GLPIAuthenticationError(f"Falha na autenticação GLPI: {response.status_code} - {response.text}")
 
         except httpx.RequestError as e:
             raise GLPIConnectionError(f"Erro de conexão com GLPI: {str(e)}")
         except Exception as e:
+            if isinstance(e, (GLPIConnectionError, GLPIAuthenticationError)):
+                raise
             raise GLPIAPIError(f"Erro inesperado na autenticação GLPI: {str(e)}")
 
-    async def close_session(self, correlation_id: Optional[str] = None) -> None:
-        """Fecha sessão GLPI."""
+    def release_session(self) -> None:
+        """Descarta apenas a referência local: o token continua válido para os outros workers."""
+        self.session_token = None
+        self.session_expires_at = None
+
+    async def close_session(self, correlation_id: Optional[str] = None, global_logout: bool = False) -> None:
+        """Fecha sessão GLPI.
+
+        O token vem do store compartilhado, então por padrão só a referência
+        local é descartada. ``killSession`` (que derruba a sessão de todos os
+        workers) só é enviado em logout global explícito.
+        """
         if not self.session_token:
             return
 
+        if not global_logout:
+            self.release_session()
+            return
+
         headers = {
             "Session-Token": self.session_token,
             "App-Token": self.config.app_token,
@@ -158,8 +263,8 @@ class GLPISessionManager:
                 extra={"correlation_id": correlation_id},
             )
         finally:
-            self.session_token = None
-            self.session_expires_at = None
+            self.token_store.invalidate(self.token_store_key, self.session_token)
+            self.release_session()
 
 
 class GLPIAPIClient:
@@ -170,18 +275,15 @@ class GLPIAPIClient:
         self.session_manager = session_manager
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
-    async def make_request(
+    def _prepare_request(
         self,
         endpoint: str,
-        method: str = "GET",
-        params: Optional[Dict[str, Any]] = None,
-        data: Optional[Dict[str, Any]] = None,
-        correlation_id: Optional[str] = None,
-    ) -> Dict[str, Any]:
-        """Faz requisição autenticada para API GLPI."""
-
-        session_token = await self.session_manager.get_session_token(correlation_id)
-
+        method: str,
+        params: Optional[Dict[str, Any]],
+        session_token: str,
+        correlation_id: Optional[str],
+    ) -> tuple:
+        """Monta URL e headers autenticados; retorna (url, headers)."""
         headers = {
             "Content-Type": "application/json",
             "Session-Token": session_token,
@@ -194,7 +296,7 @@ class GLPIAPIClient:
         # Construir URL
         url = f"{self.config.base_url}/apirest.php/{endpoint.lstrip('/')}"
         if params:
-            url += f"?{urlencode(params, doseqs=True)}"
+            url += f"?{urlencode(params, doseq=True)}"
 
         # Log da requisição
         self.logger.debug(
@@ -206,6 +308,42 @@ class GLPIAPIClient:
                 "params": params,
             },
         )
+        return url, headers
+
+    def _raise_for_status(
+        self, status_code: int, response_text: str, session_token: str, correlation_id: Optional[str]
+    ) -> None:
+        """Converte status de erro da API em exceções do adapter."""
+        if status_code in SUCCESS_STATUS_CODES:
+            return
+        if status_code == 401:
+            # Token expirado: invalidar no store compartilhado para forçar renovação única
+            self.session_manager.invalidate(session_token, correlation_id)
+            raise GLPIAuthenticationError(f"Token expirado: {response_text}")
+        raise GLPIAPIError(f"Erro na API GLPI: {status_code} - {response_text}")
+
+    async def make_request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        correlation_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Faz requisição autenticada para API GLPI."""
+        with tracer.span("glpi.request", endpoint=endpoint, method=method):
+            return await self._make_request(endpoint, method, params, data, correlation_id)
+
+    async def _make_request(
+        self,
+        endpoint: str,
+        method: str,
+        params: Optional[Dict[str, Any]],
+        data: Optional[Dict[str, Any]],
+        correlation_id: Optional[str],
+    ) -> Dict[str, Any]:
+        session_token = await self.session_manager.get_session_token(correlation_id)
+        url, headers = self._prepare_request(endpoint, method, params, session_token, correlation_id)
 
         try:
             request_kwargs = {"headers": headers}
@@ -213,9 +351,10 @@ class GLPIAPIClient:
             if data:
                 request_kwargs["json"] = data
 
+            request_start = time.perf_counter()
             async with httpx.AsyncClient(timeout=self.config.timeout) as client:
                 response = await client.request(method, url, **request_kwargs)
-                response_text = response.text
+                request_duration = time.perf_counter() - request_start
 
                 # Log da resposta
                 self.logger.debug(
@@ -223,27 +362,97 @@ class GLPIAPIClient:
                     extra={
                         "correlation_id": correlation_id,
                         "status_code": response.status_code,
-                        "response_size": len(response_text),
+                        "response_size": len(response.content),
                     },
                 )
 
-                if response.status_code == 200:
-                    try:
-                        return response.json()
-                    except json.JSONDecodeError:
-                        # Algumas respostas podem não ser JSON
-                        return {"raw_response": response_text}
+                if response.status_code not in SUCCESS_STATUS_CODES:
+                    record_glpi_call(len(response.content), request_duration, error=True)
+                self._raise_for_status(response.status_code, response.text, session_token, correlation_id)
 
-                elif response.status_code == 401:
-                    # Token expirado, forçar renovação
-                    self.session_manager.session_token = None
-                    raise GLPIAuthenticationError(f"Token expirado: {response_text}")
+                # Decodifica direto dos bytes: o texto só é montado para respostas não-JSON
+                try:
+                    payload = json.loads(response.content)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    payload = {"raw_response": response.text}
+                record_glpi_call(len(response.content), request_duration, rows=count_rows(payload))
+                return payload
 
-                else:
-                    raise GLPIAPIError(f"Erro na API GLPI: {response.status_code} - {response_text}")
+        except httpx.RequestError as e:
+            raise GLPIConnectionError(f"Erro de conexão com GLPI: {str(e)}")
+        except Exception as e:
+            if isinstance(e, (GLPIConnectionError, GLPIAuthenticationError, GLPIAPIError)):
+                raise
+            raise GLPIAPIError(f"Erro inesperado na API GLPI: {str(e)}")
+
+    async def stream_request(
+        self,
+        endpoint: str,
+        on_item: Callable[[Any], Any],
+        params: Optional[Dict[str, Any]] = None,
+        item_key: Optional[str] = "data",
+        correlation_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        GET autenticado com decodificação incremental da resposta.
+
+        Cada item do array (a resposta inteira, ou o valor de ``item_key``) é
+        entregue a ``on_item`` assim que chega do stream HTTP; nem o texto nem
+        a lista completa são materializados. Retorna as demais chaves do
+        objeto (ex.: ``totalcount``).
+        """
+        with tracer.span("glpi.stream", endpoint=endpoint) as span:
+            return await self._stream_request(endpoint, on_item, params, item_key, correlation_id, span)
+
+    async def _stream_request(
+        self,
+        endpoint: str,
+        on_item: Callable[[Any], Any],
+        params: Optional[Dict[str, Any]],
+        item_key: Optional[str],
+        correlation_id: Optional[str],
+        span: Any,
+    ) -> Dict[str, Any]:
+        session_token = await self.session_manager.get_session_token(correlation_id)
+        url, headers = self._prepare_request(endpoint, "GET", params, session_token, correlation_id)
+        decoder = StreamingJSONArrayDecoder(item_key)
+
+        try:
+            request_start = time.perf_counter()
+            async with httpx.AsyncClient(timeout=self.config.timeout) as client:
+                async with client.stream("GET", url, headers=headers) as response:
+                    if response.status_code not in SUCCESS_STATUS_CODES:
+                        body = await response.aread()
+                        record_glpi_call(len(body), time.perf_counter() - request_start, error=True)
+                        self._raise_for_status(
+                            response.status_code, body.decode("utf-8", "replace"), session_token, correlation_id
+                        )
+
+                    async for chunk in response.aiter_bytes():
+                        for item in decoder.feed(chunk):
+                            on_item(item)
+                    for item in decoder.close():
+                        on_item(item)
+
+            self.logger.debug(
+                f"GLPI API Response (stream): {response.status_code}",
+                extra={
+                    "correlation_id": correlation_id,
+                    "status_code": response.status_code,
+                    "response_size": decoder.bytes_received,
+                    "items": decoder.items_decoded,
+                },
+            )
+            record_glpi_call(decoder.bytes_received, time.perf_counter() - request_start, rows=decoder.items_decoded)
+            if span is not None:
+                span.set_attribute("bytes", decoder.bytes_received)
+                span.set_attribute("items", decoder.items_decoded)
+            return decoder.envelope
 
         except httpx.RequestError as e:
             raise GLPIConnectionError(f"Erro de conexão com GLPI: {str(e)}")
+        except JSONStreamError as e:
+            raise GLPIAPIError(f"Resposta JSON inválida da API GLPI: {str(e)}")
         except Exception as e:
             if isinstance(e, (GLPIConnectionError, GLPIAuthenticationError, GLPIAPIError)):
                 raise
@@ -262,6 +471,18 @@ class GLPIMetricsAdapter:
         # Cache para hierarquia de técnicos (válido por 1 hora)
         self._technician_hierarchy_cache: Optional[Dict[int, str]] = None
         self._hierarchy_cache_expires_at: Optional[datetime] = None
+        # Nome/login normalizado -> ID, da mesma busca: a search API devolve técnicos por nome
+        self._technician_ids_by_name: Dict[str, int] = {}
+
+        # Cache para IDs de campos da search API (válido por 1 hora)
+        self._field_ids_cache: Optional[Dict[str, int]] = None
+        self._field_ids_cache_expires_at: Optional[datetime] = None
+
+        # Planner de contagens (count-only vs bulk) e último plano executado, para debug
+        self.count_planner = CountQueryPlanner()
+        self.last_count_plan: Optional[CountQueryPlan] = None
+        # Critérios da busca -> (totalcount, expira em): substitui a busca de sondagem
+        self._cardinality_estimates: Dict[str, tuple] = {}
 
     async def get_ticket_count_by_hierarchy(
         self,
@@ -274,17 +495,47 @@ class GLPIMetricsAdapter:
         try:
             # Obter hierarquia de técnicos
             technician_hierarchy = await self.get_technician_hierarchy(context)
+            field_ids = await self.discover_field_ids(context)
 
-            # Construir parâmetros da consulta
-            params = self._build_ticket_query_params(filters)
-
-            # Fazer requisição para tickets
-            tickets_data = await self.api_client.make_request(endpoint="Ticket", params=params, correlation_id=correlation_id)
+            # Escolher a estratégia pela cardinalidade da última execução (sem busca de sondagem)
+            cells = self._build_count_cells(filters)
+            level_technicians = self._group_technicians_by_level(technician_hierarchy)
+            level_sizes = {level: len(tech_ids) for level, tech_ids in level_technicians.items()}
+            estimate_key = repr(self._build_ticket_search_criteria(filters, field_ids))
+            plan = self.count_planner.plan(cells, self._cardinality_estimate(estimate_key), level_sizes)
+
+            hierarchy_metrics = None
+            if plan.strategy == STRATEGY_BULK_FETCH:
+                # Buscar apenas as colunas necessárias via search API; a página traz o totalcount
+                tickets_data, totalcount = await self._search_projected_tickets_with_total(filters, context)
+                if totalcount is not None:
+                    self._remember_cardinality(estimate_key, totalcount)
+                    if totalcount > len(tickets_data):
+                        # Truncado pelo range: replaneja com a cardinalidade real (fan-out, se couber)
+                        plan = self.count_planner.plan(cells, totalcount, level_sizes)
+                if plan.strategy == STRATEGY_BULK_FETCH:
+                    hierarchy_metrics = self._process_tickets_by_hierarchy(
+                        tickets_data, technician_hierarchy, correlation_id
+                    )
+                    requested_levels = {cell.level for cell in cells}
+                    for level in HIERARCHY_LEVELS:
+                        if level not in requested_levels:
+                            hierarchy_metrics[level] = self._empty_level_counts()
+
+            if plan.strategy == STRATEGY_COUNT_FANOUT:
+                hierarchy_metrics = await self._count_cells_concurrently(
+                    plan, filters, field_ids, level_technicians, correlation_id
+                )
+            elif hierarchy_metrics is None:
+                hierarchy_metrics = {level: self._empty_level_counts() for level in HIERARCHY_LEVELS}
 
-            # Processar dados por hierarquia
-            hierarchy_metrics = self._process_tickets_by_hierarchy(tickets_data, technician_hierarchy, correlation_id)
+            self.last_count_plan = plan
+            self.logger.debug(
+                f"Plano de contagem por hierarquia: {plan.strategy}",
+                extra={"correlation_id": correlation_id, "query_plan": plan.to_dict()},
+            )
 
-            return {"levels": hierarchy_metrics}
+            return {"levels": hierarchy_metrics, "query_plan": plan.to_dict()}
 
         except Exception as e:
             self.logger.error(
@@ -319,7 +570,7 @@ class GLPIMetricsAdapter:
                 tech_filter.technician_id = tech_id
 
                 # Obter tickets do técnico
-                tech_tickets = await self._get_technician_tickets(tech_id, tech_filter, correlation_id)
+                tech_tickets = await self._get_technician_tickets(tech_id, tech_filter, context)
 
                 # Processar métricas
                 metrics = self._process_technician_metrics(technician, tech_tickets, correlation_id)
@@ -354,11 +605,20 @@ class GLPIMetricsAdapter:
             # Construir parâmetros da consulta
             params = self._build_ticket_query_params(filters)
 
-            # Obter tickets
-            tickets_data = await self.api_client.make_request(endpoint="Ticket", params=params, correlation_id=correlation_id)
+            # Obter tickets e compactar já na chegada (os dicts completos não sobrevivem à requisição)
+            tickets = TicketBatch()
+            if self.config.stream_responses:
+                await self.api_client.stream_request(
+                    "Ticket", tickets.append_item, params=params, item_key=None, correlation_id=correlation_id
+                )
+            else:
+                tickets_data = await self.api_client.make_request(endpoint="Ticket", params=params, correlation_id=correlation_id)
+                for item in tickets_data if isinstance(tickets_data, list) else []:
+                    tickets.append_item(item)
+                del tickets_data
 
             # Processar métricas gerais
-            metrics = self._process_ticket_metrics(tickets_data, filters, correlation_id)
+            metrics = self._process_ticket_metrics(tickets, filters, correlation_id)
 
             return metrics
 
@@ -374,7 +634,10 @@ class GLPIMetricsAdapter:
         correlation_id = context.correlation_id if context else None
 
         # Verificar cache
-        if self._is_hierarchy_cache_valid():
+        cache_valid = self._is_hierarchy_cache_valid()
+        if context is not None:
+            context.record_cache(CACHE_LAYER_HIERARCHY, hit=cache_valid)
+        if cache_valid:
             if self._technician_hierarchy_cache is None:
                 raise GLPIAPIError("Cache de hierarquia inválido")
             return self._technician_hierarchy_cache
@@ -395,6 +658,7 @@ class GLPIMetricsAdapter:
             hierarchy = self._process_technician_hierarchy(users_data, correlation_id)
 
             # Atualizar cache
+            self._technician_ids_by_name = self._build_technician_name_index(users_data)
             self._technician_hierarchy_cache = hierarchy
             self._hierarchy_cache_expires_at = datetime.now() + timedelta(hours=1)
 
@@ -420,7 +684,6 @@ class GLPIMetricsAdapter:
         params = {
             "range": "0-9999",  # Limite alto por padrão
             "expand_dropdowns": True,
-            "with_devices": True,
         }
 
         if not filters:
@@ -469,57 +732,39 @@ class GLPIMetricsAdapter:
 
     def _process_tickets_by_hierarchy(
         self,
-        tickets_data: Dict[str, Any],
+        tickets_data: Union[TicketBatch, List[Dict[str, Any]]],
         technician_hierarchy: Dict[int, str],
         correlation_id: Optional[str],
     ) -> Dict[str, Dict[str, Any]]:
-        """Processa tickets agrupados por hierarquia."""
+        """
+        Processa tickets agrupados por hierarquia.
 
-        # Inicializar contadores por nível
-        levels = {
-            "N1": {
-                "total": 0,
-                "new": 0,
-                "pending": 0,
-                "in_progress": 0,
-                "resolved": 0,
-                "closed": 0,
-                "cancelled": 0,
-            },
-            "N2": {
-                "total": 0,
-                "new": 0,
-                "pending": 0,
-                "in_progress": 0,
-                "resolved": 0,
-                "closed": 0,
-                "cancelled": 0,
-            },
-            "N3": {
-                "total": 0,
-                "new": 0,
-                "pending": 0,
-                "in_progress": 0,
-                "resolved": 0,
-                "closed": 0,
-                "cancelled": 0,
-            },
-            "N4": {
-                "total": 0,
-                "new": 0,
-                "pending": 0,
-                "in_progress": 0,
-                "resolved": 0,
-                "closed": 0,
-                "cancelled": 0,
-            },
-        }
+        Mesma regra do fan-out count-only (OR dos técnicos de cada nível): um
+        ticket conta uma vez em cada nível que tenha algum dos seus técnicos.
+        """
 
-        tickets = tickets_data if isinstance(tickets_data, list) else []
+        # Inicializar contadores por nível
+        levels = {level: self._empty_level_counts() for level in HIERARCHY_LEVELS}
 
-        for ticket in tickets:
-            # Obter técnico responsável
-            tech_id = ticket.get("users_id_assign")
+        # Contar pares (técnico, status) uma vez; o mapeamento para nível é por par distinto
+        if isinstance(tickets_data, TicketBatch):
+            pair_counts = tickets_data.assignee_status_counts()
+            multi_assignee_rows = tickets_data.multi_assignee_rows()
+        else:
+            tickets = tickets_data if isinstance(tickets_data, list) else []
+            pair_counts = Counter()
+            multi_assignee_rows = []
+            for ticket in tickets:
+                assignees = ticket.get("users_id_assign")
+                status = ticket.get("status", 1)
+                if isinstance(assignees, list):
+                    if len(assignees) > 1:
+                        multi_assignee_rows.append((status, tuple(assignees)))
+                    assignees = assignees[0] if assignees else None
+                pair_counts[(assignees, status)] += 1
+
+        for (tech_id, status), count in pair_counts.items():
+            # Tickets sem técnico responsável não entram na hierarquia
             if not tech_id:
                 continue
 
@@ -529,22 +774,113 @@ class GLPIMetricsAdapter:
                 continue
 
             # Incrementar contadores
-            levels[tech_level]["total"] += 1
+            levels[tech_level]["total"] += count
+            levels[tech_level][TICKET_STATUS_KEYS.get(status, "new")] += count
+
+        # Demais técnicos de tickets compartilhados: +1 nos níveis ainda não contados para o ticket
+        for status, assignees in multi_assignee_rows:
+            counted = {technician_hierarchy.get(assignees[0]) if assignees[0] else None}
+            for tech_id in assignees[1:]:
+                tech_level = technician_hierarchy.get(tech_id)
+                if tech_level not in levels or tech_level in counted:
+                    continue
+                counted.add(tech_level)
+                levels[tech_level]["total"] += 1
+                levels[tech_level][TICKET_STATUS_KEYS.get(status, "new")] += 1
 
-            # Mapear status
-            status = ticket.get("status", 1)
-            status_map = {
-                1: "new",
-                2: "in_progress",
-                3: "cancelled",
-                4: "pending",
-                5: "resolved",
-                6: "closed",
-            }
+        return levels
+
+    @staticmethod
+    def _empty_level_counts() -> Dict[str, int]:
+        """Contadores zerados de um nível."""
+        counts = {"total": 0}
+        counts.update({status_key: 0 for status_key in TICKET_STATUS_KEYS.values()})
+        return counts
+
+    def _build_count_cells(self, filters: Optional[MetricsFilterDTO]) -> List[CountCell]:
+        """Células nível × status pedidas pelos filtros."""
+        levels = list(HIERARCHY_LEVELS)
+        if filters and filters.level:
+            level = filters.level.value if isinstance(filters.level, Enum) else str(filters.level)
+            if level in HIERARCHY_LEVELS:
+                levels = [level]
+
+        statuses = list(TICKET_STATUS_KEYS.items())
+        status_id = self._filter_status_id(filters)
+        if status_id is not None:
+            statuses = [(status_id, TICKET_STATUS_KEYS[status_id])]
+
+        return [
+            CountCell(level=level, status_key=status_key, status_id=status_id)
+            for level in levels
+            for status_id, status_key in statuses
+        ]
+
+    @staticmethod
+    def _group_technicians_by_level(technician_hierarchy: Dict[int, str]) -> Dict[str, List[int]]:
+        """Inverte a hierarquia (técnico -> nível) para nível -> técnicos."""
+        grouped: Dict[str, List[int]] = {level: [] for level in HIERARCHY_LEVELS}
+        for tech_id, level in technician_hierarchy.items():
+            if level in grouped:
+                grouped[level].append(tech_id)
+        return grouped
+
+    def _cardinality_estimate(self, key: str) -> Optional[int]:
+        """Último totalcount observado para os critérios, se ainda válido."""
+        entry = self._cardinality_estimates.get(key)
+        if not entry or datetime.now() >= entry[1]:
+            return None
+        return entry[0]
+
+    def _remember_cardinality(self, key: str, rows: int) -> None:
+        if key not in self._cardinality_estimates and len(self._cardinality_estimates) >= MAX_CARDINALITY_ESTIMATES:
+            # Descarta a entrada mais antiga (dict mantém a ordem de inserção)
+            self._cardinality_estimates.pop(next(iter(self._cardinality_estimates)))
+        self._cardinality_estimates[key] = (rows, datetime.now() + CARDINALITY_ESTIMATE_TTL)
+
+    async def _count_tickets(self, criteria: List[tuple], correlation_id: Optional[str]) -> int:
+        """Busca count-only: range mínimo, apenas o totalcount é lido."""
+        params = {"range": "0-0", "forcedisplay[0]": GLPI_TICKET_ID_FIELD}
+        self._apply_search_criteria(params, criteria)
+
+        search_response = await self.api_client.make_request(
+            endpoint="search/Ticket", params=params, correlation_id=correlation_id
+        )
+        if not isinstance(search_response, dict):
+            return 0
+        return self._coerce_int(search_response.get("totalcount")) or 0
 
-            status_key = status_map.get(status, "new")
-            if status_key in levels[tech_level]:
-                levels[tech_level][status_key] += 1
+    async def _count_cells_concurrently(
+        self,
+        plan: CountQueryPlan,
+        filters: Optional[MetricsFilterDTO],
+        field_ids: Dict[str, int],
+        level_technicians: Dict[str, List[int]],
+        correlation_id: Optional[str],
+    ) -> Dict[str, Dict[str, int]]:
+        """Executa as buscas count-only do plano com concorrência limitada."""
+        levels = {level: self._empty_level_counts() for level in HIERARCHY_LEVELS}
+        base_criteria = self._build_ticket_search_criteria(filters, field_ids)
+        status_field = field_ids.get("status_id", 12)
+        technician_field = field_ids.get("technician_id", 4)
+        semaphore = asyncio.Semaphore(self.count_planner.max_concurrency)
+
+        skipped = {(cell.level, cell.status_key) for cell in plan.skipped_cells}
+        cells = [cell for cell in plan.cells if (cell.level, cell.status_key) not in skipped]
+
+        async def count_cell(cell: CountCell) -> int:
+            criteria = base_criteria + [
+                (status_field, "equals", cell.status_id),
+                (technician_field, "equals", level_technicians[cell.level]),
+            ]
+            async with semaphore:
+                return await self._count_tickets(criteria, correlation_id)
+
+        counts = await asyncio.gather(*(count_cell(cell) for cell in cells))
+
+        for cell, count in zip(cells, counts):
+            levels[cell.level][cell.status_key] += count
+            levels[cell.level]["total"] += count
 
         return levels
 
@@ -568,28 +904,192 @@ class GLPIMetricsAdapter:
         self,
         technician_id: int,
         filters: MetricsFilterDTO,
-        correlation_id: Optional[str],
-    ) -> List[Dict[str, Any]]:
+        context: Optional[QueryContext],
+    ) -> TicketBatch:
         """Obtém tickets de um técnico específico."""
+        tech_filter = filters.copy()
+        tech_filter.technician_id = technician_id
 
-        params = self._build_ticket_query_params(filters)
-        params["users_id_assign"] = technician_id
+        return await self._search_projected_tickets(tech_filter, context)
 
-        tickets_data = await self.api_client.make_request(endpoint="Ticket", params=params, correlation_id=correlation_id)
+    async def _search_projected_tickets(
+        self,
+        filters: Optional[MetricsFilterDTO],
+        context: Optional[QueryContext],
+    ) -> TicketBatch:
+        """Busca tickets via search API trazendo apenas as colunas usadas nas agregações."""
+        tickets, _ = await self._search_projected_tickets_with_total(filters, context)
+        return tickets
 
-        return tickets_data if isinstance(tickets_data, list) else []
+    async def _search_projected_tickets_with_total(
+        self,
+        filters: Optional[MetricsFilterDTO],
+        context: Optional[QueryContext],
+    ) -> tuple:
+        """Como ``_search_projected_tickets``, retornando também o totalcount: (TicketBatch, totalcount)."""
+        correlation_id = context.correlation_id if context else None
+
+        field_ids = await self.discover_field_ids(context)
+        params = self._build_projected_ticket_search_params(filters, field_ids)
+
+        tickets = TicketBatch()
+        totalcount = await self._fetch_projected_page(params, field_ids, correlation_id, None, tickets)
+        return tickets, totalcount
+
+    async def _fetch_projected_page(
+        self,
+        params: Dict[str, Any],
+        field_ids: Dict[str, int],
+        correlation_id: Optional[str],
+        extra_columns: Optional[Dict[str, int]],
+        batch: TicketBatch,
+    ) -> Optional[int]:
+        """Busca uma página projetada decodificando-a em ``batch``; retorna o totalcount."""
+        if not self.config.stream_responses:
+            page = await self.api_client.make_request(endpoint="search/Ticket", params=params, correlation_id=correlation_id)
+            self._decode_projected_tickets(page, field_ids, correlation_id, extra_columns, batch=batch)
+            return self._coerce_int(page.get("totalcount")) if isinstance(page, dict) else None
+
+        # Modo streaming: linhas dict entram no batch conforme chegam; linhas em lista
+        # dependem de "columns", que pode vir depois de "data", e aguardam o fim
+        columns = self._projected_ticket_columns(field_ids, extra_columns)
+        append_row = batch.search_row_appender(columns, assignee_ids=self._technician_ids_by_name)
+        list_rows = []
+        skipped = 0
+
+        def on_row(row: Any) -> None:
+            nonlocal skipped
+            if isinstance(row, list):
+                list_rows.append(row)
+            elif not append_row(row):
+                skipped += 1
+
+        envelope = await self.api_client.stream_request(
+            "search/Ticket", on_row, params=params, correlation_id=correlation_id
+        )
+        if list_rows:
+            append_list_row = batch.search_row_appender(
+                columns, envelope.get("columns"), self._technician_ids_by_name
+            )
+            skipped += sum(1 for row in list_rows if not append_list_row(row))
+
+        if skipped:
+            self.logger.warning(
+                f"{skipped} linhas de ticket ignoradas na decodificação da search API",
+                extra={"correlation_id": correlation_id},
+            )
+        return self._coerce_int(envelope.get("totalcount"))
+
+    async def _search_all_projected_tickets(
+        self,
+        filters: Optional[MetricsFilterDTO],
+        context: Optional[QueryContext],
+        extra_columns: Optional[Dict[str, int]] = None,
+        max_rows: int = MAX_SERIES_ROWS,
+    ) -> tuple:
+        """
+        Busca projetada paginada para janelas longas.
+
+        A primeira página informa o totalcount; as demais são buscadas em paralelo
+        e decodificadas no mesmo TicketBatch assim que chegam, sem reter as páginas.
+        Retorna (TicketBatch, totalcount).
+        """
+        correlation_id = context.correlation_id if context else None
+
+        field_ids = await self.discover_field_ids(context)
+        params = self._build_projected_ticket_search_params(filters, field_ids, extra_columns)
+        tickets = TicketBatch()
+
+        async def fetch_page(offset: int) -> Optional[int]:
+            page_params = dict(params)
+            page_params["range"] = f"{offset}-{offset + SEARCH_PAGE_SIZE - 1}"
+            # Appends ao batch acontecem entre awaits: seguro com páginas concorrentes
+            return await self._fetch_projected_page(page_params, field_ids, correlation_id, extra_columns, tickets)
+
+        totalcount = await fetch_page(0)
+        totalcount = totalcount if totalcount is not None else len(tickets)
+
+        offsets = list(range(SEARCH_PAGE_SIZE, min(totalcount, max_rows), SEARCH_PAGE_SIZE))
+        if offsets:
+            semaphore = asyncio.Semaphore(self.count_planner.max_concurrency)
+
+            async def fetch_limited(offset: int) -> Optional[int]:
+                async with semaphore:
+                    return await fetch_page(offset)
+
+            await asyncio.gather(*(fetch_limited(offset) for offset in offsets))
+
+        return tickets, totalcount
+
+    async def get_ticket_series(
+        self,
+        filters: MetricsFilterDTO,
+        granularity: str,
+        context: Optional[QueryContext] = None,
+    ) -> Dict[str, Any]:
+        """
+        Contagens nível × status para cada janela (dia/semana/mês) do intervalo.
+
+        Uma única busca projetada cobre o intervalo inteiro e os tickets são
+        distribuídos nos buckets em uma passada, pela data de criação ou de
+        modificação conforme ``filters.use_modification_date``.
+        """
+        correlation_id = context.correlation_id if context else None
+
+        try:
+            technician_hierarchy = await self.get_technician_hierarchy(context)
+            field_ids = await self.discover_field_ids(context)
+
+            # date_mod já faz parte da projeção; a data de criação é coluna extra
+            if filters.use_modification_date:
+                extra_columns = None
+            else:
+                extra_columns = {"date": field_ids.get("created_date", 15)}
+
+            levels = list(HIERARCHY_LEVELS)
+            if filters.level:
+                level = filters.level.value if isinstance(filters.level, Enum) else str(filters.level)
+                if level in HIERARCHY_LEVELS:
+                    levels = [level]
+
+            series = TicketSeries(
+                filters.start_date, filters.end_date, granularity, levels, TICKET_STATUS_KEYS.values()
+            )
+            tickets, totalcount = await self._search_all_projected_tickets(filters, context, extra_columns)
+
+            timestamps = tickets.date_mod if filters.use_modification_date else tickets.date
+            restrict_totals = len(levels) < len(HIERARCHY_LEVELS)
+            for timestamp, tech_id, status in zip(timestamps, tickets.assignees, tickets.status):
+                level = technician_hierarchy.get(tech_id)
+                if restrict_totals and level not in series.levels:
+                    continue
+                ordinal = timestamp // SECONDS_PER_DAY + EPOCH_ORDINAL if timestamp != MISSING else None
+                series.add_ordinal(ordinal, level, TICKET_STATUS_KEYS.get(status, "new"))
+
+            result = series.to_dict()
+            result["date_field"] = "modification" if filters.use_modification_date else "creation"
+            result["truncated"] = totalcount > len(tickets)
+            return result
+
+        except Exception as e:
+            self.logger.error(
+                f"Erro ao obter série de tickets: {str(e)}",
+                extra={"correlation_id": correlation_id},
+            )
+            raise
 
     def _process_technician_metrics(
         self,
         technician: Dict[str, Any],
-        tickets: List[Dict[str, Any]],
+        tickets: Union[TicketBatch, List[Dict[str, Any]]],
         correlation_id: Optional[str],
     ) -> Dict[str, Any]:
         """Processa métricas de um técnico."""
 
+        # Fronteira com o GLPI: tipos normalizados aqui, antes de virarem DTOs nas queries
         metrics = {
-            "id": technician.get("id"),
-            "name": technician.get("realname", "Desconhecido"),
+            "id": self._coerce_int(technician.get("id")),
+            "name": str(technician.get("realname") or "Desconhecido"),
             "total": len(tickets),
             "new": 0,
             "pending": 0,
@@ -600,60 +1100,56 @@ class GLPIMetricsAdapter:
         }
 
         # Contar por status
-        for ticket in tickets:
-            status = ticket.get("status", 1)
-            if status == 1:
-                metrics["new"] += 1
-            elif status == 2:
-                metrics["in_progress"] += 1
-            elif status == 3:
-                metrics["cancelled"] += 1
-            elif status == 4:
-                metrics["pending"] += 1
-            elif status == 5:
-                metrics["resolved"] += 1
-            elif status == 6:
-                metrics["closed"] += 1
+        if isinstance(tickets, TicketBatch):
+            status_counts = tickets.status_counts()
+        else:
+            status_counts = Counter(ticket.get("status", 1) for ticket in tickets)
+        for status, count in status_counts.items():
+            status_key = TICKET_STATUS_KEYS.get(status)
+            if status_key:
+                metrics[status_key] += count
 
         # Calcular tempo médio de resolução (simulado)
-        resolved_tickets = [t for t in tickets if t.get("status") == 5]
-        if resolved_tickets:
+        if metrics["resolved"]:
             # Usando valor padrão até implementação completa de cálculo de datas
             metrics["avg_resolution_time"] = 2.5
 
         # Última atividade
-        if tickets:
-            latest_ticket = max(tickets, key=lambda t: t.get("date_mod", "1970-01-01"))
+        if isinstance(tickets, TicketBatch):
+            if tickets:
+                metrics["last_activity"] = tickets.latest_date_mod()
+        elif tickets:
+            latest_ticket = max(tickets, key=lambda t: t.get("date_mod") or "1970-01-01")
             metrics["last_activity"] = latest_ticket.get("date_mod")
 
         return metrics
 
     def _process_ticket_metrics(
         self,
-        tickets_data: Dict[str, Any],
+        tickets_data: Union[TicketBatch, List[Dict[str, Any]]],
         filters: Optional[MetricsFilterDTO],
         correlation_id: Optional[str],
     ) -> Dict[str, Any]:
         """Processa métricas gerais de tickets."""
 
-        tickets = tickets_data if isinstance(tickets_data, list) else []
+        if isinstance(tickets_data, TicketBatch):
+            tickets = tickets_data
+        else:
+            tickets = TicketBatch.from_items(tickets_data if isinstance(tickets_data, list) else [])
 
-        # Obter tickets recentes para o dashboard
+        # Obter os 20 tickets modificados mais recentemente para o dashboard
         recent_tickets = []
-        if len(tickets) > 0:
-            # Ordenar por data de modificação e pegar os 20 mais recentes
-            sorted_tickets = sorted(tickets, key=lambda t: t.get("date_mod", "1970-01-01"), reverse=True)
-
-            for ticket in sorted_tickets[:20]:
-                recent_tickets.append(
-                    {
-                        "id": ticket.get("id"),
-                        "title": ticket.get("name", "Sem título"),
-                        "status": self._map_ticket_status(ticket.get("status", 1)),
-                        "created_at": ticket.get("date_creation"),
-                        "technician_id": ticket.get("users_id_assign"),
-                    }
-                )
+        for index in tickets.most_recent(20):
+            title = tickets.title(index)
+            recent_tickets.append(
+                {
+                    "id": tickets.ids[index] or None,
+                    "title": title if title is not None else "Sem título",
+                    "status": self._map_ticket_status(tickets.status[index]),
+                    "created_at": format_glpi_timestamp(tickets.date[index]),
+                    "technician_id": tickets.assignees[index] or None,
+                }
+            )
 
         return {"recent_tickets": recent_tickets}
 
@@ -675,6 +1171,23 @@ class GLPIMetricsAdapter:
 
         return hierarchy
 
+    @staticmethod
+    def _build_technician_name_index(users_data: Any) -> Dict[str, int]:
+        """Índice nome/login -> ID para resolver a coluna de técnico da search API."""
+        index: Dict[str, int] = {}
+        for user in users_data if isinstance(users_data, list) else []:
+            if not isinstance(user, dict) or not user.get("id"):
+                continue
+            user_id = user["id"]
+            firstname = user.get("firstname") or ""
+            realname = user.get("realname") or ""
+            # GLPI exibe "Sobrenome Nome" por padrão; "Nome Sobrenome" e o login também aparecem
+            for name in (user.get("name"), f"{realname} {firstname}", f"{firstname} {realname}", str(user_id)):
+                key = user_name_key(name or "")
+                if key:
+                    index.setdefault(key, user_id)
+        return index
+
     def _determine_user_level(self, user: Dict[str, Any]) -> str:
         """Determina o nível hierárquico de um usuário."""
         # TODO: Implementar lógica real baseada em:
@@ -768,6 +1281,13 @@ class GLPIMetricsAdapter:
         """Descobre IDs dos campos GLPI."""
         correlation_id = context.correlation_id if context else None
 
+        # Verificar cache
+        cache_valid = self._is_field_ids_cache_valid()
+        if context is not None:
+            context.record_cache(CACHE_LAYER_FIELD_IDS, hit=cache_valid)
+        if cache_valid:
+            return self._field_ids_cache
+
         try:
             # Obter opções de busca para tickets
             search_options = await self.api_client.make_request(
@@ -775,7 +1295,13 @@ class GLPIMetricsAdapter:
             )
 
             # Processar e mapear campos
-            return self._process_field_discovery(search_options, correlation_id)
+            field_ids = self._process_field_discovery(search_options, correlation_id)
+
+            # Atualizar cache
+            self._field_ids_cache = field_ids
+            self._field_ids_cache_expires_at = datetime.now() + timedelta(hours=1)
+
+            return field_ids
 
         except Exception as e:
             self.logger.error(
@@ -797,6 +1323,161 @@ class GLPIMetricsAdapter:
                 "description": 21,
             }
 
+    def _is_field_ids_cache_valid(self) -> bool:
+        """Verifica se o cache de IDs de campos é válido."""
+        return (
+            self._field_ids_cache is not None
+            and self._field_ids_cache_expires_at is not None
+            and datetime.now() < self._field_ids_cache_expires_at
+        )
+
+    def _projected_ticket_columns(
+        self, field_ids: Dict[str, int], extra_columns: Optional[Dict[str, int]] = None
+    ) -> Dict[str, int]:
+        """Colunas mínimas (chave compacta -> search option) usadas nas agregações."""
+        columns = {
+            "id": GLPI_TICKET_ID_FIELD,
+            "status": field_ids.get("status_id", 12),
+            "users_id_assign": field_ids.get("technician_id", 4),
+            "date_mod": field_ids.get("updated_date", 19),
+        }
+        if extra_columns:
+            columns.update(extra_columns)
+        return columns
+
+    def _build_projected_ticket_search_params(
+        self,
+        filters: Optional[MetricsFilterDTO],
+        field_ids: Dict[str, int],
+        extra_columns: Optional[Dict[str, int]] = None,
+    ) -> Dict[str, Any]:
+        """Constrói parâmetros da search API com projeção mínima para agregações."""
+        params = {
+            "range": "0-9999",  # Mesmo limite da consulta completa
+        }
+
+        # Forçar apenas as colunas consumidas pelos _process_*
+        for idx, field_id in enumerate(self._projected_ticket_columns(field_ids, extra_columns).values()):
+            params[f"forcedisplay[{idx}]"] = field_id
+
+        if not filters:
+            return params
+
+        self._apply_search_criteria(params, self._build_ticket_search_criteria(filters, field_ids))
+
+        # Limite e offset
+        if filters.limit:
+            end_range = min(filters.limit - 1, 9999)
+            start_range = filters.offset or 0
+            params["range"] = f"{start_range}-{start_range + end_range}"
+
+        return params
+
+    @staticmethod
+    def _filter_status_id(filters: Optional[MetricsFilterDTO]) -> Optional[int]:
+        """ID GLPI do status pedido nos filtros, se houver."""
+        if not filters or not filters.status:
+            return None
+        status_key = filters.status.lower() if isinstance(filters.status, str) else str(filters.status)
+        return FILTER_STATUS_IDS.get(status_key)
+
+    def _build_ticket_search_criteria(
+        self, filters: Optional[MetricsFilterDTO], field_ids: Dict[str, int]
+    ) -> List[tuple]:
+        """Critérios (field, searchtype, value) da search API derivados dos filtros."""
+        criteria = []
+        if not filters:
+            return criteria
+
+        # Filtros de data
+        date_field = field_ids.get("updated_date", 19) if filters.use_modification_date else field_ids.get("created_date", 15)
+        if filters.start_date:
+            criteria.append((date_field, "morethan", filters.start_date.strftime("%Y-%m-%d %H:%M:%S")))
+        if filters.end_date:
+            criteria.append((date_field, "lessthan", filters.end_date.strftime("%Y-%m-%d %H:%M:%S")))
+
+        # Filtro de status
+        status_id = self._filter_status_id(filters)
+        if status_id is not None:
+            criteria.append((field_ids.get("status_id", 12), "equals", status_id))
+
+        # Filtro de técnico
+        if filters.technician_id:
+            criteria.append((field_ids.get("technician_id", 4), "equals", filters.technician_id))
+
+        # Filtro de categoria
+        if filters.category_id:
+            criteria.append((field_ids.get("category_id", 5), "equals", filters.category_id))
+
+        # Filtro de prioridade
+        if filters.priority:
+            criteria.append((field_ids.get("priority_id", 3), "equals", filters.priority))
+
+        return criteria
+
+    @staticmethod
+    def _apply_search_criteria(params: Dict[str, Any], criteria: List[tuple]) -> None:
+        """
+        Serializa critérios no formato criteria[i][...] da search API.
+
+        Um valor lista vira um grupo aninhado de ORs sobre o mesmo campo.
+        """
+        for idx, (field_id, searchtype, value) in enumerate(criteria):
+            prefix = f"criteria[{idx}]"
+            if idx > 0:
+                params[f"{prefix}[link]"] = "AND"
+
+            if isinstance(value, list):
+                for sub_idx, sub_value in enumerate(value):
+                    sub_prefix = f"{prefix}[criteria][{sub_idx}]"
+                    if sub_idx > 0:
+                        params[f"{sub_prefix}[link]"] = "OR"
+                    params[f"{sub_prefix}[field]"] = str(field_id)
+                    params[f"{sub_prefix}[searchtype]"] = searchtype
+                    params[f"{sub_prefix}[value]"] = str(sub_value)
+                continue
+
+            params[f"{prefix}[field]"] = str(field_id)
+            params[f"{prefix}[searchtype]"] = searchtype
+            params[f"{prefix}[value]"] = str(value)
+
+    def _decode_projected_tickets(
+        self,
+        search_response: Dict[str, Any],
+        field_ids: Dict[str, int],
+        correlation_id: Optional[str],
+        extra_columns: Optional[Dict[str, int]] = None,
+        batch: Optional[TicketBatch] = None,
+    ) -> TicketBatch:
+        """Decodifica linhas da search API em um TicketBatch (novo, ou ``batch`` se informado)."""
+        tickets = batch if batch is not None else TicketBatch()
+        skipped = tickets.extend_search_response(
+            search_response, self._projected_ticket_columns(field_ids, extra_columns), self._technician_ids_by_name
+        )
+
+        if skipped:
+            self.logger.warning(
+                f"{skipped} linhas de ticket ignoradas na decodificação da search API",
+                extra={"correlation_id": correlation_id},
+            )
+
+        return tickets
+
+    @staticmethod
+    def _coerce_int(value: Any) -> Optional[int]:
+        """Converte valor da search API para int, quando possível."""
+        if value is None or value == "":
+            return None
+        if isinstance(value, list):
+            # Colunas multivaloradas (ex.: vários técnicos) - usar o primeiro
+            value = value[0] if value else None
+            if value is None:
+                return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
     def _build_search_params_for_new_tickets(
         self, filters: Optional[MetricsFilterDTO], field_ids: Dict[str, int]
     ) -> Dict[str, Any]:
@@ -910,8 +1591,10 @@ class GLPIMetricsAdapter:
 
         return processed_tickets
 
-    def _get_col_value(self, row: List[Any], col_map: Dict[str, int], field_id: str, default: Any) -> Any:
+    def _get_col_value(self, row: Union[List[Any], Dict[str, Any]], col_map: Dict[str, int], field_id: str, default: Any) -> Any:
         """Extrai valor de coluna da linha de dados."""
+        if isinstance(row, dict):
+            return row.get(field_id, default)
         col_idx = col_map.get(field_id)
         if col_idx is not None and col_idx < len(row):
             return row[col_idx]
@@ -1061,9 +1744,15 @@ class GLPIMetricsAdapter:
 
     async def close(self) -> None:
         """Fecha conexões e limpa recursos."""
-        self.session_manager.close_session()  # Remove await - método é síncrono
+        # Sem killSession: o token é compartilhado com os demais workers
+        self.session_manager.release_session()
         self._technician_hierarchy_cache = None
         self._hierarchy_cache_expires_at = None
+        self._technician_ids_by_name = {}
+        self._field_ids_cache = None
+        self._field_ids_cache_expires_at = None
+        self.last_count_plan = None
+        self._cardinality_estimates = {}
 
 
 # Factory para criação do adapter
@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""
+Ticket Batch - Representação compacta, em colunas, de tickets do GLPI.
+
+Em vez de manter uma lista de dicts (um por ticket, com strings expandidas)
+durante toda a requisição, os tickets decodificados são guardados em arrays
+tipados paralelos (IDs, status, técnico, grupo, prioridade, datas em epoch)
+e os títulos em uma tabela de strings internadas. Os ``_process_*`` do
+adapter agregam direto sobre essas colunas.
+"""
+
+import heapq
+from array import array
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Valor ausente nas colunas numéricas (IDs do GLPI começam em 1)
+MISSING = 0
+
+# Datas do GLPI não têm fuso: o epoch é do relógio "de parede" do servidor
+_EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = _EPOCH.toordinal()
+SECONDS_PER_DAY = 86400
+GLPI_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Caches "YYYY-MM-DD" -> dias desde 1970 e "HH:MM:SS" -> segundos do dia
+_DAY_OFFSETS: Dict[str, int] = {}
+_DAY_OFFSETS_MAX = 100000
+_DAY_SECONDS: Dict[str, int] = {}
+
+# Chave da coluna projetada -> slot numérico do batch
+NUMERIC_COLUMNS = {
+    "id": "ids",
+    "status": "status",
+    "users_id_assign": "assignees",
+    "groups_id_assign": "groups",
+    "priority": "priorities",
+    "date_mod": "date_mod",
+    "date": "date",
+}
+TITLE_COLUMN = "name"
+
+# Separador de colunas multivaloradas na saída da search API
+MULTIVALUE_SEPARATOR = "$#$"
+
+
+def _to_int(value: Any) -> int:
+    """Valor da API -> int (colunas multivaloradas usam o primeiro); ausente vira MISSING."""
+    if type(value) is int:
+        return value
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if value is None or value == "":
+        return MISSING
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return MISSING
+
+
+def user_name_key(name: Any) -> str:
+    """Chave normalizada de nome/login de usuário (minúsculas, espaços colapsados)."""
+    return " ".join(str(name).split()).lower()
+
+
+def _resolve_user(value: Any, user_ids: Dict[str, int]) -> int:
+    """
+    ID de um usuário a partir do valor de coluna da search API.
+
+    Colunas de usuário vêm como nome de exibição ou login, não como ID: o
+    primeiro valor (colunas multivaloradas) é procurado em ``user_ids``, que
+    também mapeia o ID em texto; sem correspondência, vale o valor numérico.
+    """
+    if type(value) is int or not user_ids:
+        return _to_int(value)
+    first = value[0] if isinstance(value, list) and value else value
+    if first is None or first == "" or isinstance(first, list):
+        return MISSING
+    text = str(first).split(MULTIVALUE_SEPARATOR, 1)[0]
+    user_id = user_ids.get(user_name_key(text))
+    return user_id if user_id is not None else _to_int(text)
+
+
+def _is_multivalue(value: Any) -> bool:
+    """Coluna com mais de um valor (lista ou texto com ``MULTIVALUE_SEPARATOR``)."""
+    if isinstance(value, list):
+        return len(value) > 1 or (len(value) == 1 and _is_multivalue(value[0]))
+    return isinstance(value, str) and MULTIVALUE_SEPARATOR in value
+
+
+def _resolve_users(value: Any, user_ids: Dict[str, int]) -> List[int]:
+    """Todos os IDs de uma coluna de usuário multivalorada, sem repetição e na ordem da API."""
+    parts = value if isinstance(value, list) else [value]
+    resolved: List[int] = []
+    for part in parts:
+        for text in str(part).split(MULTIVALUE_SEPARATOR) if part not in (None, "") else ():
+            user_id = _resolve_user(text, user_ids)
+            if user_id != MISSING and user_id not in resolved:
+                resolved.append(user_id)
+    return resolved or [MISSING]
+
+
+def _to_small_int(value: Any) -> int:
+    """Como ``_to_int``, para colunas de 1 byte (status, prioridade); fora da faixa vira MISSING."""
+    number = _to_int(value)
+    return number if 0 <= number <= 255 else MISSING
+
+
+def glpi_timestamp(value: Any) -> int:
+    """Data do GLPI ("YYYY-MM-DD HH:MM:SS") -> segundos desde 1970; ausente/inválida vira MISSING."""
+    if not value:
+        return MISSING
+    text = value if isinstance(value, str) else str(value)
+
+    # Parse manual por fatias: datetime.fromisoformat por ticket domina o custo da decodificação
+    day_text = text[:10]
+    days = _DAY_OFFSETS.get(day_text)
+    if days is None:
+        try:
+            days = date.fromisoformat(day_text).toordinal() - EPOCH_ORDINAL
+        except ValueError:
+            return MISSING
+        if len(_DAY_OFFSETS) < _DAY_OFFSETS_MAX:
+            _DAY_OFFSETS[day_text] = days
+
+    time_text = text[11:19]
+    seconds = _DAY_SECONDS.get(time_text)
+    if seconds is None:
+        try:
+            seconds = int(time_text[0:2]) * 3600 + int(time_text[3:5]) * 60 + int(time_text[6:8] or 0)
+        except ValueError:
+            seconds = 0
+        if seconds < SECONDS_PER_DAY:
+            _DAY_SECONDS[time_text] = seconds
+    return days * SECONDS_PER_DAY + seconds
+
+
+def format_glpi_timestamp(timestamp: int) -> Optional[str]:
+    """Inverso de ``glpi_timestamp``."""
+    if timestamp == MISSING:
+        return None
+    return (_EPOCH + timedelta(seconds=timestamp)).strftime(GLPI_DATETIME_FORMAT)
+
+
+class TicketBatch:
+    """Tickets em arrays tipados paralelos; o índice i de cada array é o mesmo ticket."""
+
+    __slots__ = (
+        "ids",
+        "status",
+        "assignees",
+        "groups",
+        "priorities",
+        "date_mod",
+        "date",
+        "title_refs",
+        "titles",
+        "_title_index",
+        "extra_assignees",
+    )
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.status = array("B")
+        self.assignees = array("q")
+        self.groups = array("q")
+        self.priorities = array("B")
+        self.date_mod = array("q")
+        self.date = array("q")
+        # Índice em ``titles`` (-1 = sem título)
+        self.title_refs = array("i")
+        self.titles: List[str] = []
+        self._title_index: Dict[str, int] = {}
+        # Tickets com vários técnicos: índice -> técnicos além do primeiro (em ``assignees``)
+        self.extra_assignees: Dict[int, Tuple[int, ...]] = {}
+
+    @classmethod
+    def from_search_response(cls, search_response: Any, columns: Dict[str, int]) -> Tuple["TicketBatch", int]:
+        """Constrói um batch a partir de uma página da search API; retorna (batch, linhas ignoradas)."""
+        batch = cls()
+        skipped = batch.extend_search_response(search_response, columns)
+        return batch, skipped
+
+    @classmethod
+    def from_items(cls, items: Iterable[Dict[str, Any]]) -> "TicketBatch":
+        """Constrói um batch a partir de itens do endpoint REST ``Ticket``."""
+        batch = cls()
+        for item in items:
+            batch.append_item(item)
+        return batch
+
+    def append_item(self, item: Any) -> bool:
+        """Acrescenta um item do endpoint REST ``Ticket``; False se não for um objeto."""
+        if not isinstance(item, dict):
+            return False
+        self.append(
+            ticket_id=_to_int(item.get("id")),
+            status=_to_small_int(item.get("status")) or 1,
+            assignee=_to_int(item.get("users_id_assign")),
+            group=_to_int(item.get("groups_id_assign")),
+            priority=_to_small_int(item.get("priority")),
+            date_mod=glpi_timestamp(item.get("date_mod")),
+            date=glpi_timestamp(item.get("date_creation") or item.get("date")),
+            title=item.get("name"),
+        )
+        return True
+
+    def extend_search_response(
+        self, search_response: Any, columns: Dict[str, int], assignee_ids: Optional[Dict[str, int]] = None
+    ) -> int:
+        """
+        Acrescenta as linhas de uma página da search API.
+
+        ``columns`` mapeia chave projetada (ver ``NUMERIC_COLUMNS`` e ``name``)
+        para o search option; colunas não projetadas ficam como MISSING.
+        ``assignee_ids`` (nome/login normalizado -> ID, ver ``user_name_key``)
+        resolve a coluna de técnico, que a search API devolve por nome.
+        Retorna o número de linhas ignoradas.
+        """
+        if not isinstance(search_response, dict):
+            return 0
+        rows = search_response.get("data") or []
+        if not rows:
+            return 0
+
+        append_row = self.search_row_appender(columns, search_response.get("columns"), assignee_ids)
+        return sum(1 for row in rows if not append_row(row))
+
+    def search_row_appender(
+        self,
+        columns: Dict[str, int],
+        response_columns: Optional[List[Any]] = None,
+        assignee_ids: Optional[Dict[str, int]] = None,
+    ) -> Callable[[Any], bool]:
+        """
+        Função que acrescenta uma linha da search API (False se ignorada).
+
+        Linhas podem vir como dicts por field ID ou como listas alinhadas com
+        ``response_columns``; usada também linha a linha no modo streaming.
+        """
+        fields = {key: str(field_id) for key, field_id in columns.items()}
+        response_fields = [str(col) for col in response_columns or []]
+        id_field = fields.get("id")
+        status_field = fields.get("status")
+        assignee_field = fields.get("users_id_assign")
+        group_field = fields.get("groups_id_assign")
+        priority_field = fields.get("priority")
+        date_mod_field = fields.get("date_mod")
+        date_field = fields.get("date")
+        title_field = fields.get(TITLE_COLUMN)
+
+        # Caminho quente (uma chamada por linha): appends diretos nos arrays
+        ids_append = self.ids.append
+        status_append = self.status.append
+        assignees_append = self.assignees.append
+        groups_append = self.groups.append
+        priorities_append = self.priorities.append
+        date_mod_append = self.date_mod.append
+        date_append = self.date.append
+        title_refs_append = self.title_refs.append
+        intern_title = self._intern_title
+        user_ids = assignee_ids or {}
+        ids = self.ids
+        extra_assignees = self.extra_assignees
+
+        def append_row(row: Any) -> bool:
+            if isinstance(row, list):
+                row = dict(zip(response_fields, row))
+            elif not isinstance(row, dict):
+                return False
+
+            get = row.get
+            ids_append(_to_int(get(id_field)))
+            status_append(_to_small_int(get(status_field)) or 1)
+            assignee = get(assignee_field)
+            if _is_multivalue(assignee):
+                assignees = _resolve_users(assignee, user_ids)
+                assignees_append(assignees[0])
+                if len(assignees) > 1:
+                    extra_assignees[len(ids) - 1] = tuple(assignees[1:])
+            else:
+                assignees_append(_resolve_user(assignee, user_ids))
+            groups_append(_to_int(get(group_field)))
+            priorities_append(_to_small_int(get(priority_field)))
+            date_mod_append(glpi_timestamp(get(date_mod_field)))
+            date_append(glpi_timestamp(get(date_field)))
+            title_refs_append(intern_title(get(title_field)))
+            return True
+
+        return append_row
+
+    def append(
+        self,
+        ticket_id: int,
+        status: int,
+        assignee: int = MISSING,
+        group: int = MISSING,
+        priority: int = MISSING,
+        date_mod: int = MISSING,
+        date: int = MISSING,
+        title: Optional[str] = None,
+    ) -> None:
+        """Acrescenta um ticket já normalizado."""
+        self.ids.append(ticket_id)
+        self.status.append(status)
+        self.assignees.append(assignee)
+        self.groups.append(group)
+        self.priorities.append(priority)
+        self.date_mod.append(date_mod)
+        self.date.append(date)
+        self.title_refs.append(self._intern_title(title))
+
+    def extend(self, other: "TicketBatch") -> None:
+        """Concatena outro batch (ex.: páginas buscadas em paralelo)."""
+        offset = len(self.ids)
+        for index, extra in other.extra_assignees.items():
+            self.extra_assignees[offset + index] = extra
+        for slot in NUMERIC_COLUMNS.values():
+            getattr(self, slot).extend(getattr(other, slot))
+        remap = [self._intern_title(title) for title in other.titles]
+        self.title_refs.extend(remap[ref] if ref >= 0 else -1 for ref in other.title_refs)
+
+    def _intern_title(self, title: Optional[str]) -> int:
+        if title is None:
+            return -1
+        title = str(title)
+        ref = self._title_index.get(title)
+        if ref is None:
+            ref = len(self.titles)
+            self._title_index[title] = ref
+            self.titles.append(title)
+        return ref
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __bool__(self) -> bool:
+        return len(self.ids) > 0
+
+    def title(self, index: int) -> Optional[str]:
+        ref = self.title_refs[index]
+        return self.titles[ref] if ref >= 0 else None
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Ticket ``index`` como dict (mesmas chaves da projeção), para debug e compatibilidade."""
+        return {
+            "id": self.ids[index] or None,
+            "status": self.status[index],
+            "users_id_assign": self.assignees[index] or None,
+            "groups_id_assign": self.groups[index] or None,
+            "priority": self.priorities[index] or None,
+            "date_mod": format_glpi_timestamp(self.date_mod[index]),
+            "date": format_glpi_timestamp(self.date[index]),
+            "name": self.title(index),
+        }
+
+    def status_counts(self) -> Counter:
+        """Contagem por ID de status."""
+        return Counter(self.status)
+
+    def assignee_status_counts(self) -> Counter:
+        """Contagem por par (técnico, status); técnico MISSING = sem atribuição."""
+        return Counter(zip(self.assignees, self.status))
+
+    def multi_assignee_rows(self) -> Iterable[Tuple[int, Tuple[int, ...]]]:
+        """(status, todos os técnicos) dos tickets com mais de um técnico atribuído."""
+        for index, extra in self.extra_assignees.items():
+            yield self.status[index], (self.assignees[index],) + extra
+
+    def latest_date_mod(self) -> Optional[str]:
+        """Maior data de modificação, no formato do GLPI."""
+        return format_glpi_timestamp(max(self.date_mod)) if self.date_mod else None
+
+    def most_recent(self, limit: int) -> List[int]:
+        """Índices dos ``limit`` tickets modificados mais recentemente."""
+        return heapq.nlargest(limit, range(len(self.ids)), key=self.date_mod.__getitem__)
+
+    def nbytes(self) -> int:
+        """Tamanho aproximado dos dados (arrays + tabela de títulos)."""
+        arrays = (self.ids, self.status, self.assignees, self.groups, self.priorities, self.date_mod, self.date, self.title_refs)
+        return sum(column.itemsize * len(column) for column in arrays) + sum(len(title) for title in self.titles)
+
+    def __repr__(self) -> str:
+        return f"TicketBatch({len(self)} tickets, {len(self.titles)} titles)"
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Ticket Series - Agregação de tickets em janelas consecutivas (dia/semana/mês).
+
+Uma única busca cobre o intervalo inteiro; cada ticket é atribuído ao seu
+bucket em uma passada, por aritmética de datas, sem uma consulta por janela.
+A saída é colunar (uma lista por status) para manter o payload compacto.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+SERIES_GRANULARITIES = ("day", "week", "month")
+
+# Limite de buckets por série (um ano em granularidade diária)
+MAX_SERIES_BUCKETS = 366
+
+
+def _as_date(value: Union[date, datetime, str]) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def series_bucket_start(day: date, granularity: str) -> date:
+    """Início do bucket que contém ``day`` (semanas começam na segunda-feira)."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def series_bucket_starts(start: Union[date, datetime, str], end: Union[date, datetime, str], granularity: str) -> List[date]:
+    """Inícios de todos os buckets que cobrem [start, end]."""
+    if granularity not in SERIES_GRANULARITIES:
+        raise ValueError(f"Granularidade inválida: {granularity}")
+
+    current = series_bucket_start(_as_date(start), granularity)
+    last = _as_date(end)
+    starts = []
+    while current <= last:
+        starts.append(current)
+        if granularity == "day":
+            current += timedelta(days=1)
+        elif granularity == "week":
+            current += timedelta(days=7)
+        else:
+            current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+    return starts
+
+
+class TicketSeries:
+    """Acumulador de contagens nível × status × bucket."""
+
+    def __init__(
+        self,
+        start: Union[date, datetime, str],
+        end: Union[date, datetime, str],
+        granularity: str,
+        levels: Iterable[str],
+        status_keys: Iterable[str],
+    ):
+        self.granularity = granularity
+        self.start = _as_date(start)
+        self.end = _as_date(end)
+        self.bucket_starts = series_bucket_starts(self.start, self.end, granularity)
+        if len(self.bucket_starts) > MAX_SERIES_BUCKETS:
+            raise ValueError(
+                f"Série com {len(self.bucket_starts)} buckets excede o limite de {MAX_SERIES_BUCKETS}"
+            )
+
+        self.status_keys = list(status_keys)
+        size = len(self.bucket_starts)
+        self.levels = {level: self._empty_counts(size) for level in levels}
+        self.totals = self._empty_counts(size)
+        self.tickets = 0
+        self.skipped = 0
+
+        first = self.bucket_starts[0] if self.bucket_starts else self.start
+        self._first_ordinal = first.toordinal()
+        self._start_ordinal = self.start.toordinal()
+        self._end_ordinal = self.end.toordinal()
+        self._first_month = first.year * 12 + first.month - 1
+
+    def _empty_counts(self, size: int) -> Dict[str, List[int]]:
+        counts = {"total": [0] * size}
+        counts.update({status_key: [0] * size for status_key in self.status_keys})
+        return counts
+
+    def bucket_index(self, value: Optional[str]) -> Optional[int]:
+        """Índice do bucket para uma data do GLPI ("YYYY-MM-DD HH:MM:SS"), ou None se fora."""
+        if not value:
+            return None
+        try:
+            day = date.fromisoformat(str(value)[:10])
+        except ValueError:
+            return None
+        return self.ordinal_bucket_index(day.toordinal())
+
+    def ordinal_bucket_index(self, ordinal: int) -> Optional[int]:
+        """Índice do bucket para um dia em ``date.toordinal()``, ou None se fora."""
+        if ordinal < self._start_ordinal or ordinal > self._end_ordinal:
+            return None
+
+        if self.granularity == "day":
+            index = ordinal - self._first_ordinal
+        elif self.granularity == "week":
+            index = (ordinal - self._first_ordinal) // 7
+        else:
+            day = date.fromordinal(ordinal)
+            index = day.year * 12 + day.month - 1 - self._first_month
+        return index if 0 <= index < len(self.bucket_starts) else None
+
+    def add(self, date_value: Optional[str], level: Optional[str], status_key: str) -> None:
+        """Conta um ticket; ``level`` None conta apenas nos totais."""
+        self.add_at(self.bucket_index(date_value), level, status_key)
+
+    def add_ordinal(self, ordinal: Optional[int], level: Optional[str], status_key: str) -> None:
+        """Como ``add``, com o dia já em ``date.toordinal()`` (ex.: vindo de um TicketBatch)."""
+        self.add_at(self.ordinal_bucket_index(ordinal) if ordinal is not None else None, level, status_key)
+
+    def add_at(self, index: Optional[int], level: Optional[str], status_key: str) -> None:
+        """Conta um ticket no bucket ``index`` (None = fora do intervalo)."""
+        if index is None:
+            self.skipped += 1
+            return
+
+        self.tickets += 1
+        self.totals["total"][index] += 1
+        if status_key in self.totals:
+            self.totals[status_key][index] += 1
+
+        level_counts = self.levels.get(level) if level else None
+        if level_counts is not None:
+            level_counts["total"][index] += 1
+            if status_key in level_counts:
+                level_counts[status_key][index] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representação colunar: uma lista por status, alinhada com ``buckets``."""
+        return {
+            "granularity": self.granularity,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "buckets": [bucket.isoformat() for bucket in self.bucket_starts],
+            "levels": self.levels,
+            "totals": self.totals,
+            "tickets": self.tickets,
+        }
@@ -3,6 +3,9 @@ Gunicorn configuration for production-quality benchmark testing
 """
 
 import multiprocessing
+import os
+
+from utils.prometheus_multiprocess import compact_dead_worker, prepare_multiprocess_dir
 
 # Server socket
 bind = "0.0.0.0:5000"
@@ -38,3 +41,19 @@ worker_tmp_dir = "/dev/shm"  # Use memory for temporary files
 limit_request_line = 4094
 limit_request_fields = 100
 limit_request_field_size = 8190
+
+# Prometheus multiprocess mode: per-worker mmap files under worker_tmp_dir, merged on scrape.
+# Must be set before preload_app imports prometheus_client.
+prepare_multiprocess_dir(os.environ.get("PROMETHEUS_MULTIPROC_DIR", os.path.join(worker_tmp_dir, "glpi_prometheus")))
+
+
+def child_exit(server, worker):
+    """Drop live gauges of an exited worker and fold its counters/histograms into the archive files."""
+    compact_dead_worker(worker.pid)
+
+
+def post_fork(server, worker):
+    """Start the resource sampler in each worker (threads started by the preloaded master do not survive the fork)."""
+    from utils.resource_sampler import resource_sampler
+
+    resource_sampler.ensure_started()
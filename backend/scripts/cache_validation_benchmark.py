@@ -36,7 +36,11 @@ class CacheValidationBenchmark:
     def reset_server_metrics(self) -> bool:
         """Reset server metrics for clean measurement."""
         try:
-            response = self.session.get(f"{self.base_url}/api/metrics/server/reset", timeout=10)
+            response = self.session.post(
+                f"{self.base_url}/api/metrics/server/reset",
+                headers={"X-Debug-Token": os.environ.get("DEBUG_API_TOKEN", "")},
+                timeout=10,
+            )
             return response.status_code == 200
         except:
             return False
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Redaction Benchmark - Per-pattern vs compiled/memoized SensitiveDataRedactor
+Compares the redaction cost of realistic request payloads (headers, query params, log records, errors)
+"""
+
+import json
+import os
+import random
+import re
+import statistics
+import string
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.structured_logging import SensitiveDataRedactor  # noqa: E402
+
+
+class LegacyRedactor:
+    """Caminho anterior: um re.match por padrão de campo e um search por padrão de valor, sem memo."""
+
+    FIELD_PATTERNS = SensitiveDataRedactor.SENSITIVE_FIELD_PATTERNS
+    VALUE_PATTERNS = SensitiveDataRedactor.SENSITIVE_VALUE_PATTERNS
+
+    @classmethod
+    def is_sensitive_field(cls, field_name: str) -> bool:
+        field_lower = field_name.lower()
+        if any(check in field_lower for check in ["password", "token", "secret", "key", "auth"]):
+            return True
+        return any(re.match(pattern, field_lower) for pattern in cls.FIELD_PATTERNS)
+
+    @classmethod
+    def placeholder(cls, field_name: str, value: Any) -> str:
+        field_lower = field_name.lower()
+        for pattern, placeholder in cls.FIELD_PATTERNS.items():
+            if re.match(pattern, field_lower):
+                return placeholder
+        if isinstance(value, str) and len(value) > 8:
+            return f"{value[:3]}***{value[-3:]}"
+        return "***REDACTED***"
+
+    @classmethod
+    def redact_string_value(cls, value: str) -> str:
+        if len(value) < 8:
+            return value
+        for pattern in cls.VALUE_PATTERNS:
+            if pattern.search(value):
+                return f"{value[:4]}***REDACTED***{value[-4:]}" if len(value) > 20 else "***REDACTED***"
+        return value
+
+    @classmethod
+    def redact_data(cls, data: Any, max_depth: int = 10) -> Any:
+        if max_depth <= 0:
+            return "***MAX_DEPTH_REACHED***"
+        if data is None or isinstance(data, (bool, int, float)):
+            return data
+        if isinstance(data, dict):
+            redacted = {}
+            for key, value in data.items():
+                key = str(key)
+                if cls.is_sensitive_field(key):
+                    redacted[key] = cls.placeholder(key, value)
+                else:
+                    redacted[key] = cls.redact_data(value, max_depth - 1)
+            return redacted
+        if isinstance(data, list):
+            return [cls.redact_data(item, max_depth - 1) for item in data]
+        if isinstance(data, str):
+            return cls.redact_string_value(data)
+        return data
+
+    @classmethod
+    def redact_exception_message(cls, message: str) -> str:
+        for pattern in cls.VALUE_PATTERNS:
+            message = pattern.sub("***REDACTED***", message)
+        return SensitiveDataRedactor.redact_url(message)
+
+
+class RedactionBenchmark:
+    """Benchmark of the redaction paths using synthetic request payloads."""
+
+    def __init__(self, payload_count: int = 2000, iterations: int = 5, seed: int = 42):
+        self.payload_count = payload_count
+        self.iterations = iterations
+        self.random = random.Random(seed)
+        self.payloads = [self._build_payload(i) for i in range(payload_count)]
+        self.messages = [self._build_message(i) for i in range(payload_count)]
+        self.results = {
+            "timestamp": datetime.now().isoformat(),
+            "payload_count": payload_count,
+            "iterations": iterations,
+            "before": {},
+            "after": {},
+            "comparison": {},
+        }
+
+    def _token(self, length: int) -> str:
+        return "".join(self.random.choice(string.ascii_lowercase + string.digits) for _ in range(length))
+
+    def _build_payload(self, index: int) -> Dict[str, Any]:
+        """Registro de log como o middleware/JSONFormatter monta: headers, params e campos do request."""
+        return {
+            "timestamp": "2024-05-01T12:00:00.000000Z",
+            "level": "INFO",
+            "logger": "glpi_dashboard.api",
+            "message": f"API Request: GET /api/metrics/dashboard - {self.random.choice([200, 200, 200, 304, 500])}",
+            "module": "observability_middleware",
+            "function": "_after_request",
+            "correlation_id": f"{self._token(8)}-{self._token(4)}-{self._token(4)}-{self._token(4)}-{self._token(12)}",
+            "headers": {
+                "Host": "dashboard.local:5000",
+                "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate, br",
+                "Authorization": f"Bearer {self._token(40)}",
+                "X-Request-ID": str(index),
+            },
+            "query_params": {
+                "start_date": "2024-01-01",
+                "end_date": "2024-03-31",
+                "level": self.random.choice(["N1", "N2", "N3", "N4"]),
+                "limit": "50",
+            },
+            "operation": {"operation": "get_dashboard_metrics", "filters": {"status": "open", "group_id": index % 17}},
+            "response_time_ms": self.random.uniform(5, 500),
+            "status_code": 200,
+        }
+
+    def _build_message(self, index: int) -> str:
+        if index % 10 == 0:
+            return f"Falha ao autenticar no GLPI: user_token={self._token(40)} via https://glpi.local/apirest.php"
+        return f"Erro ao buscar tickets do técnico {index}: timeout após {self.random.randint(1, 30)}s"
+
+    def before(self) -> List[Any]:
+        return [LegacyRedactor.redact_data(payload) for payload in self.payloads] + [
+            LegacyRedactor.redact_exception_message(message) for message in self.messages
+        ]
+
+    def after(self) -> List[Any]:
+        return [SensitiveDataRedactor.redact_data(payload) for payload in self.payloads] + [
+            SensitiveDataRedactor.redact_exception_message(message) for message in self.messages
+        ]
+
+    def _fuzz_equivalence(self, samples: int = 20000) -> bool:
+        """Strings aleatórias (com fragmentos sensíveis) devem ter o mesmo veredito nos dois caminhos."""
+        fragments = ["bearer ", "eyJ", ".", "-", "://", "@", ":", "=", "password", "KEY", "akia", "/", "+", " ", "_"]
+        for _ in range(samples):
+            parts = [self.random.choice(fragments) if self.random.random() < 0.3 else self._token(self.random.randint(1, 25))]
+            while self.random.random() < 0.7:
+                parts.append(self.random.choice(fragments) if self.random.random() < 0.4 else self._token(self.random.randint(1, 25)))
+            text = "".join(parts)
+            if LegacyRedactor.redact_string_value(text) != SensitiveDataRedactor._redact_string_value(text):
+                return False
+            if LegacyRedactor.is_sensitive_field(text) != SensitiveDataRedactor._is_sensitive_field(text):
+                return False
+        return True
+
+    def _time_ms(self, func: Callable[[], Any]) -> Dict[str, float]:
+        samples = []
+        for _ in range(self.iterations):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+        return {
+            "mean_ms": statistics.mean(samples),
+            "min_ms": min(samples),
+            "per_payload_us": statistics.mean(samples) * 1000 / (2 * self.payload_count),
+        }
+
+    def run(self) -> Dict[str, Any]:
+        print("🚀 Redaction Benchmark")
+        print(f"Payloads: {self.payload_count} | Iterations: {self.iterations}")
+        print("=" * 60)
+
+        self.results["before"] = self._time_ms(self.before)
+        self.results["after"] = self._time_ms(self.after)
+        after_mean = self.results["after"]["mean_ms"]
+        self.results["comparison"] = {"speedup": self.results["before"]["mean_ms"] / after_mean if after_mean else 0}
+
+        # Sanidade: mesma saída nos payloads e mesmo veredito em strings aleatórias
+        self.results["same_output"] = self.before() == self.after()
+        self.results["fuzz_equivalent"] = self._fuzz_equivalence()
+        return self.results
+
+    def print_results(self) -> None:
+        before = self.results["before"]
+        after = self.results["after"]
+
+        print("\n⏱️  Redaction (mean per run):")
+        print(f"   Before (per pattern):  {before['mean_ms']:.1f} ms ({before['per_payload_us']:.1f} µs/item)")
+        print(f"   After (compiled+memo): {after['mean_ms']:.1f} ms ({after['per_payload_us']:.1f} µs/item)")
+        print(f"   ✅ Speedup:            {self.results['comparison']['speedup']:.1f}x")
+
+        print(f"\n🔎 Same output: {self.results['same_output']} | Fuzz equivalent: {self.results['fuzz_equivalent']}")
+
+    def save_results(self, filename: Optional[str] = None) -> str:
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"redaction_benchmark_{timestamp}.json"
+
+        filepath = os.path.join(os.path.dirname(__file__), filename)
+        with open(filepath, "w") as f:
+            json.dump(self.results, f, indent=2)
+
+        print(f"\n💾 Results saved to: {filepath}")
+        return filepath
+
+
+def main():
+    """Main benchmark execution."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Per-pattern vs compiled/memoized redaction benchmark")
+    parser.add_argument("--payloads", type=int, default=2000, help="Number of synthetic request payloads")
+    parser.add_argument("--iterations", type=int, default=5, help="Iterations per measurement")
+    parser.add_argument("--output", help="Output filename for results")
+
+    args = parser.parse_args()
+
+    benchmark = RedactionBenchmark(args.payloads, args.iterations)
+    benchmark.run()
+    benchmark.print_results()
+    if args.output:
+        benchmark.save_results(args.output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
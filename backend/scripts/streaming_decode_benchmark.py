@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Streaming Decode Benchmark - Buffered vs incremental decoding of large GLPI responses
+Compares peak memory and time of decoding a synthetic search/Ticket response into the adapter
+"""
+
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.infrastructure.external.glpi.json_stream import StreamingJSONArrayDecoder  # noqa: E402
+from core.infrastructure.external.glpi.metrics_adapter import GLPIConfig, GLPIMetricsAdapter  # noqa: E402
+from core.infrastructure.external.glpi.ticket_batch import TicketBatch  # noqa: E402
+
+
+class StreamingDecodeBenchmark:
+    """Benchmark of the response decoding paths using a synthetic search/Ticket payload."""
+
+    def __init__(self, ticket_count: int = 50000, chunk_size: int = 65536, iterations: int = 3, seed: int = 42):
+        self.ticket_count = ticket_count
+        self.chunk_size = chunk_size
+        self.iterations = iterations
+        self.random = random.Random(seed)
+        self.adapter = GLPIMetricsAdapter(GLPIConfig(base_url="http://glpi.local", app_token="bench", user_token="bench"))
+        self.field_ids = self.adapter._process_field_discovery({}, None)
+        self.columns = self.adapter._projected_ticket_columns(self.field_ids, {"date": self.field_ids.get("created_date", 15)})
+        self.hierarchy = {tech_id: self.adapter._determine_user_level({"id": tech_id}) for tech_id in range(2, 42)}
+        self.results = {
+            "timestamp": datetime.now().isoformat(),
+            "ticket_count": ticket_count,
+            "chunk_size": chunk_size,
+            "iterations": iterations,
+            "response_bytes": 0,
+            "paths": {},
+            "comparison": {},
+        }
+
+    def _random_date(self) -> str:
+        delta = timedelta(minutes=self.random.randint(0, 60 * 24 * 365))
+        return (datetime(2024, 1, 1) + delta).strftime("%Y-%m-%d %H:%M:%S")
+
+    def build_chunks(self) -> List[bytes]:
+        """Simulate the search/Ticket body as it arrives from the network, in chunks."""
+        rows = []
+        for ticket_id in range(1, self.ticket_count + 1):
+            rows.append(
+                {
+                    str(self.columns["id"]): ticket_id,
+                    str(self.columns["status"]): self.random.randint(1, 6),
+                    str(self.columns["users_id_assign"]): str(self.random.randint(2, 41)),
+                    str(self.columns["date_mod"]): self._random_date(),
+                    str(self.columns["date"]): self._random_date(),
+                }
+            )
+        body = json.dumps({"totalcount": self.ticket_count, "count": self.ticket_count, "data": rows}).encode("utf-8")
+        self.results["response_bytes"] = len(body)
+        return [body[i : i + self.chunk_size] for i in range(0, len(body), self.chunk_size)]
+
+    # Caminho bufferizado: corpo inteiro + texto + árvore decodificada, depois o batch
+    def buffered(self, chunks: List[bytes]) -> Dict[str, Any]:
+        body = b"".join(chunks)
+        text = body.decode("utf-8")
+        tree = json.loads(text)
+        batch = self.adapter._decode_projected_tickets(tree, self.field_ids, None, {"date": self.columns["date"]})
+        return self.adapter._process_tickets_by_hierarchy(batch, self.hierarchy, None)
+
+    # Caminho anterior ao TicketBatch: além da árvore, uma lista de dicts por ticket
+    def buffered_dicts(self, chunks: List[bytes]) -> Dict[str, Any]:
+        body = b"".join(chunks)
+        text = body.decode("utf-8")
+        tree = json.loads(text)
+        fields = {key: str(field_id) for key, field_id in self.columns.items()}
+        tickets = [{key: row.get(field_id) for key, field_id in fields.items()} for row in tree["data"]]
+        for ticket in tickets:
+            ticket["users_id_assign"] = self.adapter._coerce_int(ticket["users_id_assign"])
+        return self.adapter._process_tickets_by_hierarchy(tickets, self.hierarchy, None)
+
+    # Caminho streaming: cada linha vai direto para o batch conforme os pedaços chegam
+    def streaming(self, chunks: List[bytes]) -> Dict[str, Any]:
+        batch = TicketBatch()
+        append_row = batch.search_row_appender(self.columns)
+        decoder = StreamingJSONArrayDecoder("data")
+        for chunk in chunks:
+            for row in decoder.feed(chunk):
+                append_row(row)
+        for row in decoder.close():
+            append_row(row)
+        return self.adapter._process_tickets_by_hierarchy(batch, self.hierarchy, None)
+
+    def _measure(self, func: Callable[[List[bytes]], Any], chunks: List[bytes]) -> Dict[str, Any]:
+        tracemalloc.start()
+        result = func(chunks)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        samples = []
+        for _ in range(self.iterations):
+            start = time.perf_counter()
+            func(chunks)
+            samples.append((time.perf_counter() - start) * 1000)
+
+        return {
+            "peak_mb": peak / 1024 / 1024,
+            "mean_ms": statistics.mean(samples),
+            "min_ms": min(samples),
+            "result": result,
+        }
+
+    def run(self) -> Dict[str, Any]:
+        print("🚀 Streaming Decode Benchmark")
+        print(f"Tickets: {self.ticket_count} | Chunk: {self.chunk_size} bytes | Iterations: {self.iterations}")
+        print("=" * 60)
+
+        chunks = self.build_chunks()
+        paths = {
+            "buffered_dicts": self._measure(self.buffered_dicts, chunks),
+            "buffered_batch": self._measure(self.buffered, chunks),
+            "streaming_batch": self._measure(self.streaming, chunks),
+        }
+
+        # Sanidade: os três caminhos agregam igual
+        results = [path.pop("result") for path in paths.values()]
+        self.results["same_output"] = all(result == results[0] for result in results)
+        self.results["paths"] = paths
+
+        baseline = paths["buffered_dicts"]
+        streaming = paths["streaming_batch"]
+        self.results["comparison"] = {
+            "peak_reduction_percent": (1 - streaming["peak_mb"] / baseline["peak_mb"]) * 100 if baseline["peak_mb"] else 0,
+            "peak_reduction_vs_buffered_batch_percent": (
+                (1 - streaming["peak_mb"] / paths["buffered_batch"]["peak_mb"]) * 100 if paths["buffered_batch"]["peak_mb"] else 0
+            ),
+            "time_ratio": streaming["mean_ms"] / baseline["mean_ms"] if baseline["mean_ms"] else 0,
+        }
+        return self.results
+
+    def print_results(self) -> None:
+        paths = self.results["paths"]
+        comp = self.results["comparison"]
+
+        print(f"\n📦 Response size: {self.results['response_bytes'] / 1024 / 1024:.2f} MB")
+
+        print("\n🧠 Peak memory (decode + aggregation):")
+        print(f"   Buffered + dicts:    {paths['buffered_dicts']['peak_mb']:.2f} MB")
+        print(f"   Buffered + batch:    {paths['buffered_batch']['peak_mb']:.2f} MB")
+        print(f"   Streaming + batch:   {paths['streaming_batch']['peak_mb']:.2f} MB")
+        print(f"   ✅ Reduction:        {comp['peak_reduction_percent']:.1f}%")
+
+        print("\n⏱️  Time (mean):")
+        print(f"   Buffered + dicts:    {paths['buffered_dicts']['mean_ms']:.1f} ms")
+        print(f"   Buffered + batch:    {paths['buffered_batch']['mean_ms']:.1f} ms")
+        print(f"   Streaming + batch:   {paths['streaming_batch']['mean_ms']:.1f} ms")
+
+        print(f"\n🔎 Same aggregation output: {self.results['same_output']}")
+
+    def save_results(self, filename: Optional[str] = None) -> str:
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"streaming_decode_benchmark_{timestamp}.json"
+
+        filepath = os.path.join(os.path.dirname(__file__), filename)
+        with open(filepath, "w") as f:
+            json.dump(self.results, f, indent=2)
+
+        print(f"\n💾 Results saved to: {filepath}")
+        return filepath
+
+
+def main():
+    """Main benchmark execution."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Buffered vs streaming GLPI response decoding benchmark")
+    parser.add_argument("--tickets", type=int, default=50000, help="Number of synthetic tickets")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="Network chunk size in bytes")
+    parser.add_argument("--iterations", type=int, default=3, help="Iterations per timing measurement")
+    parser.add_argument("--output", help="Output filename for results")
+
+    args = parser.parse_args()
+
+    benchmark = StreamingDecodeBenchmark(args.tickets, args.chunk_size, args.iterations)
+    benchmark.run()
+    benchmark.print_results()
+    if args.output:
+        benchmark.save_results(args.output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
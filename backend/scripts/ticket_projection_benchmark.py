@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Ticket Projection Benchmark - Full /Ticket dump vs projected search/Ticket
+Compares bytes transferred, JSON parse time and aggregation time of both paths
+"""
+
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.infrastructure.external.glpi.metrics_adapter import GLPIConfig, GLPIMetricsAdapter  # noqa: E402
+
+
+class TicketProjectionBenchmark:
+    """Benchmark of the aggregate ticket fetch paths using synthetic GLPI payloads."""
+
+    def __init__(self, ticket_count: int = 10000, technician_count: int = 40, iterations: int = 5, seed: int = 42):
+        self.ticket_count = ticket_count
+        self.technician_count = technician_count
+        self.iterations = iterations
+        self.random = random.Random(seed)
+        self.adapter = GLPIMetricsAdapter(GLPIConfig(base_url="http://glpi.local", app_token="bench", user_token="bench"))
+        self.field_ids = self.adapter._process_field_discovery({}, None)
+        self.hierarchy = {tech_id: self.adapter._determine_user_level({"id": tech_id}) for tech_id in self._technician_ids()}
+        self.results = {
+            "timestamp": datetime.now().isoformat(),
+            "ticket_count": ticket_count,
+            "iterations": iterations,
+            "full_ticket": {},
+            "projected_search": {},
+            "comparison": {},
+        }
+
+    def _technician_ids(self) -> List[int]:
+        return list(range(2, 2 + self.technician_count))
+
+    def _random_date(self) -> str:
+        delta = timedelta(minutes=self.random.randint(0, 60 * 24 * 90))
+        return (datetime(2024, 1, 1) + delta).strftime("%Y-%m-%d %H:%M:%S")
+
+    def build_full_payload(self) -> List[Dict[str, Any]]:
+        """Simulate GET Ticket?expand_dropdowns=true&with_devices=true."""
+        tickets = []
+        for ticket_id in range(1, self.ticket_count + 1):
+            tickets.append(
+                {
+                    "id": ticket_id,
+                    "entities_id": "Entidade Raiz > CC-SE-SUBADM-DTIC",
+                    "name": f"Chamado de suporte {ticket_id}",
+                    "date": self._random_date(),
+                    "closedate": None,
+                    "solvedate": None,
+                    "date_mod": self._random_date(),
+                    "users_id_lastupdater": "tecnico.suporte",
+                    "status": self.random.randint(1, 6),
+                    "users_id_recipient": "usuario.solicitante",
+                    "requesttypes_id": "Helpdesk",
+                    "content": "<p>Descrição detalhada do problema relatado pelo usuário.</p>" * 4,
+                    "urgency": 3,
+                    "impact": 3,
+                    "priority": self.random.randint(1, 6),
+                    "itilcategories_id": "Infraestrutura > Rede > Conectividade",
+                    "type": 1,
+                    "global_validation": 1,
+                    "slas_id_ttr": "SLA Padrão",
+                    "locations_id": "Prédio Sede > 2º andar > Sala 201",
+                    "users_id_assign": self.random.choice(self._technician_ids()),
+                    "date_creation": self._random_date(),
+                    "_devices": {
+                        "Item_DeviceProcessor": {str(ticket_id): {"designation": "Intel Core i5", "frequency": 2400}},
+                        "Item_DeviceMemory": {str(ticket_id): {"designation": "DDR4 8GB", "size": 8192}},
+                        "Item_DeviceHardDrive": {str(ticket_id): {"designation": "SSD 256GB", "capacity": 256000}},
+                    },
+                }
+            )
+        return tickets
+
+    def build_projected_payload(self) -> Dict[str, Any]:
+        """Simulate search/Ticket with the adapter's minimal forcedisplay set."""
+        columns = self.adapter._projected_ticket_columns(self.field_ids)
+        rows = []
+        for ticket_id in range(1, self.ticket_count + 1):
+            rows.append(
+                {
+                    str(columns["id"]): ticket_id,
+                    str(columns["status"]): self.random.randint(1, 6),
+                    str(columns["users_id_assign"]): self.random.choice(self._technician_ids()),
+                    str(columns["date_mod"]): self._random_date(),
+                }
+            )
+        return {"totalcount": self.ticket_count, "count": self.ticket_count, "data": rows}
+
+    def _time_ms(self, func: Callable[[], Any]) -> Dict[str, float]:
+        samples = []
+        for _ in range(self.iterations):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+        return {
+            "mean_ms": statistics.mean(samples),
+            "min_ms": min(samples),
+            "max_ms": max(samples),
+        }
+
+    def measure_full(self) -> Dict[str, Any]:
+        body = json.dumps(self.build_full_payload()).encode("utf-8")
+
+        def parse() -> Any:
+            return json.loads(body)
+
+        def parse_and_aggregate() -> Any:
+            return self.adapter._process_tickets_by_hierarchy(json.loads(body), self.hierarchy, None)
+
+        return {"bytes": len(body), "parse": self._time_ms(parse), "parse_and_aggregate": self._time_ms(parse_and_aggregate)}
+
+    def measure_projected(self) -> Dict[str, Any]:
+        body = json.dumps(self.build_projected_payload()).encode("utf-8")
+
+        def parse() -> Any:
+            return json.loads(body)
+
+        def parse_and_aggregate() -> Any:
+            tickets = self.adapter._decode_projected_tickets(json.loads(body), self.field_ids, None)
+            return self.adapter._process_tickets_by_hierarchy(tickets, self.hierarchy, None)
+
+        return {"bytes": len(body), "parse": self._time_ms(parse), "parse_and_aggregate": self._time_ms(parse_and_aggregate)}
+
+    def run(self) -> Dict[str, Any]:
+        print("🚀 Ticket Projection Benchmark")
+        print(f"Tickets: {self.ticket_count} | Technicians: {self.technician_count} | Iterations: {self.iterations}")
+        print("=" * 60)
+
+        full = self.measure_full()
+        projected = self.measure_projected()
+        self.results["full_ticket"] = full
+        self.results["projected_search"] = projected
+
+        self.results["comparison"] = {
+            "bytes_reduction_percent": (1 - projected["bytes"] / full["bytes"]) * 100 if full["bytes"] else 0,
+            "parse_speedup": full["parse"]["mean_ms"] / projected["parse"]["mean_ms"] if projected["parse"]["mean_ms"] else 0,
+            "total_speedup": (
+                full["parse_and_aggregate"]["mean_ms"] / projected["parse_and_aggregate"]["mean_ms"]
+                if projected["parse_and_aggregate"]["mean_ms"]
+                else 0
+            ),
+        }
+        return self.results
+
+    def print_results(self) -> None:
+        full = self.results["full_ticket"]
+        projected = self.results["projected_search"]
+        comp = self.results["comparison"]
+
+        print("\n📦 Bytes transferred:")
+        print(f"   Ticket (full):       {full['bytes'] / 1024 / 1024:.2f} MB")
+        print(f"   search/Ticket:       {projected['bytes'] / 1024 / 1024:.2f} MB")
+        print(f"   ✅ Reduction:        {comp['bytes_reduction_percent']:.1f}%")
+
+        print("\n⏱️  JSON parse (mean):")
+        print(f"   Ticket (full):       {full['parse']['mean_ms']:.2f} ms")
+        print(f"   search/Ticket:       {projected['parse']['mean_ms']:.2f} ms")
+        print(f"   ✅ Speedup:          {comp['parse_speedup']:.1f}x")
+
+        print("\n🧮 Parse + aggregation by hierarchy (mean):")
+        print(f"   Ticket (full):       {full['parse_and_aggregate']['mean_ms']:.2f} ms")
+        print(f"   search/Ticket:       {projected['parse_and_aggregate']['mean_ms']:.2f} ms")
+        print(f"   ✅ Speedup:          {comp['total_speedup']:.1f}x")
+
+    def save_results(self, filename: Optional[str] = None) -> str:
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"ticket_projection_benchmark_{timestamp}.json"
+
+        filepath = os.path.join(os.path.dirname(__file__), filename)
+        with open(filepath, "w") as f:
+            json.dump(self.results, f, indent=2)
+
+        print(f"\n💾 Results saved to: {filepath}")
+        return filepath
+
+
+def main():
+    """Main benchmark execution."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Full /Ticket vs projected search/Ticket benchmark")
+    parser.add_argument("--tickets", type=int, default=10000, help="Number of synthetic tickets")
+    parser.add_argument("--technicians", type=int, default=40, help="Number of synthetic technicians")
+    parser.add_argument("--iterations", type=int, default=5, help="Iterations per measurement")
+    parser.add_argument("--output", help="Output filename for results")
+
+    args = parser.parse_args()
+
+    benchmark = TicketProjectionBenchmark(args.tickets, args.technicians, args.iterations)
+    benchmark.run()
+    benchmark.print_results()
+    if args.output:
+        benchmark.save_results(args.output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
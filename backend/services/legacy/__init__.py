@@ -12,6 +12,7 @@ from .cache_service import GLPICacheService
 from .field_discovery_service import GLPIFieldDiscoveryService
 from .http_client_service import GLPIHttpClientService
 from .metrics_service import GLPIMetricsService
+from .technician_directory import GLPITechnicianDirectory
 from .dashboard_service import GLPIDashboardService
 from .trends_service import GLPITrendsService
 from .glpi_service_facade import GLPIServiceFacade
@@ -22,6 +23,7 @@ __all__ = [
     "GLPIFieldDiscoveryService",
     "GLPIHttpClientService",
     "GLPIMetricsService",
+    "GLPITechnicianDirectory",
     "GLPIDashboardService",
     "GLPITrendsService",
     "GLPIServiceFacade",
@@ -5,13 +5,16 @@ GLPI Authentication Service - Handles session management and authentication.
 Extracted from monolithic GLPIService for better separation of concerns.
 """
 import logging
+import threading
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import requests
 
 from config.settings import active_config
+from utils.prometheus_metrics import prometheus_metrics
+from utils.session_token_store import get_session_token_store, session_store_key
 from utils.structured_logger import create_glpi_logger
 from utils.structured_logging import log_glpi_request
 
@@ -45,6 +48,22 @@ class GLPIAuthenticationService:
         self.session_timeout = 3600  # 1 hour
         self.max_retries = 3
         self.retry_delay_base = 2
+
+        # Token compartilhado entre workers (e com o GLPISessionManager)
+        self.token_store = get_session_token_store()
+        self.token_store_key = session_store_key(self.glpi_url, self.user_token)
+
+        # Single-flight re-authentication: generation bumps on every token change
+        self._auth_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self.auth_generation = 0
+        self.auth_stats = {
+            "success": 0,
+            "failure": 0,
+            "coalesced": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
         
     def _normalize_glpi_url(self, url: str) -> str:
         """Normalize GLPI URL removing /apirest.php duplication."""
@@ -75,14 +94,85 @@ class GLPIAuthenticationService:
             self.logger.warning("Development mode - GLPI not configured")
             return False
             
-        if not self._is_token_expired():
+        # Shared store is the source of truth: another worker may have
+        # refreshed or invalidated the token since our last request
+        generation = self.auth_generation
+        if self._adopt_shared_token():
             return True
             
-        return self.authenticate()
+        return self.reauthenticate(generation)
         
     def authenticate(self) -> bool:
         """Authenticate with GLPI and get session token."""
-        return self._authenticate_with_retry()
+        # A valid shared token is reused; only a missing/expired one triggers a
+        # login, coalesced with any re-authentication already in flight
+        generation = self.auth_generation
+        if self._adopt_shared_token():
+            return True
+
+        return self.reauthenticate(generation)
+
+    def reauthenticate(self, stale_generation: Optional[int] = None) -> bool:
+        """
+        Single-flight re-authentication.
+
+        Only one thread talks to GLPI; threads that saw the same stale
+        generation wait on the lock and reuse the token it obtained.
+        """
+        wait_start = time.perf_counter()
+        with self._auth_lock:
+            wait_time = time.perf_counter() - wait_start
+
+            if stale_generation is not None and self.auth_generation != stale_generation and self.session_token:
+                self._record_auth("coalesced", wait_time)
+                return True
+
+            # Our current token is stale - drop it from the shared store (no-op if
+            # another worker already replaced it) so nobody else retries it
+            if self.session_token:
+                self.token_store.invalidate(self.token_store_key, self.session_token)
+
+            success = self._authenticate_with_retry()
+            self._record_auth("success" if success else "failure", wait_time)
+            return success
+
+    def _record_auth(self, result: str, wait_time: float) -> None:
+        """Update local auth stats and Prometheus metrics."""
+        self.auth_stats[result] += 1
+        self.auth_stats["wait_time_total"] += wait_time
+        self.auth_stats["wait_time_max"] = max(self.auth_stats["wait_time_max"], wait_time)
+        prometheus_metrics.record_glpi_auth(result, wait_time)
+
+    def get_auth_stats(self) -> Dict[str, Any]:
+        """Authentication counts and lock wait times."""
+        attempts = self.auth_stats["success"] + self.auth_stats["failure"] + self.auth_stats["coalesced"]
+        return {
+            **self.auth_stats,
+            "generation": self.auth_generation,
+            "wait_time_avg": self.auth_stats["wait_time_total"] / attempts if attempts else 0.0,
+            "token_store": self.token_store.get_stats(),
+        }
+
+    def _adopt_shared_token(self) -> bool:
+        """Use the shared token if valid, refreshing in background near expiry."""
+        record = self.token_store.get(self.token_store_key)
+        if not record:
+            return False
+
+        if record.remaining() <= self.token_store.refresh_margin_seconds:
+            self.token_store.refresh_in_background(self.token_store_key, self._request_session_token, self.session_timeout)
+
+        self._set_session(record)
+        return True
+
+    def _set_session(self, record) -> None:
+        """Mirror the shared token record locally."""
+        with self._state_lock:
+            if record.token != self.session_token:
+                self.auth_generation += 1
+            self.session_token = record.token
+            self.token_created_at = datetime.fromtimestamp(record.created_at)
+            self.token_expires_at = datetime.fromtimestamp(record.expires_at)
         
     def _authenticate_with_retry(self) -> bool:
         """Authenticate with exponential backoff retry."""
@@ -103,6 +193,15 @@ class GLPIAuthenticationService:
         return False
         
     def _perform_authentication(self) -> bool:
+        """Get a session token from the shared store, logging in only if no worker has one."""
+        record = self.token_store.get_or_refresh(self.token_store_key, self._request_session_token, self.session_timeout)
+        if not record:
+            return False
+
+        self._set_session(record)
+        return True
+
+    def _request_session_token(self) -> Optional[str]:
         """Perform the actual authentication request."""
         url = f"{self.glpi_url}/apirest.php/initSession"
         headers = {
@@ -126,62 +225,82 @@ class GLPIAuthenticationService:
             
             if response.status_code == 200:
                 data = response.json()
-                self.session_token = data.get("session_token")
-                self.token_created_at = datetime.now()
-                self.token_expires_at = None  # GLPI manages expiration
-                
                 self.logger.info(f"Authentication successful in {response_time:.2f}s")
-                return True
+                return data.get("session_token")
             else:
                 self.logger.error(f"Authentication failed: {response.status_code} - {response.text}")
-                return False
+                return None
                 
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Authentication request failed: {e}")
-            return False
+            return None
         except Exception as e:
             self.logger.error(f"Unexpected authentication error: {e}")
-            return False
+            return None
             
     def get_api_headers(self) -> Optional[Dict[str, str]]:
         """Get headers for authenticated API requests."""
+        return self.get_api_headers_with_generation()[0]
+
+    def get_api_headers_with_generation(self) -> Tuple[Optional[Dict[str, str]], int]:
+        """Get API headers plus the token generation they were built from."""
         if not self._ensure_authenticated():
-            return None
-            
-        return {
+            return None, self.auth_generation
+
+        with self._state_lock:
+            session_token = self.session_token
+            generation = self.auth_generation
+
+        headers = {
             "Content-Type": "application/json",
             "App-Token": self.app_token,
-            "Session-Token": self.session_token,
+            "Session-Token": session_token,
         }
+        return headers, generation
         
     def is_authenticated(self) -> bool:
         """Check if currently authenticated."""
         return not self._is_token_expired()
         
-    def logout(self) -> bool:
-        """Logout and invalidate session."""
+    def _clear_session(self) -> None:
+        """Drop the local token reference."""
+        with self._state_lock:
+            self.session_token = None
+            self.token_created_at = None
+            self.token_expires_at = None
+
+    def logout(self, global_logout: bool = False) -> bool:
+        """
+        Logout from GLPI.
+
+        The session token is shared by every worker through the token store, so
+        by default only the local reference is dropped. ``killSession`` is sent
+        (and the shared token invalidated) only on an explicit global logout.
+        """
         if not self.session_token:
             return True
-            
+
+        if not global_logout:
+            self._clear_session()
+            self.logger.info("Local session reference released")
+            return True
+
         try:
             url = f"{self.glpi_url}/apirest.php/killSession"
-            headers = self.get_api_headers()
-            
-            if headers:
-                response = requests.delete(url, headers=headers, timeout=30)
-                
-            # Always reset local session state
-            self.session_token = None
-            self.token_created_at = None
-            self.token_expires_at = None
-            
+            headers = {
+                "Content-Type": "application/json",
+                "App-Token": self.app_token,
+                "Session-Token": self.session_token,
+            }
+            requests.delete(url, headers=headers, timeout=30)
             self.logger.info("Session logged out successfully")
             return True
-            
+
         except Exception as e:
             self.logger.error(f"Logout error: {e}")
-            # Reset session state even on error
-            self.session_token = None
-            self.token_created_at = None
-            self.token_expires_at = None
-            return False
\ No newline at end of file
+            return False
+
+        finally:
+            # Always reset session state, even on error
+            self.token_store.invalidate(self.token_store_key, self.session_token)
+            self._clear_session()
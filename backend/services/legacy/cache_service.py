@@ -4,15 +4,34 @@ GLPI Cache Service - Handles caching logic for GLPI data.
 
 Extracted from monolithic GLPIService for better separation of concerns.
 """
+import threading
 import time
+from collections import OrderedDict
 from typing import Any, Dict, Optional
 
 
 class GLPICacheService:
     """Handles caching for GLPI service data."""
     
-    def __init__(self):
+    # Sub-key capacity per top-level key (LRU beyond this)
+    DEFAULT_MAX_SUB_KEYS = 1024
+    MAX_SUB_KEYS = {
+        "ticket_metrics": 4096,  # count cells: levels x statuses x periods
+        "active_technicians": 2048,
+        "dashboard_metrics": 256,
+    }
+    
+    def __init__(self, max_sub_keys: Optional[int] = None, sweep_interval: int = 60):
         """Initialize cache service."""
+        self.max_sub_keys = max_sub_keys
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.time()
+        self._lock = threading.RLock()
+        self._stats = {
+            "lru_evictions": 0,
+            "expired_removed": 0,
+            "sweeps": 0,
+        }
         self._cache = {
             "technician_ranking": {
                 "data": None,
@@ -80,19 +99,26 @@ class GLPICacheService:
     def _get_cache_data(self, cache_key: str, sub_key: str = None):
         """Get data from cache if valid."""
         try:
-            if not self._is_cache_valid(cache_key, sub_key):
-                return None
+            with self._lock:
+                if not self._is_cache_valid(cache_key, sub_key):
+                    if sub_key:
+                        # Lazy expiry: drop the stale sub-entry right away
+                        self._remove_expired_sub_key(cache_key, sub_key)
+                    return None
+                    
+                cache_entry = self._cache[cache_key]
                 
-            cache_entry = self._cache[cache_key]
-            
-            if sub_key:
-                if isinstance(cache_entry.get("data"), dict) and sub_key in cache_entry["data"]:
-                    sub_entry = cache_entry["data"][sub_key]
-                    if isinstance(sub_entry, dict):
-                        return sub_entry.get("data")
-                return None
-            else:
-                return cache_entry.get("data")
+                if sub_key:
+                    sub_entries = cache_entry.get("data")
+                    if isinstance(sub_entries, dict) and sub_key in sub_entries:
+                        sub_entry = sub_entries[sub_key]
+                        if isinstance(sub_entries, OrderedDict):
+                            sub_entries.move_to_end(sub_key)
+                        if isinstance(sub_entry, dict):
+                            return sub_entry.get("data")
+                    return None
+                else:
+                    return cache_entry.get("data")
                 
         except Exception:
             return None
@@ -102,31 +128,83 @@ class GLPICacheService:
         try:
             current_time = time.time()
             
-            if cache_key not in self._cache:
-                self._cache[cache_key] = {
-                    "data": None,
-                    "timestamp": None,
-                    "ttl": ttl,
-                }
-                
-            if sub_key:
-                if not isinstance(self._cache[cache_key]["data"], dict):
-                    self._cache[cache_key]["data"] = {}
+            with self._lock:
+                if cache_key not in self._cache:
+                    self._cache[cache_key] = {
+                        "data": None,
+                        "timestamp": None,
+                        "ttl": ttl,
+                    }
                     
-                self._cache[cache_key]["data"][sub_key] = {
-                    "data": data,
-                    "timestamp": current_time,
-                    "ttl": ttl,
-                }
-            else:
-                self._cache[cache_key]["data"] = data
-                self._cache[cache_key]["timestamp"] = current_time
-                if ttl != 300:  # Only update TTL if different from default
-                    self._cache[cache_key]["ttl"] = ttl
+                if sub_key:
+                    sub_entries = self._cache[cache_key]["data"]
+                    if not isinstance(sub_entries, OrderedDict):
+                        sub_entries = OrderedDict(sub_entries) if isinstance(sub_entries, dict) else OrderedDict()
+                        self._cache[cache_key]["data"] = sub_entries
+                        
+                    sub_entries[sub_key] = {
+                        "data": data,
+                        "timestamp": current_time,
+                        "ttl": ttl,
+                    }
+                    sub_entries.move_to_end(sub_key)
+                    
+                    # Bounded size: evict least recently used sub-keys
+                    capacity = self._get_sub_key_capacity(cache_key)
+                    while len(sub_entries) > capacity:
+                        sub_entries.popitem(last=False)
+                        self._stats["lru_evictions"] += 1
+                else:
+                    self._cache[cache_key]["data"] = data
+                    self._cache[cache_key]["timestamp"] = current_time
+                    if ttl != 300:  # Only update TTL if different from default
+                        self._cache[cache_key]["ttl"] = ttl
+                        
+                if current_time - self._last_sweep >= self.sweep_interval:
+                    self.sweep_expired()
                     
         except Exception as e:
             # Log cache errors but don't fail the operation
             pass
+
+    def _get_sub_key_capacity(self, cache_key: str) -> int:
+        """LRU capacity for the sub-keys of a top-level key."""
+        if self.max_sub_keys is not None:
+            return self.max_sub_keys
+        return self.MAX_SUB_KEYS.get(cache_key, self.DEFAULT_MAX_SUB_KEYS)
+
+    def _remove_expired_sub_key(self, cache_key: str, sub_key: str) -> None:
+        """Remove one sub-entry if it exists (called when found expired)."""
+        sub_entries = self._cache.get(cache_key, {}).get("data")
+        if isinstance(sub_entries, OrderedDict) and sub_key in sub_entries:
+            del sub_entries[sub_key]
+            self._stats["expired_removed"] += 1
+
+    def sweep_expired(self) -> int:
+        """Remove every expired sub-entry; returns how many were removed."""
+        removed = 0
+        current_time = time.time()
+        with self._lock:
+            for entry in self._cache.values():
+                sub_entries = entry.get("data")
+                if not isinstance(sub_entries, OrderedDict):
+                    continue
+                default_ttl = entry.get("ttl", 300)
+                expired = [
+                    sub_key
+                    for sub_key, sub_entry in sub_entries.items()
+                    if not isinstance(sub_entry, dict)
+                    or not sub_entry.get("timestamp")
+                    or current_time - sub_entry["timestamp"] >= sub_entry.get("ttl", default_ttl)
+                ]
+                for sub_key in expired:
+                    del sub_entries[sub_key]
+                removed += len(expired)
+                
+            self._stats["expired_removed"] += removed
+            self._stats["sweeps"] += 1
+            self._last_sweep = current_time
+        return removed
             
     def get_cached_data(self, cache_key: str, sub_key: str = None):
         """Public method to get cached data."""
@@ -139,20 +217,21 @@ class GLPICacheService:
     def invalidate_cache(self, cache_key: str = None, sub_key: str = None):
         """Invalidate specific cache entry or all cache."""
         try:
-            if cache_key is None:
-                # Clear all cache
-                for key in self._cache:
-                    self._cache[key]["data"] = None
-                    self._cache[key]["timestamp"] = None
-            elif cache_key in self._cache:
-                if sub_key and isinstance(self._cache[cache_key]["data"], dict):
-                    # Clear specific sub-key
-                    if sub_key in self._cache[cache_key]["data"]:
-                        del self._cache[cache_key]["data"][sub_key]
-                else:
-                    # Clear entire cache key
-                    self._cache[cache_key]["data"] = None
-                    self._cache[cache_key]["timestamp"] = None
+            with self._lock:
+                if cache_key is None:
+                    # Clear all cache
+                    for key in self._cache:
+                        self._cache[key]["data"] = None
+                        self._cache[key]["timestamp"] = None
+                elif cache_key in self._cache:
+                    if sub_key and isinstance(self._cache[cache_key]["data"], dict):
+                        # Clear specific sub-key
+                        if sub_key in self._cache[cache_key]["data"]:
+                            del self._cache[cache_key]["data"][sub_key]
+                    else:
+                        # Clear entire cache key
+                        self._cache[cache_key]["data"] = None
+                        self._cache[cache_key]["timestamp"] = None
                     
         except Exception:
             pass
@@ -163,15 +242,27 @@ class GLPICacheService:
             "total_keys": len(self._cache),
             "valid_entries": 0,
             "expired_entries": 0,
+            "total_sub_keys": 0,
+            "lru_evictions": self._stats["lru_evictions"],
+            "expired_removed": self._stats["expired_removed"],
+            "sweeps": self._stats["sweeps"],
             "cache_details": {}
         }
         
         current_time = time.time()
         
-        for key, entry in self._cache.items():
+        with self._lock:
+            entries = list(self._cache.items())
+            sub_key_counts = {
+                key: len(entry["data"]) for key, entry in entries if isinstance(entry.get("data"), OrderedDict)
+            }
+        
+        for key, entry in entries:
             timestamp = entry.get("timestamp")
             ttl = entry.get("ttl", 300)
             has_data = entry.get("data") is not None
+            sub_keys = sub_key_counts.get(key, 0)
+            stats["total_sub_keys"] += sub_keys
             
             if timestamp and has_data:
                 elapsed = current_time - timestamp
@@ -187,6 +278,8 @@ class GLPICacheService:
                     "is_valid": is_valid,
                     "elapsed_seconds": elapsed if timestamp else None,
                     "ttl_seconds": ttl,
+                    "sub_keys": sub_keys,
+                    "sub_key_capacity": self._get_sub_key_capacity(key),
                 }
             else:
                 stats["cache_details"][key] = {
@@ -194,6 +287,8 @@ class GLPICacheService:
                     "is_valid": False,
                     "elapsed_seconds": None,
                     "ttl_seconds": ttl,
+                    "sub_keys": sub_keys,
+                    "sub_key_capacity": self._get_sub_key_capacity(key),
                 }
                 
         return stats
\ No newline at end of file
@@ -5,12 +5,17 @@ GLPI HTTP Client Service - Handles HTTP requests to GLPI API.
 Extracted from monolithic GLPIService for better separation of concerns.
 """
 import logging
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from utils.prometheus_metrics import monitor_glpi_request
+from config.settings import active_config
+from utils.prometheus_metrics import prometheus_metrics
 from utils.structured_logging import log_glpi_request
 from .authentication_service import GLPIAuthenticationService
 
@@ -24,6 +29,60 @@ class GLPIHttpClientService:
         self.logger = logging.getLogger("glpi_http")
         self.max_retries = 3
         self.retry_delay_base = 2
+
+        # Connection pooling / bulk fan-out settings
+        config_obj = active_config()
+        self.pool_maxsize = int(getattr(config_obj, "GLPI_HTTP_POOL_MAXSIZE", 16))
+        self.bulk_chunk_size = int(getattr(config_obj, "GLPI_BULK_CHUNK_SIZE", 50))
+        self.bulk_max_workers = int(getattr(config_obj, "GLPI_BULK_MAX_WORKERS", 4))
+
+        # Created lazily per process: pooled sockets must not be shared across
+        # gunicorn workers forked from a preloaded app
+        self._session: Optional[requests.Session] = None
+        self._bulk_executor: Optional[ThreadPoolExecutor] = None
+        self._owner_pid: Optional[int] = None
+        self._pool_lock = threading.Lock()
+
+    def _ensure_process_resources(self) -> None:
+        """(Re)create pooled session and bulk executor for the current process."""
+        if self._owner_pid == os.getpid() and self._session is not None:
+            return
+
+        with self._pool_lock:
+            if self._owner_pid == os.getpid() and self._session is not None:
+                return
+
+            session = requests.Session()
+            # Retries are handled in _make_authenticated_request
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+
+            self._session = session
+            self._bulk_executor = ThreadPoolExecutor(max_workers=self.bulk_max_workers, thread_name_prefix="glpi-bulk")
+            self._owner_pid = os.getpid()
+
+    @property
+    def session(self) -> requests.Session:
+        """Pooled keep-alive session for the current process."""
+        self._ensure_process_resources()
+        return self._session
+
+    @property
+    def bulk_executor(self) -> ThreadPoolExecutor:
+        """Bounded thread pool shared by the bulk helpers."""
+        self._ensure_process_resources()
+        return self._bulk_executor
+
+    def close(self) -> None:
+        """Close pooled connections and the bulk thread pool."""
+        with self._pool_lock:
+            if self._session is not None and self._owner_pid == os.getpid():
+                self._session.close()
+                self._bulk_executor.shutdown(wait=False)
+            self._session = None
+            self._bulk_executor = None
+            self._owner_pid = None
         
     def _make_authenticated_request(
         self,
@@ -37,7 +96,7 @@ class GLPIHttpClientService:
     ) -> Tuple[bool, Optional[Dict], Optional[str], int]:
         """Make authenticated request to GLPI API with retry logic."""
         
-        headers = self.auth_service.get_api_headers()
+        headers, auth_generation = self.auth_service.get_api_headers_with_generation()
         if not headers:
             return False, None, "Authentication failed", 401
             
@@ -58,30 +117,20 @@ class GLPIHttpClientService:
             try:
                 start_time = time.time()
                 
-                # Log request if structured logger available
-                if self.auth_service.structured_logger:
-                    log_glpi_request(
-                        self.auth_service.structured_logger,
-                        method,
-                        url,
-                        list(headers.keys())
-                    )
-                
-                # Monitor with Prometheus if available
-                try:
-                    with monitor_glpi_request(endpoint, method):
-                        response = requests.request(method, url, **request_args)
-                except NameError:
-                    # Fallback if Prometheus not available
-                    response = requests.request(method, url, **request_args)
+                response = self.session.request(method, url, **request_args)
                 
                 response_time = time.time() - start_time
+
+                prometheus_metrics.record_glpi_request(endpoint, response.status_code, response_time)
+                if self.auth_service.structured_logger:
+                    log_glpi_request(endpoint, response.status_code, response_time, method=method)
                 
-                # Handle authentication expiry
+                # Handle authentication expiry (single-flight: concurrent 401s
+                # on the same token share one re-authentication)
                 if response.status_code == 401:
                     self.logger.warning("Session expired, re-authenticating...")
-                    if self.auth_service.authenticate():
-                        headers = self.auth_service.get_api_headers()
+                    if self.auth_service.reauthenticate(auth_generation):
+                        headers, auth_generation = self.auth_service.get_api_headers_with_generation()
                         if headers:
                             request_args["headers"] = headers
                             continue
@@ -177,19 +226,123 @@ class GLPIHttpClientService:
         params = {}
         
         if criteria:
-            # Convert criteria to GLPI search format
-            for key, value in criteria.items():
-                params[key] = value
+            # Convert criteria to GLPI search format (criteria[0][field]=...)
+            params = self._flatten_search_params(criteria)
                 
         return self.get(endpoint, params=params, **kwargs)
+
+    @classmethod
+    def _flatten_search_params(cls, value: Any, prefix: str = "") -> Dict[str, Any]:
+        """Flatten nested dicts/lists into GLPI bracket notation."""
+        if isinstance(value, dict):
+            items = value.items()
+        elif isinstance(value, (list, tuple)):
+            items = enumerate(value)
+        else:
+            return {prefix: value}
+
+        flat: Dict[str, Any] = {}
+        for key, item in items:
+            name = f"{prefix}[{key}]" if prefix else str(key)
+            flat.update(cls._flatten_search_params(item, name))
+        return flat
         
     def get_item(self, itemtype: str, item_id: int, **kwargs) -> Tuple[bool, Optional[Dict], Optional[str], int]:
         """Get specific item from GLPI."""
         endpoint = f"{itemtype}/{item_id}"
         return self.get(endpoint, **kwargs)
         
-    def get_items(self, itemtype: str, ids: List[int], **kwargs) -> Tuple[bool, Optional[Dict], Optional[str], int]:
-        """Get multiple items from GLPI."""
-        endpoint = f"{itemtype}"
-        params = {"ids": ids}
-        return self.get(endpoint, params=params, **kwargs)
\ No newline at end of file
+    def get_items(self, itemtype: str, ids: List[int], **kwargs) -> Tuple[bool, Optional[List[Dict]], Optional[str], int]:
+        """Get multiple items from GLPI (chunked getMultipleItems requests)."""
+        return self.get_multiple_items([(itemtype, item_id) for item_id in ids], **kwargs)
+
+    def get_multiple_items(
+        self,
+        items: List[Tuple[str, int]],
+        params: Optional[Dict[str, Any]] = None,
+        chunk_size: Optional[int] = None,
+        **kwargs,
+    ) -> Tuple[bool, Optional[List[Dict]], Optional[str], int]:
+        """
+        Fetch many (itemtype, id) pairs via getMultipleItems.
+
+        IDs are split into chunks and the chunks run concurrently on the bounded
+        bulk pool. Results keep the input order; on partial failure the items
+        from successful chunks are still returned alongside the first error.
+        """
+        if not items:
+            return True, [], None, 200
+
+        chunk_size = chunk_size or self.bulk_chunk_size
+        chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+        def fetch_chunk(chunk: List[Tuple[str, int]]) -> Tuple[bool, Optional[Any], Optional[str], int]:
+            chunk_params = dict(params or {})
+            for idx, (itemtype, item_id) in enumerate(chunk):
+                chunk_params[f"items[{idx}][itemtype]"] = itemtype
+                chunk_params[f"items[{idx}][items_id]"] = item_id
+            return self.get("getMultipleItems", params=chunk_params, **kwargs)
+
+        return self._merge_bulk_results(self._run_bulk(fetch_chunk, chunks), lambda data: data if isinstance(data, list) else [])
+
+    def search_all(
+        self,
+        itemtype: str,
+        criteria: Optional[Dict[str, Any]] = None,
+        page_size: int = 1000,
+        max_rows: int = 50000,
+        **kwargs,
+    ) -> Tuple[bool, Optional[Dict], Optional[str], int]:
+        """
+        Search returning every matching row.
+
+        The first page reveals totalcount; remaining pages are fetched
+        concurrently on the bulk pool and merged into a single response.
+        """
+        first_criteria = dict(criteria or {})
+        first_criteria["range"] = f"0-{page_size - 1}"
+        success, first_page, error, status_code = self.search(itemtype, first_criteria, **kwargs)
+        if not success or not isinstance(first_page, dict):
+            return success, first_page, error, status_code
+
+        total = min(int(first_page.get("totalcount", 0) or 0), max_rows)
+        page_criteria = []
+        for start in range(page_size, total, page_size):
+            page = dict(criteria or {})
+            page["range"] = f"{start}-{min(start + page_size, total) - 1}"
+            page_criteria.append(page)
+
+        rows = list(first_page.get("data") or [])
+        results = self._run_bulk(lambda page: self.search(itemtype, page, **kwargs), page_criteria)
+        success, extra_rows, error, status_code = self._merge_bulk_results(
+            results, lambda data: (data or {}).get("data") or [] if isinstance(data, dict) else []
+        )
+        rows.extend(extra_rows)
+
+        merged = dict(first_page)
+        merged["data"] = rows
+        merged["count"] = len(rows)
+        return success, merged, error, status_code
+
+    def _run_bulk(self, func, chunks: List[Any]) -> List[Tuple[bool, Optional[Any], Optional[str], int]]:
+        """Run chunk requests on the bounded bulk pool, preserving order."""
+        if not chunks:
+            return []
+        if len(chunks) == 1:
+            return [func(chunks[0])]
+        return list(self.bulk_executor.map(func, chunks))
+
+    @staticmethod
+    def _merge_bulk_results(results, extract) -> Tuple[bool, List[Any], Optional[str], int]:
+        """Concatenate chunk payloads, reporting the first failure if any."""
+        merged: List[Any] = []
+        first_error: Optional[Tuple[str, int]] = None
+        for success, data, error, status_code in results:
+            if success:
+                merged.extend(extract(data))
+            elif first_error is None:
+                first_error = (error, status_code)
+
+        if first_error:
+            return False, merged, first_error[0], first_error[1]
+        return True, merged, None, 200
@@ -12,6 +12,7 @@ from utils.date_validator import DateValidator
 from .http_client_service import GLPIHttpClientService
 from .cache_service import GLPICacheService
 from .field_discovery_service import GLPIFieldDiscoveryService
+from .technician_directory import GLPITechnicianDirectory
 
 
 class GLPIMetricsService:
@@ -28,6 +29,7 @@ class GLPIMetricsService:
         self.cache_service = cache_service
         self.field_service = field_service
         self.logger = logging.getLogger("glpi_metrics")
+        self.technician_directory = GLPITechnicianDirectory(http_client)
         
         # Service level mappings
         self.service_levels = {
@@ -271,84 +273,126 @@ class GLPIMetricsService:
             
     def get_metrics_by_level(self, start_date: str = None, end_date: str = None) -> Dict[str, Any]:
         """Get metrics aggregated by service level."""
+        return self.get_metrics_by_level_for_periods([(start_date, end_date)])[0]
+
+    def get_metrics_by_level_for_periods(self, periods: List[Tuple[Optional[str], Optional[str]]]) -> List[Dict[str, Any]]:
+        """
+        Get metrics by service level for several periods in one parallel wave.
+
+        Every (period, level, status) count cell is planned up front,
+        deduplicated and executed concurrently on the HTTP client's bounded
+        bulk pool. Each cell goes through get_ticket_count, so it is cached
+        individually and reused by later calls sharing the same cell.
+        """
         try:
             # Set date defaults
-            if not start_date:
-                start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-            if not end_date:
-                end_date = datetime.now().strftime('%Y-%m-%d')
-                
-            # Check cache
-            cache_key = f"metrics_by_level_{start_date}_{end_date}"
-            cached_result = self.cache_service.get_cached_data("ticket_metrics", cache_key)
-            if cached_result:
-                return cached_result
-                
-            result = {
-                "start_date": start_date,
-                "end_date": end_date,
-                "levels": {},
-                "totals": {"total": 0, "resolved": 0, "pending": 0}
-            }
-            
-            # Get metrics for each service level
-            for level_name, group_id in self.service_levels.items():
-                level_metrics = {
-                    "total": 0,
-                    "resolved": 0, 
-                    "pending": 0,
-                    "group_id": group_id
-                }
-                
-                # Total tickets for this level
-                total_result = self.get_ticket_count(
-                    start_date=start_date,
-                    end_date=end_date,
-                    group_id=group_id,
-                    use_cache=True
+            default_start = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+            default_end = datetime.now().strftime('%Y-%m-%d')
+            periods = [(start_date or default_start, end_date or default_end) for start_date, end_date in periods]
+
+            results: List[Optional[Dict[str, Any]]] = [None] * len(periods)
+            pending_periods = []
+            for index, (start_date, end_date) in enumerate(periods):
+                # Check cache
+                cached_result = self.cache_service.get_cached_data("ticket_metrics", f"metrics_by_level_{start_date}_{end_date}")
+                if cached_result:
+                    results[index] = cached_result
+                else:
+                    pending_periods.append(index)
+
+            if not pending_periods:
+                return results
+
+            # Plan all count cells; dict keys dedupe repeated cells across periods
+            cells: Dict[Tuple[str, str, int, Optional[str]], None] = {}
+            for index in pending_periods:
+                start_date, end_date = periods[index]
+                for group_id in self.service_levels.values():
+                    for status in self._level_count_statuses():
+                        cells[(start_date, end_date, group_id, status)] = None
+
+            counts = self._execute_count_cells(list(cells))
+
+            for index in pending_periods:
+                start_date, end_date = periods[index]
+                result = self._assemble_metrics_by_level(start_date, end_date, counts)
+
+                # Cache result
+                self.cache_service.set_cached_data(
+                    "ticket_metrics", result, ttl=300, sub_key=f"metrics_by_level_{start_date}_{end_date}"
                 )
-                if total_result.get("success"):
-                    level_metrics["total"] = total_result.get("count", 0)
-                    
-                # Resolved tickets (status 5 or 6)
-                for status in ["Solucionado", "Fechado"]:
-                    resolved_result = self.get_ticket_count(
-                        start_date=start_date,
-                        end_date=end_date,
-                        group_id=group_id,
-                        status=status,
-                        use_cache=True
-                    )
-                    if resolved_result.get("success"):
-                        level_metrics["resolved"] += resolved_result.get("count", 0)
-                        
-                # Pending tickets (status 1-4)
-                for status in ["Novo", "Processando (atribuído)", "Processando (planejado)", "Pendente"]:
-                    pending_result = self.get_ticket_count(
-                        start_date=start_date,
-                        end_date=end_date,
-                        group_id=group_id,
-                        status=status,
-                        use_cache=True
-                    )
-                    if pending_result.get("success"):
-                        level_metrics["pending"] += pending_result.get("count", 0)
-                        
-                result["levels"][level_name] = level_metrics
-                
-                # Add to totals
-                result["totals"]["total"] += level_metrics["total"]
-                result["totals"]["resolved"] += level_metrics["resolved"]
-                result["totals"]["pending"] += level_metrics["pending"]
-                
-            # Cache result
-            self.cache_service.set_cached_data("ticket_metrics", result, ttl=300, sub_key=cache_key)
-            
-            return result
-            
+                results[index] = result
+
+            return results
+
         except Exception as e:
             self.logger.error(f"Error getting metrics by level: {e}")
-            return {"error": str(e), "levels": {}, "totals": {}}
+            return [{"error": str(e), "levels": {}, "totals": {}} for _ in periods]
+
+    @staticmethod
+    def _level_count_statuses() -> List[Optional[str]]:
+        """Statuses counted per level: None (total), resolved and pending ones."""
+        return [None, "Solucionado", "Fechado", "Novo", "Processando (atribuído)", "Processando (planejado)", "Pendente"]
+
+    def _execute_count_cells(
+        self, cells: List[Tuple[str, str, int, Optional[str]]]
+    ) -> Dict[Tuple[str, str, int, Optional[str]], int]:
+        """Run count cells concurrently with bounded parallelism."""
+
+        def count_cell(cell: Tuple[str, str, int, Optional[str]]) -> Dict[str, Any]:
+            start_date, end_date, group_id, status = cell
+            return self.get_ticket_count(
+                start_date=start_date,
+                end_date=end_date,
+                group_id=group_id,
+                status=status,
+                use_cache=True
+            )
+
+        cell_results = self.http_client.bulk_executor.map(count_cell, cells)
+
+        counts = {}
+        for cell, cell_result in zip(cells, cell_results):
+            counts[cell] = cell_result.get("count", 0) if cell_result.get("success") else 0
+        return counts
+
+    def _assemble_metrics_by_level(
+        self,
+        start_date: str,
+        end_date: str,
+        counts: Dict[Tuple[str, str, int, Optional[str]], int],
+    ) -> Dict[str, Any]:
+        """Build the metrics_by_level payload for one period from executed cells."""
+        result = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "levels": {},
+            "totals": {"total": 0, "resolved": 0, "pending": 0}
+        }
+
+        for level_name, group_id in self.service_levels.items():
+            level_metrics = {
+                "total": counts[(start_date, end_date, group_id, None)],
+                # Resolved tickets (status 5 or 6)
+                "resolved": sum(
+                    counts[(start_date, end_date, group_id, status)] for status in ["Solucionado", "Fechado"]
+                ),
+                # Pending tickets (status 1-4)
+                "pending": sum(
+                    counts[(start_date, end_date, group_id, status)]
+                    for status in ["Novo", "Processando (atribuído)", "Processando (planejado)", "Pendente"]
+                ),
+                "group_id": group_id
+            }
+
+            result["levels"][level_name] = level_metrics
+
+            # Add to totals
+            result["totals"]["total"] += level_metrics["total"]
+            result["totals"]["resolved"] += level_metrics["resolved"]
+            result["totals"]["pending"] += level_metrics["pending"]
+
+        return result
             
     def get_technician_name(self, tech_id: str) -> str:
         """Get technician name from ID."""
@@ -356,31 +400,13 @@ class GLPIMetricsService:
             if not tech_id or tech_id == "0":
                 return "Não atribuído"
                 
-            # Check cache first
-            cache_key = f"tech_name_{tech_id}"
-            cached_name = self.cache_service.get_cached_data("active_technicians", cache_key)
-            if cached_name:
-                return cached_name
-                
-            # Get from API
-            success, data, error, status_code = self.http_client.get_item("User", int(tech_id))
-            
-            if success and isinstance(data, dict):
-                # Extract name from response
-                name = data.get("name", f"Técnico {tech_id}")
-                if "firstname" in data and "realname" in data:
-                    firstname = data.get("firstname", "").strip()
-                    realname = data.get("realname", "").strip()
-                    if firstname and realname:
-                        name = f"{firstname} {realname}"
-                        
-                # Cache the name
-                self.cache_service.set_cached_data("active_technicians", name, ttl=600, sub_key=cache_key)
+            name = self.technician_directory.get_name(tech_id)
+            if name:
                 return name
-            else:
-                self.logger.warning(f"Failed to get technician name for ID {tech_id}: {error}")
-                return f"Técnico {tech_id}"
+                
+            self.logger.warning(f"Failed to get technician name for ID {tech_id}")
+            return f"Técnico {tech_id}"
                 
         except Exception as e:
             self.logger.error(f"Error getting technician name for {tech_id}: {e}")
-            return f"Técnico {tech_id}"
\ No newline at end of file
+            return f"Técnico {tech_id}"
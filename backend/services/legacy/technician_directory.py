@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+GLPI Technician Directory - In-memory ID -> name directory for GLPI users.
+
+Loads every active user in one paginated search, keeps it fresh with
+incremental refreshes by date_mod and resolves names with dict lookups.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .http_client_service import GLPIHttpClientService
+
+# User search options (fixed across GLPI versions)
+USER_FIELD_LOGIN = "1"
+USER_FIELD_ID = "2"
+USER_FIELD_IS_ACTIVE = "8"
+USER_FIELD_FIRSTNAME = "9"
+USER_FIELD_DATE_MOD = "19"
+USER_FIELD_REALNAME = "34"
+
+
+class GLPITechnicianDirectory:
+    """Bulk-loaded technician name directory."""
+
+    def __init__(
+        self,
+        http_client: GLPIHttpClientService,
+        refresh_interval: int = 300,
+        full_reload_interval: int = 3600,
+        page_size: int = 1000,
+    ):
+        """Initialize technician directory."""
+        self.http_client = http_client
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.page_size = page_size
+        self.logger = logging.getLogger("glpi_technician_directory")
+
+        self._names: Dict[str, str] = {}
+        self._unknown_ids: Set[str] = set()
+        self._last_date_mod: Optional[str] = None
+        self._loaded_at: Optional[float] = None
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "full_loads": 0,
+            "incremental_refreshes": 0,
+            "batched_lookups": 0,
+        }
+
+    @staticmethod
+    def format_name(user: Dict[str, Any], tech_id: str) -> str:
+        """Display name: 'firstname realname' when available, else login."""
+        firstname = str(user.get("firstname") or "").strip()
+        realname = str(user.get("realname") or "").strip()
+        if firstname and realname:
+            return f"{firstname} {realname}"
+        return user.get("name") or f"Técnico {tech_id}"
+
+    def get_name(self, tech_id: str) -> Optional[str]:
+        """Resolve a single technician name (None if GLPI does not know the ID)."""
+        return self.get_names([tech_id]).get(str(tech_id))
+
+    def get_names(self, tech_ids: Iterable[Any]) -> Dict[str, str]:
+        """Resolve many technician names; unseen IDs are fetched in one batch."""
+        self._ensure_fresh()
+
+        tech_ids = [str(tech_id) for tech_id in tech_ids]
+        names = {}
+        missing = []
+        for tech_id in tech_ids:
+            name = self._names.get(tech_id)
+            if name is not None:
+                names[tech_id] = name
+            elif tech_id not in self._unknown_ids:
+                missing.append(tech_id)
+
+        self.stats["hits"] += len(names)
+        if missing:
+            self.stats["misses"] += len(missing)
+            names.update(self._fetch_missing(missing))
+
+        return names
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Directory size, freshness and lookup stats."""
+        return {
+            **self.stats,
+            "size": len(self._names),
+            "unknown_ids": len(self._unknown_ids),
+            "last_date_mod": self._last_date_mod,
+            "loaded_at": self._loaded_at,
+            "refreshed_at": self._refreshed_at,
+        }
+
+    def _ensure_fresh(self) -> None:
+        """Full load on first use / periodically, incremental refresh in between."""
+        now = time.time()
+        if self._loaded_at is None:
+            # First load: block so callers do not fall back to per-ID requests
+            with self._lock:
+                if self._loaded_at is None:
+                    self._load(incremental=False)
+            return
+
+        needs_full = now - self._loaded_at >= self.full_reload_interval
+        needs_refresh = now - (self._refreshed_at or 0) >= self.refresh_interval
+        if not (needs_full or needs_refresh):
+            return
+
+        # Another thread is refreshing - keep serving the current directory
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._load(incremental=not needs_full)
+        finally:
+            self._lock.release()
+
+    def _load(self, incremental: bool) -> None:
+        """Paginated bulk load of users (all active, or modified since last load)."""
+        if incremental and self._last_date_mod:
+            criteria = [{"field": USER_FIELD_DATE_MOD, "searchtype": "morethan", "value": self._last_date_mod}]
+        else:
+            incremental = False
+            criteria = [{"field": USER_FIELD_IS_ACTIVE, "searchtype": "equals", "value": "1"}]
+
+        search_params = {
+            "criteria": criteria,
+            "forcedisplay": [USER_FIELD_ID, USER_FIELD_LOGIN, USER_FIELD_FIRSTNAME, USER_FIELD_REALNAME, USER_FIELD_DATE_MOD],
+        }
+        success, data, error, _ = self.http_client.search_all("User", search_params, page_size=self.page_size)
+
+        now = time.time()
+        self._refreshed_at = now
+        if not success or not isinstance(data, dict):
+            self.logger.warning(f"Failed to load technician directory: {error}")
+            if self._loaded_at is None:
+                # Avoid retrying the full load on every lookup; retry after refresh_interval
+                self._loaded_at = now - self.full_reload_interval + self.refresh_interval
+            return
+
+        names = {} if not incremental else dict(self._names)
+        last_date_mod = None if not incremental else self._last_date_mod
+        for row in data.get("data") or []:
+            tech_id = str(row.get(USER_FIELD_ID) or "")
+            if not tech_id:
+                continue
+            names[tech_id] = self.format_name(
+                {
+                    "name": row.get(USER_FIELD_LOGIN),
+                    "firstname": row.get(USER_FIELD_FIRSTNAME),
+                    "realname": row.get(USER_FIELD_REALNAME),
+                },
+                tech_id,
+            )
+            date_mod = row.get(USER_FIELD_DATE_MOD)
+            if date_mod and (last_date_mod is None or date_mod > last_date_mod):
+                last_date_mod = date_mod
+
+        # Swap in one assignment so readers never see a partial directory
+        self._names = names
+        self._last_date_mod = last_date_mod
+        if incremental:
+            self._unknown_ids -= set(names)
+            self.stats["incremental_refreshes"] += 1
+        else:
+            self._unknown_ids = set()
+            self._loaded_at = now
+            self.stats["full_loads"] += 1
+
+        self.logger.debug(f"Technician directory {'refreshed' if incremental else 'loaded'}: {len(names)} users")
+
+    def _fetch_missing(self, tech_ids: List[str]) -> Dict[str, str]:
+        """Batched lookup of IDs not in the directory (e.g. inactive users)."""
+        numeric_ids = [int(tech_id) for tech_id in tech_ids if tech_id.isdigit()]
+        self.stats["batched_lookups"] += 1
+        success, items, error, _ = self.http_client.get_items("User", numeric_ids)
+        if error:
+            self.logger.warning(f"Batched technician lookup failed: {error}")
+
+        found = {}
+        for user in items or []:
+            if isinstance(user, dict) and user.get("id") is not None:
+                tech_id = str(user["id"])
+                found[tech_id] = self.format_name(user, tech_id)
+
+        if found:
+            names = dict(self._names)
+            names.update(found)
+            self._names = names
+
+        # Only remember definitive misses; failed chunks are retried next time
+        if success:
+            self._unknown_ids.update(set(tech_ids) - set(found))
+
+        return found
@@ -63,9 +63,10 @@ class GLPITrendsService:
             
             self.logger.info(f"Calculating trends: Current({current_start} to {current_end}) vs Previous({previous_start} to {previous_end})")
             
-            # Get current period metrics
-            current_metrics = self.metrics_service.get_metrics_by_level(current_start, current_end)
-            previous_metrics = self.metrics_service.get_metrics_by_level(previous_start, previous_end)
+            # Get both periods in a single parallel wave
+            current_metrics, previous_metrics = self.metrics_service.get_metrics_by_level_for_periods(
+                [(current_start, current_end), (previous_start, previous_end)]
+            )
             
             if current_metrics.get("error") or previous_metrics.get("error"):
                 return {"error": "Failed to get metrics for trend calculation"}
@@ -220,21 +221,19 @@ class GLPITrendsService:
             }
             
             # Generate data points for each interval
+            intervals = []
             current_start = start_dt
             total_tickets = 0
             
             while current_start < end_dt:
                 current_end = min(current_start + timedelta(days=interval_days), end_dt)
+                intervals.append((current_start.strftime('%Y-%m-%d'), current_end.strftime('%Y-%m-%d')))
+                current_start = current_end
                 
-                interval_start_str = current_start.strftime('%Y-%m-%d')
-                interval_end_str = current_end.strftime('%Y-%m-%d')
-                
-                # Get metrics for this interval
-                interval_metrics = self.metrics_service.get_metrics_by_level(
-                    interval_start_str, 
-                    interval_end_str
-                )
-                
+            # Get metrics for all intervals in a single parallel wave
+            interval_results = self.metrics_service.get_metrics_by_level_for_periods(intervals)
+            
+            for (interval_start_str, interval_end_str), interval_metrics in zip(intervals, interval_results):
                 if not interval_metrics.get("error"):
                     interval_totals = interval_metrics.get("totals", {})
                     interval_total = interval_totals.get("total", 0)
@@ -246,8 +245,6 @@ class GLPITrendsService:
                         "metrics": interval_totals,
                         "levels": interval_metrics.get("levels", {})
                     })
-                    
-                current_start = current_end
                 
             # Calculate summary
             historical_data["summary"]["total_intervals"] = len(historical_data["data_points"])
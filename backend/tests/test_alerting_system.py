@@ -0,0 +1,108 @@
+"""Avaliação de alertas por tick: pior amostra do tick e nenhuma reavaliação sem amostras novas."""
+
+import pytest
+
+from utils import alerting_system
+from utils.alerting_system import AlertManager, AlertRule, AlertSeverity
+
+METRIC = "test_latency"
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(1000.0)
+    monkeypatch.setattr(alerting_system.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def manager():
+    manager = AlertManager()
+    manager.add_rule(
+        AlertRule(
+            name="high_latency",
+            description="Latência alta",
+            metric_name=METRIC,
+            threshold=90,
+            operator=">",
+            severity=AlertSeverity.HIGH,
+            duration=60,
+            cooldown=0,
+        )
+    )
+    return manager
+
+
+def record(manager, clock, at, value):
+    clock.now = at
+    manager.metric_collector.record_metric(METRIC, value)
+
+
+def tick(manager, clock, at):
+    clock.now = at
+    manager._evaluate_rules(at)
+
+
+class TestIdleMetric:
+    def test_single_sample_does_not_persist_through_silence(self, manager, clock):
+        record(manager, clock, 1000.2, 95)
+        for second in range(0, 120):
+            tick(manager, clock, 1000.5 + second)
+
+        assert manager.active_alerts == {}
+        # Condição iniciada no primeiro tick; os ticks ociosos não a reavaliam
+        assert manager._condition_start_times["high_latency_" + METRIC] == 1000.5
+
+    def test_silence_does_not_resolve_active_alert(self, manager, clock):
+        for second in range(0, 62):
+            record(manager, clock, 1000.2 + second, 95)
+            tick(manager, clock, 1000.5 + second)
+        assert "high_latency_" + METRIC in manager.active_alerts
+
+        for second in range(62, 100):
+            tick(manager, clock, 1000.5 + second)
+        assert "high_latency_" + METRIC in manager.active_alerts
+
+        record(manager, clock, 1100.2, 10)
+        tick(manager, clock, 1101.5)
+        assert manager.active_alerts == {}
+
+
+class TestSpikeWithinTick:
+    def test_spike_followed_by_normal_value_counts(self, manager, clock):
+        manager.rules["high_latency"].duration = 0
+        tick(manager, clock, 1000.0)
+        record(manager, clock, 1000.2, 95)
+        record(manager, clock, 1000.4, 10)
+        tick(manager, clock, 1001.0)
+
+        alert = manager.active_alerts["high_latency_" + METRIC]
+        assert alert.metric_value == 95
+
+    def test_low_threshold_rule_uses_minimum(self, manager, clock):
+        manager.add_rule(
+            AlertRule(
+                name="low_throughput",
+                description="Vazão baixa",
+                metric_name=METRIC,
+                threshold=20,
+                operator="<",
+                severity=AlertSeverity.MEDIUM,
+                duration=0,
+                cooldown=0,
+            )
+        )
+        tick(manager, clock, 1000.0)
+        record(manager, clock, 1000.2, 10)
+        record(manager, clock, 1000.4, 50)
+        tick(manager, clock, 1001.0)
+
+        assert manager.active_alerts["low_throughput_" + METRIC].metric_value == 10
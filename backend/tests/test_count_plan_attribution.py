@@ -0,0 +1,131 @@
+"""Contagem por hierarquia: fan-out e bulk atribuem tickets com vários técnicos da mesma forma."""
+
+import asyncio
+
+import pytest
+
+from core.infrastructure.external.glpi.count_planner import STRATEGY_BULK_FETCH, STRATEGY_COUNT_FANOUT
+from core.infrastructure.external.glpi.metrics_adapter import GLPIConfig, GLPIMetricsAdapter
+from core.infrastructure.external.glpi.ticket_batch import TicketBatch
+
+FIELD_IDS = {"status_id": 12, "technician_id": 4, "updated_date": 19, "created_date": 15}
+HIERARCHY = {6: "N1", 7: "N1", 9: "N2", 12: "N3"}
+NAMES = {"Silva João": 6, "Costa Pedro": 7, "Souza Maria": 9, "Lima Ana": 12}
+
+# (status, técnicos) - como a search API devolve: nomes, multivalorados com "$#$"
+TICKETS = [
+    (2, ["Silva João"]),
+    (2, ["Silva João", "Souza Maria"]),  # N1 e N2
+    (5, ["Silva João", "Costa Pedro"]),  # dois técnicos do mesmo nível: conta uma vez em N1
+    (1, ["Souza Maria", "Lima Ana", "Silva João"]),  # N2, N3 e N1
+    (4, []),  # sem técnico
+    (6, ["Lima Ana"]),
+]
+
+
+def search_page(tickets):
+    rows = [
+        {"2": index + 1, "12": status, "4": "$#$".join(names) or None, "19": "2024-05-01 10:00:00"}
+        for index, (status, names) in enumerate(tickets)
+    ]
+    return {"totalcount": len(rows), "count": len(rows), "data": rows}
+
+
+class FakeGLPI:
+    """Responde às buscas count-only e ao bulk projetado a partir de ``TICKETS``."""
+
+    def __init__(self, adapter, totalcount=None):
+        self.adapter = adapter
+        self.count_requests = []
+        self.bulk_requests = 0
+        self.totalcount = totalcount
+
+    async def count_tickets(self, criteria, correlation_id):
+        self.count_requests.append(criteria)
+        status = next(value for field, _, value in criteria if field == FIELD_IDS["status_id"])
+        technicians = set(next(value for field, _, value in criteria if field == FIELD_IDS["technician_id"]))
+        return sum(
+            1
+            for ticket_status, names in TICKETS
+            if ticket_status == status and technicians & {NAMES[name] for name in names}
+        )
+
+    async def search_with_total(self, filters, context):
+        self.bulk_requests += 1
+        batch = TicketBatch()
+        batch.extend_search_response(
+            search_page(TICKETS), self.adapter._projected_ticket_columns(FIELD_IDS), self.adapter._technician_ids_by_name
+        )
+        return batch, self.totalcount if self.totalcount is not None else len(batch)
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    adapter = GLPIMetricsAdapter(GLPIConfig(base_url="http://glpi.local/apirest.php", app_token="app", user_token="user"))
+    adapter._technician_ids_by_name = {name.lower(): tech_id for name, tech_id in NAMES.items()}
+
+    async def hierarchy(context=None):
+        return HIERARCHY
+
+    async def field_ids(context=None):
+        return FIELD_IDS
+
+    monkeypatch.setattr(adapter, "get_technician_hierarchy", hierarchy)
+    monkeypatch.setattr(adapter, "discover_field_ids", field_ids)
+    return adapter
+
+
+def run_plan(adapter, monkeypatch, max_concurrency, totalcount=None):
+    glpi = FakeGLPI(adapter, totalcount)
+    monkeypatch.setattr(adapter, "_count_tickets", glpi.count_tickets)
+    monkeypatch.setattr(adapter, "_search_projected_tickets_with_total", glpi.search_with_total)
+    adapter.count_planner.max_concurrency = max_concurrency
+    result = asyncio.run(adapter.get_ticket_count_by_hierarchy())
+    return result, glpi
+
+
+class TestHierarchyAttribution:
+    def test_bulk_and_fanout_agree_on_shared_tickets(self, adapter, monkeypatch):
+        # Sem cardinalidade conhecida: uma rodada de fan-out vs bulk
+        fanout, _ = run_plan(adapter, monkeypatch, max_concurrency=100)
+        adapter._cardinality_estimates.clear()
+        bulk, _ = run_plan(adapter, monkeypatch, max_concurrency=1)
+
+        assert fanout["query_plan"]["strategy"] == STRATEGY_COUNT_FANOUT
+        assert bulk["query_plan"]["strategy"] == STRATEGY_BULK_FETCH
+        assert fanout["levels"] == bulk["levels"]
+        assert bulk["levels"]["N1"]["total"] == 4
+        assert bulk["levels"]["N2"]["total"] == 2
+        assert bulk["levels"]["N3"]["total"] == 2
+        assert bulk["levels"]["N1"]["resolved"] == 1
+
+    def test_bulk_plan_issues_no_probe(self, adapter, monkeypatch):
+        _, glpi = run_plan(adapter, monkeypatch, max_concurrency=1)
+
+        assert glpi.bulk_requests == 1
+        assert glpi.count_requests == []
+
+    def test_fanout_plan_issues_only_cell_counts(self, adapter, monkeypatch):
+        _, glpi = run_plan(adapter, monkeypatch, max_concurrency=100)
+
+        # 3 níveis com técnicos (N4 vazio é pulado) x 6 status; nenhuma busca sem critério de técnico
+        assert glpi.bulk_requests == 0
+        assert len(glpi.count_requests) == 18
+        assert all(any(field == FIELD_IDS["technician_id"] for field, _, _ in criteria) for criteria in glpi.count_requests)
+
+    def test_truncated_bulk_falls_back_to_fanout(self, adapter, monkeypatch):
+        adapter.count_planner.max_bulk_rows = 5
+        result, glpi = run_plan(adapter, monkeypatch, max_concurrency=1, totalcount=50)
+
+        assert glpi.bulk_requests == 1
+        assert result["query_plan"]["strategy"] == STRATEGY_COUNT_FANOUT
+        assert result["query_plan"]["estimated_rows"] == 50
+
+    def test_observed_cardinality_drives_next_plan(self, adapter, monkeypatch):
+        adapter.count_planner.max_bulk_rows = 5
+        run_plan(adapter, monkeypatch, max_concurrency=1, totalcount=50)
+
+        # Segunda chamada já conhece a cardinalidade: vai direto ao fan-out
+        result, glpi = run_plan(adapter, monkeypatch, max_concurrency=1)
+        assert result["query_plan"]["strategy"] == STRATEGY_COUNT_FANOUT
+        assert glpi.bulk_requests == 0
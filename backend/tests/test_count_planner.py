@@ -0,0 +1,87 @@
+"""Planner de contagens: escolha entre fan-out count-only e bulk pelo custo estimado."""
+
+import pytest
+
+from core.infrastructure.external.glpi.count_planner import (
+    STRATEGY_BULK_FETCH,
+    STRATEGY_COUNT_FANOUT,
+    STRATEGY_EMPTY,
+    CountCell,
+    CountQueryPlanner,
+)
+
+STATUSES = [("new", 1), ("assigned", 2), ("planned", 3), ("pending", 4), ("solved", 5), ("closed", 6)]
+
+
+def cells_for(*levels):
+    return [CountCell(level, key, status_id) for level in levels for key, status_id in STATUSES]
+
+
+@pytest.fixture
+def planner():
+    # 24 células em ondas de 8: fan-out = 3 x 120 ms = 360 ms
+    return CountQueryPlanner(request_overhead_ms=120.0, row_cost_ms=0.05, max_concurrency=8, max_bulk_rows=10000)
+
+
+class TestCostChoice:
+    def test_small_cardinality_prefers_bulk(self, planner):
+        plan = planner.plan(cells_for("N1", "N2", "N3", "N4"), 2000, {"N1": 5, "N2": 5, "N3": 5, "N4": 5})
+
+        # bulk = 120 + 2000 x 0.05 = 220 ms < 360 ms
+        assert plan.strategy == STRATEGY_BULK_FETCH
+        assert plan.fanout_cost_ms == 360.0
+        assert plan.bulk_cost_ms == 220.0
+        assert plan.fanout_requests == 0
+
+    def test_large_cardinality_prefers_fanout(self, planner):
+        plan = planner.plan(cells_for("N1", "N2", "N3", "N4"), 8000, {"N1": 5, "N2": 5, "N3": 5, "N4": 5})
+
+        # bulk = 120 + 8000 x 0.05 = 520 ms > 360 ms
+        assert plan.strategy == STRATEGY_COUNT_FANOUT
+        assert plan.fanout_requests == 24
+
+    def test_tie_goes_to_fanout(self, planner):
+        plan = planner.plan(cells_for("N1", "N2", "N3", "N4"), 4800, {"N1": 5, "N2": 5, "N3": 5, "N4": 5})
+
+        assert plan.bulk_cost_ms == plan.fanout_cost_ms
+        assert plan.strategy == STRATEGY_COUNT_FANOUT
+
+    def test_unknown_cardinality_costs_one_bulk_request(self, planner):
+        plan = planner.plan(cells_for("N1", "N2"), None, {"N1": 5, "N2": 5})
+
+        assert plan.strategy == STRATEGY_BULK_FETCH
+        assert plan.bulk_cost_ms == 120.0
+        assert "desconhecida" in plan.reason
+
+    def test_unknown_cardinality_single_wave_fanout(self, planner):
+        planner.max_concurrency = 100
+        plan = planner.plan(cells_for("N1", "N2"), None, {"N1": 5, "N2": 5})
+
+        # Uma onda de fan-out empata com o custo mínimo do bulk
+        assert plan.strategy == STRATEGY_COUNT_FANOUT
+
+    def test_cardinality_above_bulk_range_forces_fanout(self, planner):
+        plan = planner.plan(cells_for("N1"), 50000, {"N1": 5})
+
+        assert plan.strategy == STRATEGY_COUNT_FANOUT
+
+
+class TestCellPruning:
+    def test_levels_without_technicians_are_skipped(self, planner):
+        plan = planner.plan(cells_for("N1", "N2", "N3", "N4"), 20000, {"N1": 5, "N2": 5, "N3": 5})
+
+        assert plan.fanout_requests == 18
+        assert {cell.level for cell in plan.skipped_cells} == {"N4"}
+        assert plan.to_dict()["cells"] == 24
+
+    def test_no_technicians_is_empty(self, planner):
+        plan = planner.plan(cells_for("N1", "N2"), 500, {})
+
+        assert plan.strategy == STRATEGY_EMPTY
+        assert len(plan.skipped_cells) == 12
+
+    def test_level_too_wide_for_criteria_uses_bulk(self, planner):
+        plan = planner.plan(cells_for("N1", "N2"), 20000, {"N1": 80, "N2": 5})
+
+        assert plan.strategy == STRATEGY_BULK_FETCH
+        assert "critério" in plan.reason
@@ -0,0 +1,71 @@
+"""Bundle do dashboard: seções com endpoint próprio usam as mesmas entradas de cache do endpoint."""
+
+import pytest
+
+from core.application.dto.metrics_dto import create_empty_dashboard_metrics, create_success_response
+from core.application.services import metrics_facade as facade_module
+from core.application.services.metrics_facade import MetricsFacade
+from core.infrastructure.cache.unified_cache import unified_cache
+
+
+class CountingQuery:
+    def __init__(self, data, calls):
+        self.data = data
+        self.calls = calls
+
+    async def execute(self, filters=None, context=None):
+        self.calls.append(filters)
+        return create_success_response(data=self.data)
+
+
+@pytest.fixture
+def facade(monkeypatch):
+    unified_cache.clear_all()
+    facade = MetricsFacade()
+    facade.use_mock_data = False
+    facade.calls = []
+    metrics = create_empty_dashboard_metrics()
+    metrics.total = 42
+
+    async def prefetch(self, context=None):
+        return None
+
+    monkeypatch.setattr(facade_module.SharedFetchDataSource, "prefetch", prefetch)
+    monkeypatch.setattr(
+        facade_module.MetricsQueryFactory,
+        "create_query_by_type",
+        lambda self, query_type: CountingQuery(metrics, facade.calls),
+    )
+    monkeypatch.setattr(
+        facade.query_factory, "create_dashboard_metrics_query", lambda: CountingQuery(metrics, facade.calls)
+    )
+    yield facade
+    unified_cache.clear_all()
+
+
+class TestBundleSharesEndpointCache:
+    def test_bundle_warms_endpoint(self, facade):
+        bundle = facade.get_dashboard_bundle(["metrics"], start_date="2024-05-01", end_date="2024-05-31")
+        assert bundle["sections"]["metrics"]["cached"] is False
+
+        result = facade.get_dashboard_metrics_with_filters(start_date="2024-05-01", end_date="2024-05-31")
+
+        assert result.total == 42
+        assert len(facade.calls) == 1
+
+    def test_endpoint_warms_bundle(self, facade):
+        facade.get_dashboard_metrics_with_date_filter(start_date="2024-05-01", end_date="2024-05-31")
+
+        bundle = facade.get_dashboard_bundle(["metrics"], start_date="2024-05-01", end_date="2024-05-31")
+
+        assert bundle["sections"]["metrics"]["cached"] is True
+        assert b'"total":42' in bytes(bundle["sections"]["metrics"]["data"].value).replace(b" ", b"")
+        assert len(facade.calls) == 1
+
+    def test_different_filters_do_not_share(self, facade):
+        facade.get_dashboard_metrics_with_date_filter(start_date="2024-05-01", end_date="2024-05-31")
+
+        bundle = facade.get_dashboard_bundle(["metrics"], start_date="2024-05-01", end_date="2024-05-31", status="novo")
+
+        assert bundle["sections"]["metrics"]["cached"] is False
+        assert len(facade.calls) == 2
@@ -0,0 +1,158 @@
+"""Decodificação incremental: qualquer fronteira de pedaço produz o mesmo resultado."""
+
+import asyncio
+import json
+import random
+
+import httpx
+import pytest
+
+from core.infrastructure.external.glpi import metrics_adapter
+from core.infrastructure.external.glpi.json_stream import JSONStreamError, StreamingJSONArrayDecoder
+from core.infrastructure.external.glpi.metrics_adapter import GLPIAPIClient, GLPIAPIError, GLPIConfig, GLPISessionManager
+
+# Página da search API com números em todas as formas que podem ser cortadas
+SEARCH_PAGE = (
+    '{"totalcount": 350.5, "count": 3, "ratio": -1.25e-3, "big": 1E+21,'
+    ' "data": [{"2": 101, "12": 2, "4": "Silva João", "score": 0.5},'
+    ' {"2": 102, "12": 5, "4": "Souza Maria$#$Silva João", "score": -12e2},'
+    ' [103, 1, null, true, false, 7]],'
+    ' "content-range": "0-2/3", "order": [1.0, 20]}'
+).encode("utf-8")
+
+
+def decode(chunks, item_key="data"):
+    decoder = StreamingJSONArrayDecoder(item_key)
+    items = []
+    for chunk in chunks:
+        items.extend(decoder.feed(chunk))
+    items.extend(decoder.close())
+    return items, decoder.envelope
+
+
+def split_at(payload, *points):
+    bounds = [0, *points, len(payload)]
+    return [payload[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def expected(payload, item_key="data"):
+    document = json.loads(payload)
+    if isinstance(document, list):
+        return document, {}
+    items = document.pop(item_key)
+    return items, document
+
+
+def random_value(rng, depth=0):
+    kind = rng.randrange(7 if depth < 3 else 5)
+    if kind == 0:
+        return rng.randint(-10**6, 10**6)
+    if kind == 1:
+        return rng.choice([0.5, -3.25, 1e-7, 6.02e23, -0.0, 350.0, float(rng.randint(0, 999)) / 8])
+    if kind == 2:
+        return rng.choice(["", "João", "a,b]c}", '"aspas"', "€ 1.5e3", "linha\nnova"])
+    if kind == 3:
+        return rng.choice([True, False, None])
+    if kind == 4:
+        return rng.randint(0, 9)
+    if kind == 5:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+    return {str(i): random_value(rng, depth + 1) for i in range(rng.randrange(4))}
+
+
+class TestChunkBoundaries:
+    def test_number_split_at_decimal_point(self):
+        items, envelope = decode([b'{"total":350.', b'5,"data":[1]}'])
+
+        assert envelope == {"total": 350.5}
+        assert items == [1]
+
+    def test_number_split_at_exponent(self):
+        items, _ = decode([b"[1e", b"3,2.5E", b"-2,7]"], item_key=None)
+
+        assert items == [1000.0, 0.025, 7]
+
+    @pytest.mark.parametrize("item_key", ["data", None])
+    def test_every_single_split_point(self, item_key):
+        payload = SEARCH_PAGE if item_key else json.dumps(json.loads(SEARCH_PAGE)["data"]).encode("utf-8")
+        want = expected(payload, item_key)
+
+        for point in range(1, len(payload)):
+            assert decode(split_at(payload, point), item_key) == want, point
+
+    def test_byte_by_byte(self):
+        payload = SEARCH_PAGE
+
+        assert decode([payload[i:i + 1] for i in range(len(payload))]) == expected(payload)
+
+    def test_multibyte_character_split(self):
+        payload = '["João", "€"]'.encode("utf-8")
+        cut = payload.index("ã".encode("utf-8")) + 1
+
+        assert decode(split_at(payload, cut), item_key=None)[0] == ["João", "€"]
+
+    def test_truncated_document_raises(self):
+        decoder = StreamingJSONArrayDecoder()
+        decoder.feed(b'{"data":[1,2')
+
+        with pytest.raises(JSONStreamError):
+            decoder.close()
+
+    def test_invalid_number_raises_on_close(self):
+        decoder = StreamingJSONArrayDecoder(None)
+        decoder.feed(b"[1.x]")
+
+        with pytest.raises(JSONStreamError):
+            decoder.close()
+
+
+class TestFuzz:
+    @pytest.mark.parametrize("seed", range(25))
+    def test_random_documents_random_chunks(self, seed):
+        rng = random.Random(seed)
+        item_key = rng.choice(["data", None])
+        items = [random_value(rng) for _ in range(rng.randrange(1, 30))]
+        document = items if item_key is None else {"totalcount": rng.random() * 1000, "data": items, "n": -7e-5}
+        separators = rng.choice([(",", ":"), (", ", ": ")])
+        payload = json.dumps(document, ensure_ascii=rng.random() < 0.5, separators=separators).encode("utf-8")
+        want = expected(payload, item_key)
+
+        for _ in range(20):
+            points = sorted(rng.sample(range(1, len(payload)), min(len(payload) - 1, rng.randrange(1, 12))))
+            assert decode(split_at(payload, *points), item_key) == want
+
+
+class TestStreamRequestErrors:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        config = GLPIConfig(base_url="http://glpi.local/apirest.php", app_token="app", user_token="user")
+        client = GLPIAPIClient(config, GLPISessionManager(config))
+
+        async def session_token(correlation_id=None):
+            return "token"
+
+        monkeypatch.setattr(client.session_manager, "get_session_token", session_token)
+        return client
+
+    def serve(self, monkeypatch, body):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+        real_client = httpx.AsyncClient
+        monkeypatch.setattr(metrics_adapter.httpx, "AsyncClient", lambda **kwargs: real_client(transport=transport, **kwargs))
+
+    def test_invalid_json_is_reported_as_such(self, client, monkeypatch):
+        self.serve(monkeypatch, b'{"data":[1,}')
+
+        with pytest.raises(GLPIAPIError, match="JSON inválida"):
+            asyncio.run(client.stream_request("search/Ticket", lambda item: None))
+
+    def test_callback_errors_are_not_json_errors(self, client, monkeypatch):
+        self.serve(monkeypatch, SEARCH_PAGE)
+
+        def on_item(item):
+            raise ValueError("linha rejeitada")
+
+        with pytest.raises(GLPIAPIError) as excinfo:
+            asyncio.run(client.stream_request("search/Ticket", on_item))
+
+        assert "JSON" not in str(excinfo.value)
+        assert "linha rejeitada" in str(excinfo.value)
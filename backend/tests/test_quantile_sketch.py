@@ -0,0 +1,138 @@
+"""Sketches de quantis: erro relativo, combinação, expiração da janela e merge entre workers."""
+
+import json
+import random
+
+import pytest
+
+from utils.quantile_sketch import LatencySketch, WindowedSketch
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+@pytest.fixture
+def latencies():
+    rng = random.Random(7)
+    # Mistura de requisições rápidas e uma cauda lenta, em segundos
+    return [rng.lognormvariate(-3, 1) for _ in range(5000)] + [rng.uniform(1, 5) for _ in range(100)]
+
+
+class TestLatencySketch:
+    @pytest.mark.parametrize("q", [0.5, 0.9, 0.95, 0.99, 0.999])
+    def test_quantile_within_relative_accuracy(self, latencies, q):
+        sketch = LatencySketch(relative_accuracy=0.01)
+        for value in latencies:
+            sketch.record(value)
+
+        expected = exact_quantile(latencies, q)
+        assert sketch.quantile(q) == pytest.approx(expected, rel=0.01)
+
+    def test_quantiles_matches_quantile(self, latencies):
+        sketch = LatencySketch()
+        for value in latencies:
+            sketch.record(value)
+
+        qs = [0.99, 0.5, 0.0, 1.0, 0.9]
+        assert sketch.quantiles(qs) == {q: sketch.quantile(q) for q in qs}
+
+    def test_extremes_and_zero_bucket(self):
+        sketch = LatencySketch()
+        for value in [0.0, 0.0, 0.0, 0.2, 0.4]:
+            sketch.record(value)
+
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1.0) == 0.4
+        assert sketch.min == 0.0
+        assert sketch.mean == pytest.approx(0.12)
+        assert LatencySketch().quantile(0.99) == 0.0
+
+    def test_merge_equals_single_sketch(self, latencies):
+        whole, left, right = LatencySketch(), LatencySketch(), LatencySketch()
+        for index, value in enumerate(latencies):
+            whole.record(value)
+            (left if index % 2 else right).record(value)
+
+        merged = left.merge(right)
+
+        assert merged.buckets == whole.buckets
+        assert merged.count == whole.count
+        assert (merged.min, merged.max) == (whole.min, whole.max)
+        assert merged.quantile(0.99) == whole.quantile(0.99)
+
+    def test_merge_rejects_different_accuracy(self):
+        with pytest.raises(ValueError):
+            LatencySketch(0.01).merge(LatencySketch(0.02))
+
+    def test_dict_round_trip_through_json(self, latencies):
+        sketch = LatencySketch()
+        for value in latencies[:200]:
+            sketch.record(value)
+
+        restored = LatencySketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+
+        assert restored.buckets == sketch.buckets
+        assert restored.quantile(0.95) == sketch.quantile(0.95)
+
+
+class TestWindowedSketch:
+    def test_slots_expire_after_window(self):
+        window = WindowedSketch(window_seconds=60, slot_count=6)
+        window.record(5.0, now=1000.0)
+        window.record(0.1, now=1055.0)
+
+        assert window.merged(now=1055.0).count == 2
+        # 1000 pertence à fatia [1000, 1010): fora da janela de 60s a partir de 1060
+        assert window.merged(now=1065.0).count == 1
+        assert window.merged(now=1065.0).max == 0.1
+        assert window.merged(now=1200.0).count == 0
+
+    def test_ring_position_is_reused(self):
+        window = WindowedSketch(window_seconds=60, slot_count=6)
+        window.record(1.0, now=1000.0)
+        # Mesma posição do anel, uma volta depois: a fatia antiga é descartada
+        window.record(2.0, now=1060.0)
+
+        merged = window.merged(now=1060.0)
+        assert merged.count == 1
+        assert merged.max == 2.0
+
+    def test_live_slots_are_copies(self):
+        window = WindowedSketch(window_seconds=60, slot_count=6)
+        window.record(1.0, now=1000.0)
+
+        slots = window.live_slots(now=1000.0)
+        window.record(2.0, now=1001.0)
+
+        assert [sketch.count for sketch in slots.values()] == [1]
+
+    def test_merge_dicts_across_workers(self):
+        workers = [WindowedSketch(window_seconds=60, slot_count=6) for _ in range(3)]
+        single = WindowedSketch(window_seconds=60, slot_count=6)
+        rng = random.Random(3)
+        for _ in range(600):
+            now = 1000.0 + rng.uniform(0, 59)
+            value = rng.expovariate(10)
+            rng.choice(workers).record(value, now=now)
+            single.record(value, now=now)
+
+        snapshots = [json.loads(json.dumps(worker.to_dict(now=1059.0))) for worker in workers]
+        merged = WindowedSketch.merge_dicts(snapshots, window_seconds=60, now=1059.0)
+
+        expected = single.merged(now=1059.0)
+        assert merged.count == expected.count == 600
+        assert merged.buckets == expected.buckets
+        assert merged.quantile(0.99) == expected.quantile(0.99)
+
+    def test_merge_dicts_drops_expired_slots(self):
+        old, recent = WindowedSketch(60, 6), WindowedSketch(60, 6)
+        old.record(9.0, now=1000.0)
+        recent.record(0.2, now=1100.0)
+
+        merged = WindowedSketch.merge_dicts([old.to_dict(now=1000.0), recent.to_dict(now=1100.0)], 60, now=1100.0)
+
+        assert merged.count == 1
+        assert merged.max == 0.2
+        assert WindowedSketch.merge_dicts([], 60, now=1100.0).count == 0
@@ -0,0 +1,67 @@
+"""Profiler por amostragem: o teto de overhead sobe e desce com a média móvel do custo."""
+
+import math
+
+import pytest
+
+from utils.sampling_profiler import COST_WINDOW, ProfileSession, SamplingProfiler
+
+
+@pytest.fixture
+def session():
+    # 10 ms pedidos, no máximo 2% do tempo amostrando
+    return ProfileSession(seconds=10.0, interval=0.01, max_overhead=0.02, include_idle=False)
+
+
+class TestOverheadCap:
+    def test_cheap_samples_keep_requested_interval(self, session):
+        for _ in range(COST_WINDOW):
+            session._adjust_interval(0.0001)
+
+        assert session.interval == 0.01
+
+    def test_expensive_samples_raise_interval(self, session):
+        for _ in range(COST_WINDOW):
+            session._adjust_interval(0.001)
+
+        # 1 ms / 2% = 50 ms
+        assert session.interval == pytest.approx(0.05)
+
+    def test_interval_comes_back_down_when_cost_drops(self, session):
+        for _ in range(COST_WINDOW):
+            session._adjust_interval(0.001)
+        for _ in range(COST_WINDOW):
+            session._adjust_interval(0.0001)
+
+        assert session.interval == 0.01
+
+    def test_single_spike_is_averaged(self, session):
+        for _ in range(COST_WINDOW - 1):
+            session._adjust_interval(0.0001)
+        session._adjust_interval(0.0032)
+
+        # Média (15 x 0.1 ms + 3.2 ms) / 16 = 0.29375 ms -> 14.7 ms, não 160 ms
+        assert session.interval == pytest.approx(0.0146875)
+
+    def test_interval_capped_by_session_length(self):
+        session = ProfileSession(seconds=0.5, interval=0.01, max_overhead=0.02, include_idle=False)
+        session._adjust_interval(1.0)
+
+        assert session.interval == 0.5
+
+    def test_no_cap_when_overhead_disabled(self):
+        session = ProfileSession(seconds=10.0, interval=0.01, max_overhead=0.0, include_idle=False)
+        session._adjust_interval(1.0)
+
+        assert session.interval == 0.01
+
+
+class TestProfilerSession:
+    def test_short_session_collects_samples(self):
+        profiler = SamplingProfiler(max_seconds=1.0, default_interval=0.005)
+        session = profiler.profile(0.1, include_idle=True)
+
+        assert session.error is None
+        assert session.samples > 0
+        assert not profiler.running
+        assert math.isfinite(session.to_dict()["effective_interval_ms"])
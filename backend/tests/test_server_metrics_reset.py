@@ -0,0 +1,30 @@
+"""Reset das métricas do servidor: só POST e protegido pelo token de debug."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from api import routes
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from app import app
+
+    monkeypatch.setattr(routes, "active_config", lambda: SimpleNamespace(DEBUG_API_TOKEN="secret", DEBUG=False))
+    return app.test_client()
+
+
+class TestServerMetricsReset:
+    def test_get_is_not_allowed(self, client):
+        assert client.get("/api/metrics/server/reset").status_code == 405
+
+    def test_post_without_token_is_rejected(self, client):
+        assert client.post("/api/metrics/server/reset").status_code == 401
+        assert client.post("/api/metrics/server/reset", headers={"X-Debug-Token": "wrong"}).status_code == 401
+
+    def test_post_with_token_resets(self, client):
+        response = client.post("/api/metrics/server/reset", headers={"X-Debug-Token": "secret"})
+
+        assert response.status_code == 200
+        assert response.get_json()["message"] == "Server metrics reset successfully"
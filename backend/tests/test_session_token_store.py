@@ -0,0 +1,120 @@
+"""Token de sessão compartilhado: invalidação compare-and-delete e fechamento sem derrubar os outros workers."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from core.infrastructure.external.glpi import metrics_adapter
+from core.infrastructure.external.glpi.metrics_adapter import GLPIConfig, GLPIMetricsAdapter, GLPISessionManager
+from utils.session_token_store import FileSessionTokenStore, MemorySessionTokenStore, SessionTokenStore
+
+KEY = "glpi-key"
+
+
+@pytest.fixture(params=["memory", "file"])
+def any_store(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionTokenStore()
+    return FileSessionTokenStore(str(tmp_path))
+
+
+@pytest.fixture
+def store():
+    return MemorySessionTokenStore()
+
+
+@pytest.fixture
+def glpi_requests(monkeypatch):
+    """Registra as chamadas HTTP do adapter (initSession/killSession)."""
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.path)
+        return httpx.Response(200, json={"session_token": "shared-token"})
+
+    transport = httpx.MockTransport(handler)
+    real_async, real_sync = httpx.AsyncClient, httpx.Client
+    monkeypatch.setattr(metrics_adapter.httpx, "AsyncClient", lambda **kwargs: real_async(transport=transport, **kwargs))
+    monkeypatch.setattr(metrics_adapter.httpx, "Client", lambda **kwargs: real_sync(transport=transport, **kwargs))
+    return seen
+
+
+def session_manager(store):
+    config = GLPIConfig(base_url="http://glpi.local/apirest.php", app_token="app", user_token="user")
+    return GLPISessionManager(config, token_store=store)
+
+
+class TestCompareAndDelete:
+    def test_invalidate_removes_current_token(self, any_store):
+        any_store.get_or_refresh(KEY, lambda: "token-1", ttl_seconds=60)
+
+        assert any_store.invalidate(KEY, "token-1") is True
+        assert any_store.get(KEY) is None
+        assert any_store.get_stats()["invalidations"] == 1
+
+    def test_stale_token_never_deletes_newer_one(self, any_store):
+        # Worker A recebe 401 com token-1 depois que o worker B já gravou token-2
+        any_store.get_or_refresh(KEY, lambda: "token-1", ttl_seconds=60)
+        any_store.invalidate(KEY, "token-1")
+        record = any_store.get_or_refresh(KEY, lambda: "token-2", ttl_seconds=60)
+
+        assert any_store.invalidate(KEY, "token-1") is False
+        assert any_store.get(KEY).token == "token-2"
+        assert record.generation == 1
+
+    def test_empty_token_is_ignored(self, any_store):
+        any_store.get_or_refresh(KEY, lambda: "token-1", ttl_seconds=60)
+
+        assert any_store.invalidate(KEY, None) is False
+        assert any_store.get(KEY).token == "token-1"
+
+    def test_valid_token_is_reused_without_login(self, any_store):
+        logins = []
+
+        def login():
+            logins.append(1)
+            return f"token-{len(logins)}"
+
+        first = any_store.get_or_refresh(KEY, login, ttl_seconds=3600)
+        second = any_store.get_or_refresh(KEY, login, ttl_seconds=3600)
+
+        assert first.token == second.token == "token-1"
+        assert len(logins) == 1
+        assert any_store.get_stats()["hits"] == 1
+
+
+class TestSharedSessionClose:
+    def test_base_store_is_abstract(self):
+        with pytest.raises(TypeError):
+            SessionTokenStore()
+
+    def test_close_session_keeps_shared_token(self, store, glpi_requests):
+        manager = session_manager(store)
+        asyncio.run(manager.get_session_token())
+
+        asyncio.run(manager.close_session())
+
+        assert manager.session_token is None
+        assert store.get(manager.token_store_key).token == "shared-token"
+        assert not any(path.endswith("killSession") for path in glpi_requests)
+
+    def test_global_logout_kills_and_invalidates(self, store, glpi_requests):
+        manager = session_manager(store)
+        asyncio.run(manager.get_session_token())
+
+        asyncio.run(manager.close_session(global_logout=True))
+
+        assert glpi_requests[-1].endswith("killSession")
+        assert store.get(manager.token_store_key) is None
+
+    def test_adapter_close_only_releases_local_reference(self, store, glpi_requests):
+        adapter = GLPIMetricsAdapter(GLPIConfig(base_url="http://glpi.local/apirest.php", app_token="app", user_token="user"))
+        adapter.session_manager = session_manager(store)
+        asyncio.run(adapter.session_manager.get_session_token())
+
+        asyncio.run(adapter.close())
+
+        assert adapter.session_manager.session_token is None
+        assert store.get(adapter.session_manager.token_store_key) is not None
+        assert not any(path.endswith("killSession") for path in glpi_requests)
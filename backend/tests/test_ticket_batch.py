@@ -0,0 +1,83 @@
+"""Decodificação da search API em TicketBatch, com colunas de usuário por nome."""
+
+import pytest
+
+from core.infrastructure.external.glpi.metrics_adapter import GLPIConfig, GLPIMetricsAdapter
+from core.infrastructure.external.glpi.ticket_batch import MISSING, TicketBatch
+
+# Usuários como o endpoint REST ``User`` devolve (base da hierarquia e do índice por nome)
+USERS = [
+    {"id": 2, "name": "glpi", "realname": "", "firstname": ""},
+    {"id": 6, "name": "jsilva", "realname": "Silva", "firstname": "João"},
+    {"id": 9, "name": "msouza", "realname": "Souza", "firstname": "Maria"},
+    {"id": 12, "name": "2024", "realname": "Lima", "firstname": "Ana"},
+]
+
+# Página da search/Ticket: IDs e status numéricos, técnico (opção 4) por nome de exibição
+SEARCH_PAGE = {
+    "totalcount": 6,
+    "count": 6,
+    "sort": [1],
+    "order": ["ASC"],
+    "data": [
+        {"2": 101, "12": 2, "4": "Silva João", "19": "2024-05-01 10:00:00"},
+        {"2": 102, "12": 5, "4": "Souza Maria", "19": "2024-05-02 11:30:00"},
+        {"2": 103, "12": 1, "4": "Souza Maria$#$Silva João", "19": "2024-05-03 08:15:00"},
+        {"2": 104, "12": 6, "4": "jsilva", "19": "2024-05-04 09:00:00"},
+        {"2": 105, "12": 4, "4": None, "19": "2024-05-05 12:00:00"},
+        {"2": 106, "12": 2, "4": "2024", "19": "2024-05-06 12:00:00"},
+    ],
+    "content-range": "0-5/6",
+}
+
+FIELD_IDS = {"status_id": 12, "technician_id": 4, "updated_date": 19}
+
+
+@pytest.fixture
+def adapter():
+    return GLPIMetricsAdapter(GLPIConfig(base_url="http://glpi.local/apirest.php", app_token="app", user_token="user"))
+
+
+class TestNameValuedUserColumns:
+    def test_names_resolve_to_user_ids(self, adapter):
+        index = adapter._build_technician_name_index(USERS)
+        columns = adapter._projected_ticket_columns(FIELD_IDS)
+
+        batch = TicketBatch()
+        skipped = batch.extend_search_response(SEARCH_PAGE, columns, index)
+
+        assert skipped == 0
+        assert list(batch.ids) == [101, 102, 103, 104, 105, 106]
+        # Multivalorada usa o primeiro; login numérico resolve pelo nome, não como ID
+        assert list(batch.assignees) == [6, 9, 9, 6, MISSING, 12]
+
+    def test_without_index_names_are_missing(self, adapter):
+        batch = TicketBatch()
+        batch.extend_search_response(SEARCH_PAGE, adapter._projected_ticket_columns(FIELD_IDS))
+
+        assert list(batch.assignees)[:4] == [MISSING] * 4
+
+    def test_list_rows_follow_response_columns(self, adapter):
+        index = adapter._build_technician_name_index(USERS)
+        page = {
+            "totalcount": 2,
+            "columns": [2, 12, 4, 19],
+            "data": [[201, 2, "Silva  João", "2024-05-01 10:00:00"], [202, 5, ["msouza"], "2024-05-02 10:00:00"]],
+        }
+
+        batch = TicketBatch()
+        batch.extend_search_response(page, adapter._projected_ticket_columns(FIELD_IDS), index)
+
+        assert list(batch.assignees) == [6, 9]
+
+    def test_hierarchy_counts_attribute_levels(self, adapter):
+        adapter._technician_ids_by_name = adapter._build_technician_name_index(USERS)
+        hierarchy = adapter._process_technician_hierarchy(USERS, None)
+
+        tickets = adapter._decode_projected_tickets(SEARCH_PAGE, FIELD_IDS, None)
+        levels = adapter._process_tickets_by_hierarchy(tickets, hierarchy, None)
+
+        assigned = sum(level["total"] for level in levels.values())
+        assert assigned == 5
+        assert levels[hierarchy[6]]["total"] >= 2
+        assert levels[hierarchy[9]]["total"] >= 2
@@ -0,0 +1,121 @@
+"""Tracer em processo: hierarquia de spans, contexto em corrotinas, buffer, Server-Timing e OTLP."""
+
+import asyncio
+
+import pytest
+
+from utils.tracing import Tracer
+
+CORRELATION_ID = "0f8fad5b-d9cb-469f-a165-70867728950e"
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer(max_traces=3, max_spans_per_trace=8)
+    yield tracer
+    tracer.discard_trace()
+
+
+class TestSpans:
+    def test_spans_without_trace_record_nothing(self, tracer):
+        with tracer.span("glpi.search") as span:
+            assert span is None
+        assert tracer.current_trace() is None
+
+    def test_nested_spans_link_to_parent(self, tracer):
+        tracer.start_trace(CORRELATION_ID, "GET /api/metrics")
+        with tracer.span("facade") as outer:
+            with tracer.span("glpi.search", rows=10) as inner:
+                pass
+        trace = tracer.finish_trace(status_code=200)
+
+        root = trace.root
+        assert outer.parent_id == root.span_id
+        assert inner.parent_id == outer.span_id
+        assert inner.attributes == {"rows": 10}
+        assert root.attributes["status_code"] == 200
+        assert tracer.current_trace() is None
+
+    def test_error_marks_span(self, tracer):
+        tracer.start_trace(CORRELATION_ID, "GET /api/metrics")
+        with pytest.raises(KeyError):
+            with tracer.span("facade"):
+                raise KeyError("x")
+        trace = tracer.finish_trace()
+
+        assert trace.spans[1].status == "error"
+        assert trace.spans[1].attributes["error.type"] == "KeyError"
+
+    def test_traced_coroutines_share_the_request_trace(self, tracer):
+        @tracer.traced("adapter.count")
+        async def count(level):
+            await asyncio.sleep(0)
+            return level
+
+        async def fan_out():
+            return await asyncio.gather(*(count(level) for level in ("N1", "N2", "N3")))
+
+        tracer.start_trace(CORRELATION_ID, "GET /api/metrics")
+        with tracer.span("facade") as facade:
+            asyncio.run(fan_out())
+        trace = tracer.finish_trace()
+
+        counts = [span for span in trace.spans if span.name == "adapter.count"]
+        assert len(counts) == 3
+        assert all(span.parent_id == facade.span_id for span in counts)
+
+    def test_span_limit_counts_dropped(self, tracer):
+        tracer.start_trace(CORRELATION_ID, "GET /api/metrics")
+        for _ in range(10):
+            with tracer.span("glpi.search"):
+                pass
+        trace = tracer.finish_trace()
+
+        assert len(trace.spans) == 8
+        assert trace.dropped_spans == 3
+
+
+class TestBufferAndExport:
+    def test_buffer_keeps_most_recent_traces(self, tracer):
+        for index in range(5):
+            tracer.start_trace(f"req-{index}", "GET /api/metrics")
+            tracer.finish_trace()
+
+        assert tracer.recent_trace_ids() == ["req-4", "req-3", "req-2"]
+        assert tracer.get_trace("req-0") is None
+
+    def test_server_timing_aggregates_by_name(self, tracer):
+        tracer.start_trace(CORRELATION_ID, "GET /api/metrics")
+        for _ in range(2):
+            with tracer.span("glpi search"):
+                pass
+        trace = tracer.finish_trace()
+
+        header = Tracer.server_timing(trace)
+        assert header.startswith("glpi_search;dur=")
+        assert 'desc="2x"' in header
+        assert header.split(", ")[-1].startswith("total;dur=")
+
+    def test_otlp_ids_and_parents(self, tracer):
+        tracer.start_trace(CORRELATION_ID, "GET /api/metrics")
+        with tracer.span("facade", cached=False, rows=3, ratio=0.5):
+            pass
+        trace = tracer.finish_trace()
+
+        spans = Tracer.to_otlp([trace])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        root, child = spans
+        assert root["traceId"] == CORRELATION_ID.replace("-", "")
+        assert root["kind"] == 2 and "parentSpanId" not in root
+        assert child["parentSpanId"] == root["spanId"]
+        assert int(child["endTimeUnixNano"]) >= int(child["startTimeUnixNano"])
+        assert {attr["key"]: attr["value"] for attr in child["attributes"]} == {
+            "cached": {"boolValue": False},
+            "rows": {"intValue": "3"},
+            "ratio": {"doubleValue": 0.5},
+        }
+
+    def test_non_uuid_correlation_id_is_hashed(self, tracer):
+        trace = tracer.start_trace("req-abc", "GET /api/metrics")
+
+        assert len(trace.trace_id) == 32
+        assert trace.trace_id == tracer.start_trace("req-abc", "GET /api/metrics").trace_id
@@ -4,15 +4,15 @@ Este módulo implementa um sistema de alertas baseado em métricas e thresholds
 configuráveis, com suporte a diferentes canais de notificação.
 """
 
-import asyncio
-import json
 import logging
+import os
+import threading
 import time
-from collections import defaultdict, deque
+from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from .prometheus_metrics import prometheus_metrics
 from .structured_logging import StructuredLogger, system_logger
@@ -90,11 +90,78 @@ class Alert:
         }
 
 
+class MetricWindow:
+    """Anel de buckets de resolução fixa (soma, contagem, mínimo e máximo por bucket) para uma métrica."""
+
+    __slots__ = ("resolution", "size", "_bucket_ids", "_sums", "_counts", "_mins", "_maxs", "latest")
+
+    def __init__(self, resolution: float = 1.0, window_seconds: int = 600):
+        self.resolution = resolution
+        self.size = max(1, int(window_seconds / resolution))
+        self._bucket_ids = [-1] * self.size
+        self._sums = [0.0] * self.size
+        self._counts = [0] * self.size
+        self._mins = [0.0] * self.size
+        self._maxs = [0.0] * self.size
+        self.latest: Optional[Dict[str, Any]] = None
+
+    @property
+    def window_seconds(self) -> float:
+        return self.size * self.resolution
+
+    def record(self, value: Union[float, int], timestamp: float, labels: Dict[str, str]):
+        """Acrescenta uma amostra (O(1)); buckets expirados são reaproveitados."""
+        bucket_id = int(timestamp // self.resolution)
+        position = bucket_id % self.size
+        if self._bucket_ids[position] != bucket_id:
+            self._bucket_ids[position] = bucket_id
+            self._sums[position] = 0.0
+            self._counts[position] = 0
+            self._mins[position] = value
+            self._maxs[position] = value
+        self._sums[position] += value
+        self._counts[position] += 1
+        if value < self._mins[position]:
+            self._mins[position] = value
+        if value > self._maxs[position]:
+            self._maxs[position] = value
+        self.latest = {"value": value, "timestamp": timestamp, "labels": labels}
+
+    def aggregate(self, duration_seconds: float, now: float):
+        """(soma, contagem) das amostras nos últimos ``duration_seconds`` (granularidade de um bucket)."""
+        current = int(now // self.resolution)
+        oldest = max(int((now - duration_seconds) // self.resolution), current - self.size + 1)
+        total = 0.0
+        count = 0
+        for bucket_id, bucket_sum, bucket_count in zip(self._bucket_ids, self._sums, self._counts):
+            if oldest <= bucket_id <= current:
+                total += bucket_sum
+                count += bucket_count
+        return total, count
+
+    def extremes(self, since: float, now: float):
+        """(mínimo, máximo, contagem) das amostras dos buckets entre ``since`` e ``now``; None se não houver."""
+        current = int(now // self.resolution)
+        oldest = max(int(since // self.resolution), current - self.size + 1)
+        low = high = None
+        count = 0
+        for position, bucket_id in enumerate(self._bucket_ids):
+            if oldest <= bucket_id <= current and self._counts[position]:
+                bucket_min = self._mins[position]
+                bucket_max = self._maxs[position]
+                low = bucket_min if low is None or bucket_min < low else low
+                high = bucket_max if high is None or bucket_max > high else high
+                count += self._counts[position]
+        return (low, high, count) if count else None
+
+
 class MetricCollector:
     """Coletor de métricas para avaliação de alertas."""
 
-    def __init__(self):
-        self.metrics: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
+    def __init__(self, resolution: float = 1.0, window_seconds: int = 600):
+        self.resolution = resolution
+        self.window_seconds = window_seconds
+        self.metrics: Dict[str, MetricWindow] = {}
         self.logger = StructuredLogger("alerting.metrics")
 
     def record_metric(
@@ -105,45 +172,52 @@ class MetricCollector:
     ):
         """Registra uma métrica."""
         timestamp = time.time()
-        metric_data = {"value": value, "timestamp": timestamp, "labels": labels or {}}
 
-        self.metrics[name].append(metric_data)
+        window = self.metrics.get(name)
+        if window is None:
+            window = self.metrics.setdefault(name, MetricWindow(self.resolution, self.window_seconds))
+        window.record(value, timestamp, labels or {})
 
         self.logger.log_business_metric(name, value, labels=labels, timestamp=timestamp)
 
     def get_latest_metric(self, name: str) -> Optional[Dict[str, Any]]:
         """Obtém a métrica mais recente."""
-        if name in self.metrics and self.metrics[name]:
-            return self.metrics[name][-1]
-        return None
+        window = self.metrics.get(name)
+        return window.latest if window else None
+
+    def get_metric_extremes(self, name: str, since: float, now: float) -> Optional[Tuple[float, float, int]]:
+        """(mínimo, máximo, contagem) das amostras registradas desde ``since`` (granularidade de um bucket)."""
+        window = self.metrics.get(name)
+        return window.extremes(since, now) if window else None
 
     def get_metric_average(self, name: str, duration_seconds: int = 300) -> Optional[float]:
         """Calcula a média de uma métrica nos últimos N segundos."""
-        if name not in self.metrics:
+        window = self.metrics.get(name)
+        if window is None:
             return None
 
-        cutoff_time = time.time() - duration_seconds
-        recent_values = [metric["value"] for metric in self.metrics[name] if metric["timestamp"] >= cutoff_time]
-
-        if not recent_values:
+        total, count = window.aggregate(duration_seconds, time.time())
+        if not count:
             return None
 
-        return sum(recent_values) / len(recent_values)
+        return total / count
 
     def get_metric_count(self, name: str, duration_seconds: int = 300) -> int:
         """Conta quantas vezes uma métrica foi registrada nos últimos N segundos."""
-        if name not in self.metrics:
+        window = self.metrics.get(name)
+        if window is None:
             return 0
 
-        cutoff_time = time.time() - duration_seconds
-        return sum(1 for metric in self.metrics[name] if metric["timestamp"] >= cutoff_time)
+        return window.aggregate(duration_seconds, time.time())[1]
 
 
 class AlertManager:
     """Gerenciador principal do sistema de alertas."""
 
-    def __init__(self):
+    def __init__(self, evaluation_interval: float = 1.0):
         self.rules: Dict[str, AlertRule] = {}
+        # Índice metric_name -> regras (a avaliação só consulta métricas que têm regras)
+        self._rules_by_metric: Dict[str, List[AlertRule]] = defaultdict(list)
         self.active_alerts: Dict[str, Alert] = {}
         self.alert_history: List[Alert] = []
         self.metric_collector = MetricCollector()
@@ -153,6 +227,14 @@ class AlertManager:
         # Estado interno para tracking de condições
         self._condition_start_times: Dict[str, float] = {}
         self._last_alert_times: Dict[str, float] = {}
+        self._last_evaluation_time: Optional[float] = None
+
+        # Avaliação periódica em thread de fundo (iniciada no primeiro registro, reiniciada após fork)
+        self.evaluation_interval = evaluation_interval
+        self._evaluation_thread: Optional[threading.Thread] = None
+        self._evaluation_pid: Optional[int] = None
+        self._evaluation_lock = threading.Lock()
+        self._stop_event = threading.Event()
 
         self._setup_default_rules()
 
@@ -250,7 +332,10 @@ class AlertManager:
 
     def add_rule(self, rule: AlertRule):
         """Adiciona uma regra de alerta."""
+        if rule.name in self.rules:
+            self._unindex_rule(self.rules[rule.name])
         self.rules[rule.name] = rule
+        self._rules_by_metric[rule.metric_name].append(rule)
         self.logger.log_audit_event(
             "alert_rule_added",
             rule_name=rule.name,
@@ -261,9 +346,16 @@ class AlertManager:
     def remove_rule(self, rule_name: str):
         """Remove uma regra de alerta."""
         if rule_name in self.rules:
-            del self.rules[rule_name]
+            self._unindex_rule(self.rules.pop(rule_name))
             self.logger.log_audit_event("alert_rule_removed", rule_name=rule_name)
 
+    def _unindex_rule(self, rule: AlertRule):
+        rules = [indexed for indexed in self._rules_by_metric.get(rule.metric_name, []) if indexed is not rule]
+        if rules:
+            self._rules_by_metric[rule.metric_name] = rules
+        else:
+            self._rules_by_metric.pop(rule.metric_name, None)
+
     def add_notification_handler(self, handler: Callable[[Alert], None]):
         """Adiciona um handler de notificação."""
         self.notification_handlers.append(handler)
@@ -274,36 +366,76 @@ class AlertManager:
         value: Union[float, int],
         labels: Optional[Dict[str, str]] = None,
     ):
-        """Registra uma métrica e avalia alertas."""
+        """Registra uma métrica; as regras são avaliadas no próximo tick."""
         self.metric_collector.record_metric(name, value, labels)
-        self._evaluate_rules()
+        self._ensure_evaluation_thread()
 
-    def _evaluate_rules(self):
-        """Avalia todas as regras de alerta."""
-        current_time = time.time()
-
-        for rule_name, rule in self.rules.items():
-            if not rule.enabled:
+    def _ensure_evaluation_thread(self):
+        # Após fork (gunicorn com preload_app) a thread do processo pai não existe no worker
+        if self._evaluation_thread is not None and self._evaluation_pid == os.getpid():
+            return
+        with self._evaluation_lock:
+            if self._evaluation_thread is not None and self._evaluation_pid == os.getpid():
+                return
+            self._evaluation_pid = os.getpid()
+            self._stop_event = threading.Event()
+            self._evaluation_thread = threading.Thread(target=self._evaluation_loop, name="alert-evaluator", daemon=True)
+            self._evaluation_thread.start()
+
+    def _evaluation_loop(self):
+        stop_event = self._stop_event
+        while not stop_event.wait(self.evaluation_interval):
+            self._evaluate_rules()
+
+    def stop_evaluation(self):
+        """Interrompe a avaliação periódica."""
+        self._stop_event.set()
+
+    def _evaluate_rules(self, current_time: Optional[float] = None):
+        """Avalia as regras das métricas com amostras desde o tick anterior (um tick)."""
+        current_time = time.time() if current_time is None else current_time
+        # Amostras desde o tick anterior: um pico seguido de valor normal no mesmo tick ainda conta
+        since = self._last_evaluation_time if self._last_evaluation_time is not None else current_time - self.evaluation_interval
+        self._last_evaluation_time = current_time
+
+        for metric_name, rules in list(self._rules_by_metric.items()):
+            extremes = self.metric_collector.get_metric_extremes(metric_name, since, current_time)
+            if not extremes:
+                # Nenhuma amostra desde o tick anterior: o estado das regras fica como está.
+                # Reavaliar o último valor faria uma amostra antiga "persistir" e disparar regras com duration
+                continue
+            metric_data = self.metric_collector.get_latest_metric(metric_name)
+            if not metric_data:
                 continue
+            metric_data = {**metric_data, "min": extremes[0], "max": extremes[1], "count": extremes[2]}
 
-            try:
-                self._evaluate_rule(rule, current_time)
-            except Exception as e:
-                self.logger.log_error_with_context(
-                    "rule_evaluation_error",
-                    f"Erro ao avaliar regra {rule_name}: {str(e)}",
-                    exception=e,
-                    rule_name=rule_name,
-                )
+            for rule in rules:
+                if not rule.enabled:
+                    continue
+
+                try:
+                    self._evaluate_rule(rule, current_time, metric_data)
+                except Exception as e:
+                    self.logger.log_error_with_context(
+                        "rule_evaluation_error",
+                        f"Erro ao avaliar regra {rule.name}: {str(e)}",
+                        exception=e,
+                        rule_name=rule.name,
+                    )
 
-    def _evaluate_rule(self, rule: AlertRule, current_time: float):
+    def evaluate_rules(self):
+        """Executa um tick de avaliação imediatamente (ex.: scripts e endpoints de diagnóstico)."""
+        self._evaluate_rules()
+
+    def _evaluate_rule(self, rule: AlertRule, current_time: float, metric_data: Optional[Dict[str, Any]] = None):
         """Avalia uma regra específica."""
         # Obter métrica mais recente
-        metric_data = self.metric_collector.get_latest_metric(rule.metric_name)
+        if metric_data is None:
+            metric_data = self.metric_collector.get_latest_metric(rule.metric_name)
         if not metric_data:
             return
 
-        metric_value = metric_data["value"]
+        metric_value = self._rule_value(rule, metric_data)
         condition_met = self._evaluate_condition(metric_value, rule.threshold, rule.operator)
 
         alert_key = f"{rule.name}_{rule.metric_name}"
@@ -331,6 +463,15 @@ class AlertManager:
             if alert_key in self.active_alerts:
                 self._resolve_alert(alert_key, current_time)
 
+    @staticmethod
+    def _rule_value(rule: AlertRule, metric_data: Dict[str, Any]) -> Union[float, int]:
+        """Valor avaliado pela regra: o pior do tick (máximo para > e >=, mínimo para < e <=), senão o último."""
+        if rule.operator in (">", ">=") and "max" in metric_data:
+            return metric_data["max"]
+        if rule.operator in ("<", "<=") and "min" in metric_data:
+            return metric_data["min"]
+        return metric_data["value"]
+
     def _evaluate_condition(self, value: Union[float, int], threshold: Union[float, int], operator: str) -> bool:
         """Avalia se uma condição de alerta é atendida."""
         if operator == ">":
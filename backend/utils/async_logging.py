@@ -0,0 +1,254 @@
+"""Pipeline assíncrono de logs estruturados.
+
+Os handlers dos loggers são movidos para trás de uma fila limitada: a thread
+da requisição só congela a mensagem e o contexto (correlation ID, operação) e
+enfileira o registro. Uma thread de fundo formata (JSON + redação) e escreve
+em lotes - uma escrita e um flush por lote nos streams. Com a fila cheia,
+registros são descartados e contados por nível; no shutdown a fila é drenada.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .prometheus_metrics import prometheus_metrics
+from .structured_logging import correlation_id_var, operation_context_var, set_handler_wrapper
+
+# Registros de ERROR ou acima esperam um pouco por espaço na fila antes de serem descartados
+ERROR_PUT_TIMEOUT_SECONDS = 0.05
+
+_STOP = object()
+
+
+class AsyncLogHandler(QueueHandler):
+    """QueueHandler que encaminha para os handlers originais de um logger, sem formatar na thread chamadora."""
+
+    def __init__(self, pipeline: "AsyncLogPipeline", target_handlers: List[logging.Handler]):
+        super().__init__(pipeline.queue)
+        self.pipeline = pipeline
+        self.target_handlers = target_handlers
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Congela o que depende da thread/contexto atual; a formatação fica para o listener."""
+        record.msg = record.getMessage()
+        record.args = None
+
+        if getattr(record, "correlation_id", None) is None:
+            correlation_id = correlation_id_var.get()
+            if correlation_id:
+                record.correlation_id = correlation_id
+        if not hasattr(record, "operation"):
+            operation_context = operation_context_var.get()
+            if operation_context:
+                record.operation = dict(operation_context)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.pipeline.put(self.target_handlers, record)
+
+
+class AsyncLogPipeline:
+    """Fila limitada + thread de escrita em lotes para os handlers de log existentes."""
+
+    def __init__(self, max_queue_size: int = 10000, batch_size: int = 256):
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self.batch_size = batch_size
+        self.handlers: Dict[int, AsyncLogHandler] = {}
+        self.stats: Dict[str, Any] = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "dropped": {},
+            "handler_errors": 0,
+            "max_queue_depth": 0,
+        }
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stopped = False
+
+    # Lado produtor (thread da requisição)
+
+    def put(self, target_handlers: List[logging.Handler], record: logging.LogRecord) -> None:
+        """Enfileira sem bloquear; descarta e conta quando a fila está cheia."""
+        if self._stopped:
+            self._write_batch([(target_handlers, record)])
+            return
+        self._ensure_listener()
+
+        try:
+            if record.levelno >= logging.ERROR:
+                self.queue.put((target_handlers, record), timeout=ERROR_PUT_TIMEOUT_SECONDS)
+            else:
+                self.queue.put_nowait((target_handlers, record))
+        except queue.Full:
+            dropped = self.stats["dropped"]
+            dropped[record.levelname] = dropped.get(record.levelname, 0) + 1
+            prometheus_metrics.record_log_dropped(record.levelname)
+            return
+
+        self.stats["enqueued"] += 1
+        depth = self.queue.qsize()
+        if depth > self.stats["max_queue_depth"]:
+            self.stats["max_queue_depth"] = depth
+
+    def _ensure_listener(self) -> None:
+        # Após fork (gunicorn com preload_app) a thread do processo pai não existe no worker
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="async-log-writer", daemon=True)
+            self._thread.start()
+
+    # Lado consumidor (thread de escrita)
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            batch = [item]
+            # Drena o que já estiver na fila, até o tamanho do lote
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(entry is _STOP for entry in batch)
+            self._write_batch([entry for entry in batch if entry is not _STOP])
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[Tuple[List[logging.Handler], logging.LogRecord]]) -> None:
+        """Formata e escreve um lote; streams simples recebem uma única escrita por lote."""
+        if not batch:
+            return
+
+        pending: Dict[int, Tuple[logging.StreamHandler, List[str]]] = {}
+        for target_handlers, record in batch:
+            for handler in target_handlers:
+                if record.levelno < handler.level or not handler.filter(record):
+                    continue
+                try:
+                    # Rotating/File handlers com lógica própria em emit() seguem o caminho padrão
+                    if type(handler) is logging.StreamHandler:
+                        lines = pending.setdefault(id(handler), (handler, []))[1]
+                        lines.append(handler.format(record) + handler.terminator)
+                    else:
+                        handler.handle(record)
+                except Exception:
+                    self.stats["handler_errors"] += 1
+
+        for handler, lines in pending.values():
+            try:
+                handler.acquire()
+                try:
+                    handler.stream.write("".join(lines))
+                    handler.flush()
+                finally:
+                    handler.release()
+            except Exception:
+                self.stats["handler_errors"] += 1
+
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+
+    # Instalação e ciclo de vida
+
+    def wrap(self, handlers: Iterable[logging.Handler]) -> AsyncLogHandler:
+        """Handler assíncrono que encaminha para ``handlers``."""
+        return AsyncLogHandler(self, list(handlers))
+
+    def install(self, logger: logging.Logger) -> None:
+        """Substitui os handlers do logger por um único handler assíncrono que encaminha para eles."""
+        targets = [handler for handler in logger.handlers if not isinstance(handler, AsyncLogHandler)]
+        if not targets:
+            return
+        async_handler = self.wrap(targets)
+        self.handlers[id(logger)] = async_handler
+        for handler in targets:
+            logger.removeHandler(handler)
+        logger.addHandler(async_handler)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Espera a fila esvaziar (True se esvaziou dentro do timeout)."""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            if self._thread is None or not self._thread.is_alive():
+                break
+            time.sleep(0.005)
+        return not self.queue.unfinished_tasks
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Drena a fila e encerra a thread; registros posteriores são escritos de forma síncrona."""
+        if self._stopped:
+            return
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            try:
+                self.queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+        self._stopped = True
+
+        # Sobras (thread morta, fork ou timeout) são escritas aqui
+        leftovers = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftovers.append(item)
+        self._write_batch(leftovers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "dropped": dict(self.stats["dropped"]),
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+        }
+
+
+_pipeline: Optional[AsyncLogPipeline] = None
+
+
+def get_async_log_pipeline() -> Optional[AsyncLogPipeline]:
+    """Pipeline instalado (None se os logs estão síncronos)."""
+    return _pipeline
+
+
+def setup_async_logging(max_queue_size: int = 10000, batch_size: int = 256) -> AsyncLogPipeline:
+    """
+    Move os handlers do root e de todos os loggers já configurados para o pipeline assíncrono.
+
+    Idempotente; handlers criados depois por ``StructuredLogger`` também passam pelo pipeline.
+    """
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = AsyncLogPipeline(max_queue_size=max_queue_size, batch_size=batch_size)
+        atexit.register(_pipeline.stop)
+        set_handler_wrapper(async_handler_for)
+
+    _pipeline.install(logging.getLogger())
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger):
+            _pipeline.install(logger)
+    return _pipeline
+
+
+def async_handler_for(handler: logging.Handler) -> logging.Handler:
+    """Envolve ``handler`` no pipeline assíncrono, se instalado."""
+    if _pipeline is None:
+        return handler
+    return _pipeline.wrap([handler])
@@ -0,0 +1,146 @@
+"""Serialização JSON rápida para as respostas da API.
+
+Usa orjson quando disponível (com fallback para o json da stdlib), serializa
+modelos Pydantic direto para bytes com ``model_dump_json`` e permite embutir
+payloads já codificados (``RawJSON``) sem re-serializá-los.
+"""
+
+import json
+import re
+import uuid
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from time import perf_counter
+from typing import Any, Callable, List
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from pydantic import BaseModel
+
+from .request_cost import record_serialization
+from .tracing import tracer
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+    # orjson.Fragment (>= 3.9) embute bytes prontos sem reparse
+    ORJSON_FRAGMENT = getattr(orjson, "Fragment", None)
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+    ORJSON_FRAGMENT = None
+    ORJSON_OPTIONS = 0
+
+# Marcador para emendar fragmentos quando orjson.Fragment não está disponível
+_RAW_MARKER = f"__rawjson_{uuid.uuid4().hex}_"
+_RAW_PATTERN = re.compile(rb'"' + re.escape(_RAW_MARKER.encode()) + rb'(\d+)"')
+
+
+class RawJSON:
+    """Payload JSON já codificado; é embutido na resposta sem re-serialização."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: bytes):
+        self.value = value
+
+    @classmethod
+    def encode(cls, obj: Any) -> "RawJSON":
+        """Codifica ``obj`` uma vez (ex.: antes de guardar no cache)."""
+        return cls(dumps_bytes(obj))
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def __repr__(self) -> str:
+        return f"RawJSON({len(self.value)} bytes)"
+
+
+def _default(value: Any) -> Any:
+    """Tipos não nativos do encoder (os do stdlib também cobrem datetime, dataclass e UUID)."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _make_default(fragments: List[bytes]) -> Callable[[Any], Any]:
+    """Hook ``default`` que emite modelos Pydantic e RawJSON como bytes prontos."""
+
+    def default(value: Any) -> Any:
+        if isinstance(value, RawJSON):
+            raw = value.value
+        elif isinstance(value, BaseModel):
+            raw = value.model_dump_json().encode("utf-8")
+        else:
+            return _default(value)
+
+        if ORJSON_FRAGMENT is not None:
+            return ORJSON_FRAGMENT(raw)
+        fragments.append(raw)
+        return f"{_RAW_MARKER}{len(fragments) - 1}"
+
+    return default
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serializa ``obj`` para bytes UTF-8 (compacto)."""
+    if isinstance(obj, RawJSON):
+        return obj.value
+    if isinstance(obj, BaseModel):
+        return obj.model_dump_json().encode("utf-8")
+
+    fragments: List[bytes] = []
+    default = _make_default(fragments)
+    if ORJSON_AVAILABLE:
+        body = orjson.dumps(obj, default=default, option=ORJSON_OPTIONS)
+    else:
+        body = json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    if fragments:
+        body = _RAW_PATTERN.sub(lambda match: fragments[int(match.group(1))], body)
+    return body
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider do Flask com encoder rápido, modelos Pydantic e RawJSON."""
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Opções específicas do json da stdlib (indent, sort_keys...) - caminho lento
+            return json.dumps(json.loads(dumps_bytes(obj)), **kwargs)
+        return dumps_bytes(obj).decode("utf-8")
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        with tracer.span("serialize.json") as span:
+            start = perf_counter()
+            body = dumps_bytes(obj)
+            record_serialization(perf_counter() - start, len(body))
+            if span is not None:
+                span.set_attribute("bytes", len(body))
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def setup_json_provider(app: Flask) -> FastJSONProvider:
+    """Instala o FastJSONProvider na aplicação."""
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+    return app.json
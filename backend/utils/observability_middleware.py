@@ -4,7 +4,9 @@ Este módulo implementa middleware para instrumentação automática de rotas Fl
 com métricas Prometheus, logs estruturados e alertas.
 """
 
+import json
 import logging
+import random
 import time
 from functools import wraps
 from typing import Any, Dict, Optional
@@ -15,14 +17,41 @@ from werkzeug.exceptions import HTTPException
 from .alerting_system import alert_manager, record_api_response_time
 from .prometheus_metrics import prometheus_metrics
 from .structured_logging import StructuredLogger, api_logger, correlation_id_var, log_api_request, SensitiveDataRedactor
+from .request_cost import finish_request_cost, start_request_cost
+from .tracing import tracer
 
 
-class ObservabilityMiddleware:
-    """Middleware de observabilidade para Flask."""
+# Tiers de captura do middleware
+TIER_BASIC = "basic"
+TIER_DEEP = "deep"
+
+# Respostas JSON acima deste tamanho não são decodificadas para o resumo de chaves
+DEEP_JSON_SUMMARY_MAX_BYTES = 64 * 1024
 
-    def __init__(self, app: Optional[Flask] = None):
+
+class ObservabilityMiddleware:
+    """
+    Middleware de observabilidade para Flask.
+
+    Opera em dois tiers: toda requisição registra contadores, tempos e um log
+    de performance (tier basic); a captura detalhada, com headers, query
+    params e corpo redigidos (tier deep), só ocorre para uma amostra
+    configurável, para requisições lentas e para erros.
+    """
+
+    def __init__(
+        self,
+        app: Optional[Flask] = None,
+        deep_sample_rate: float = 0.01,
+        slow_request_threshold: float = 1.0,
+        cost_header: bool = True,
+    ):
         self.app = app
         self.logger = StructuredLogger("observability.middleware")
+        self.deep_sample_rate = deep_sample_rate
+        self.slow_request_threshold = slow_request_threshold
+        self.cost_header = cost_header
+        self.stats = {"requests": 0, "deep_captures": 0}
 
         if app is not None:
             self.init_app(app)
@@ -47,113 +76,91 @@ class ObservabilityMiddleware:
         self.logger.logger.info("Middleware de observabilidade inicializado")
 
     def _before_request(self):
-        """Executado antes de cada request com filtragem de dados sensíveis."""
+        """Executado antes de cada request: apenas correlation ID e relógio (tier basic)."""
+        overhead_start = time.perf_counter()
+
         # Gerar correlation ID
         correlation_id = self._get_or_generate_correlation_id()
         correlation_id_var.set(correlation_id)
 
-        # Armazenar dados do request no contexto (com redação)
         g.start_time = time.time()
+        g.start_perf = overhead_start
         g.correlation_id = correlation_id
-
-        # Filtrar headers sensíveis
-        filtered_headers = self._filter_request_headers()
-
-        # Filtrar query parameters sensíveis
-        filtered_query_params = self._filter_query_parameters()
-
-        # Filtrar dados do corpo da requisição se aplicável
-        filtered_form_data = self._filter_request_body()
-
         g.request_data = {
             "method": request.method,
             "endpoint": request.endpoint or "unknown",
-            "path": SensitiveDataRedactor.redact_url(request.path),
-            "remote_addr": request.remote_addr,
-            "user_agent": request.headers.get("User-Agent", "unknown"),
-            "headers": filtered_headers,
-            "query_params": filtered_query_params,
-            "form_data": filtered_form_data,
-            "content_type": request.content_type,
-            "content_length": request.content_length,
         }
 
-        # Log início do request (dados já filtrados)
-        api_logger.log_operation_start(
-            "api_request",
-            correlation_id=correlation_id,
-            method=request.method,
-            endpoint=request.endpoint,
-            path=SensitiveDataRedactor.redact_url(request.path),
-            remote_addr=request.remote_addr,
-            headers_count=len(filtered_headers),
-            has_query_params=len(filtered_query_params) > 0,
-            has_form_data=len(filtered_form_data) > 0,
-        )
+        # Amostragem decidida na entrada; lentidão e erro promovem para deep na saída
+        g.deep_reason = "sampled" if self.deep_sample_rate > 0 and random.random() < self.deep_sample_rate else None
+
+        # Custo da requisição (chamadas GLPI, bytes, linhas, cache, serialização)
+        start_request_cost()
+
+        # Trace da requisição: spans de cache, facade, GLPI e serialização penduram na raiz
+        tracer.start_trace(correlation_id, f"{request.method} {request.endpoint or 'unknown'}", method=request.method)
+
+        g.middleware_overhead = time.perf_counter() - overhead_start
 
     def _after_request(self, response):
-        """Executado após cada request com filtragem de dados sensíveis."""
-        if not hasattr(g, "start_time"):
+        """Executado após cada request; a captura redigida só roda no tier deep."""
+        if not hasattr(g, "start_perf"):
             return response
 
+        overhead_start = time.perf_counter()
+
         # Calcular duração
-        duration = time.time() - g.start_time
+        duration = overhead_start - g.start_perf
 
         # Obter dados do request
         request_data = getattr(g, "request_data", {})
         correlation_id = getattr(g, "correlation_id", "unknown")
-
-        # Filtrar headers de resposta sensíveis
-        filtered_response_headers = self._filter_response_headers(response.headers)
-
-        # Filtrar dados de resposta se necessário
-        filtered_response_data = self._filter_response_data(response)
+        method = request_data.get("method", "unknown")
+        endpoint = request_data.get("endpoint", "unknown")
 
         # Registrar métricas
         prometheus_metrics.record_api_request(
-            method=request_data.get("method", "unknown"),
-            endpoint=request_data.get("endpoint", "unknown"),
+            method=method,
+            endpoint=endpoint,
             status_code=response.status_code,
             duration=duration,
         )
 
         # Registrar no sistema de alertas
-        record_api_response_time(duration, endpoint=request_data.get("endpoint", "unknown"))
+        record_api_response_time(duration, endpoint=endpoint)
 
-        # Log estruturado com dados filtrados
+        # Tamanho sem materializar o corpo (None para respostas em streaming)
+        response_size = response.calculate_content_length()
+
+        # Log estruturado (sem headers nem corpo)
         log_api_request(
-            method=request_data.get("method", "unknown"),
-            endpoint=request_data.get("endpoint", "unknown"),
+            method=method,
+            endpoint=endpoint,
             status_code=response.status_code,
             duration=duration,
             correlation_id=correlation_id,
-            remote_addr=request_data.get("remote_addr"),
-            user_agent=request_data.get("user_agent"),
-            request_headers_filtered=len(request_data.get("headers", {})),
-            response_headers_filtered=len(filtered_response_headers),
+            response_size=response_size,
             response_content_type=response.content_type,
         )
 
-        # Log fim do request com dados filtrados
-        api_logger.log_operation_end(
-            "api_request",
-            success=200 <= response.status_code < 400,
-            status_code=response.status_code,
-            duration=duration,
-            response_size=len(response.get_data()),
-            response_headers_count=len(filtered_response_headers),
-            response_content_type=response.content_type,
-            request_summary={
-                "headers_count": len(request_data.get("headers", {})),
-                "query_params_count": len(request_data.get("query_params", {})),
-                "has_form_data": len(request_data.get("form_data", {})) > 0,
-            },
-        )
+        deep_reason = self._deep_capture_reason(response.status_code, duration)
+        if deep_reason:
+            self._log_deep_capture(response, deep_reason, duration, response_size, correlation_id)
 
         # Adicionar headers de observabilidade (não sensíveis)
         response.headers["X-Correlation-ID"] = correlation_id
         response.headers["X-Response-Time"] = f"{duration:.3f}s"
-        
+
+        cost = finish_request_cost()
+        if cost is not None:
+            prometheus_metrics.record_request_cost(endpoint, cost)
+            if self.cost_header:
+                response.headers["X-Request-Cost"] = cost.header_value()
+
+        trace = tracer.finish_trace(status_code=response.status_code)
+        if trace is not None:
+            response.headers["Server-Timing"] = tracer.server_timing(trace)
+
         # Adicionar headers de segurança
         response.headers["X-Content-Type-Options"] = "nosniff"
         response.headers["X-Frame-Options"] = "DENY"
@@ -162,12 +169,60 @@ class ObservabilityMiddleware:
         response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
         response.headers["Content-Security-Policy"] = "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'"
 
+        # Overhead próprio do middleware (entrada + saída), separado da duração do handler
+        self.stats["requests"] += 1
+        overhead = getattr(g, "middleware_overhead", 0.0) + time.perf_counter() - overhead_start
+        prometheus_metrics.record_middleware_overhead(TIER_DEEP if deep_reason else TIER_BASIC, overhead)
+
         return response
 
+    def _deep_capture_reason(self, status_code: int, duration: float) -> Optional[str]:
+        """Motivo da captura detalhada: erro, lentidão ou amostragem (None = tier basic)."""
+        if status_code >= 500:
+            return "error"
+        if duration >= self.slow_request_threshold:
+            return "slow"
+        return getattr(g, "deep_reason", None)
+
+    def _log_deep_capture(
+        self, response, reason: str, duration: float, response_size: Optional[int], correlation_id: str
+    ) -> None:
+        """Captura redigida de request e response (tier deep)."""
+        self.stats["deep_captures"] += 1
+
+        filtered_headers = self._filter_request_headers()
+        filtered_query_params = self._filter_query_parameters()
+        filtered_form_data = self._filter_request_body()
+        filtered_response_headers = self._filter_response_headers(response.headers)
+        filtered_response_data = self._filter_response_data(response, response_size)
+
+        api_logger.log_operation_end(
+            "api_request",
+            success=200 <= response.status_code < 400,
+            capture_reason=reason,
+            correlation_id=correlation_id,
+            method=request.method,
+            endpoint=request.endpoint,
+            path=SensitiveDataRedactor.redact_url(request.path),
+            remote_addr=request.remote_addr,
+            user_agent=request.headers.get("User-Agent", "unknown"),
+            status_code=response.status_code,
+            duration=duration,
+            request_headers=filtered_headers,
+            query_params=filtered_query_params,
+            form_data=filtered_form_data,
+            content_type=request.content_type,
+            content_length=request.content_length,
+            response_headers=filtered_response_headers,
+            response=filtered_response_data,
+        )
+
     def _teardown_request(self, exception=None):
         """Executado no teardown do request."""
         # Limpar contexto
         correlation_id_var.set(None)
+        tracer.discard_trace()
+        finish_request_cost()
 
     def _handle_exception(self, error):
         """Handler global de exceções."""
@@ -194,8 +249,8 @@ class ObservabilityMiddleware:
             endpoint=request_data.get("endpoint"),
             method=request_data.get("method"),
             status_code=status_code,
-            request_path=SensitiveDataRedactor.redact_url(request_data.get("path", "")),
-            headers_count=len(request_data.get("headers", {})),
+            request_path=SensitiveDataRedactor.redact_url(request.path),
+            headers_count=len(request.headers),
         )
 
         # Retornar resposta de erro estruturada (com redação)
@@ -274,25 +329,28 @@ class ObservabilityMiddleware:
         headers_dict = dict(headers)
         return SensitiveDataRedactor.redact_http_headers(headers_dict)
 
-    def _filter_response_data(self, response) -> Dict[str, Any]:
-        """Filtra dados sensíveis da resposta."""
+    def _filter_response_data(self, response, response_size: Optional[int] = None) -> Dict[str, Any]:
+        """Resumo da resposta para o tier deep (sem conteúdo, apenas chaves de topo)."""
         filtered_data = {
             "content_type": response.content_type,
-            "content_length": len(response.get_data()) if response.get_data() else 0,
+            "content_length": response_size,
             "status_code": response.status_code,
         }
 
-        # Não logar o conteúdo da resposta por padrão para evitar vazamentos
-        # Se necessário para debugging, pode ser habilitado com configuração específica
+        # Não logar o conteúdo da resposta para evitar vazamentos; só as chaves de topo
+        # de JSONs pequenos, decodificados uma única vez
         try:
-            if response.content_type and "application/json" in response.content_type:
-                # Para responses JSON pequenas, podemos logar um resumo filtrado
-                data = response.get_json()
-                if data and len(str(data)) < 1000:  # Limit size
-                    filtered_data["json_summary"] = {
-                        "keys": list(data.keys()) if isinstance(data, dict) else "non_dict",
-                        "size": len(str(data)),
-                    }
+            if (
+                response.is_json
+                and not response.direct_passthrough
+                and response_size is not None
+                and response_size <= DEEP_JSON_SUMMARY_MAX_BYTES
+            ):
+                data = json.loads(response.get_data())
+                filtered_data["json_summary"] = {
+                    "keys": list(data.keys()) if isinstance(data, dict) else "non_dict",
+                    "size": response_size,
+                }
         except Exception:
             # Falhar silenciosamente para não afetar a resposta
             pass
@@ -472,7 +530,12 @@ def setup_observability(app: Flask, config: Optional[Dict[str, Any]] = None) ->
         app.logger.setLevel(logging.INFO)
 
     # Inicializar middleware
-    middleware = ObservabilityMiddleware(app)
+    middleware = ObservabilityMiddleware(
+        app,
+        deep_sample_rate=config.get("deep_sample_rate", 0.01),
+        slow_request_threshold=config.get("slow_request_threshold", 1.0),
+        cost_header=config.get("cost_header", True),
+    )
 
     # Configurar Prometheus Gateway se especificado
     gateway_url = config.get("prometheus_gateway_url")
@@ -1,39 +1,75 @@
 """Utilitários para monitoramento de performance e otimização de cache"""
 import hashlib
+import json
 import logging
+import os
+import tempfile
+import threading
 import time
 from functools import wraps
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from flask import request
 
 from config.settings import active_config
+from utils.quantile_sketch import LatencySketch, WindowedSketch
+from utils.request_cost import CACHE_LAYER_ROUTE, record_cache
+from utils.tracing import tracer
 
 logger = logging.getLogger("performance")
 
+# Quantis expostos nas estatísticas
+REPORTED_QUANTILES = (0.5, 0.95, 0.99)
 
-class PerformanceMonitor:
-    """Monitor de performance para rastreamento de métricas"""
 
-    def __init__(self):
-        self.request_times: List[float] = []
+class PerformanceMonitor:
+    """Monitor de performance para rastreamento de métricas
+
+    Tempos de resposta vão para sketches de quantis (global e por endpoint) em
+    janela deslizante: registro O(1), p50/p95/p99 sem ordenar listas. Com
+    ``shared_dir`` configurado, cada worker publica um snapshot periódico e as
+    leituras combinam os snapshots de todos os workers.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 300,
+        slot_count: int = 10,
+        shared_dir: Optional[str] = None,
+        publish_interval: float = 5.0,
+    ):
+        self.window_seconds = window_seconds
+        self.slot_count = slot_count
+        self.request_sketch = WindowedSketch(window_seconds, slot_count)
+        self.endpoint_sketches: Dict[str, WindowedSketch] = {}
         self.cache_hits = 0
         self.cache_misses = 0
         self.total_requests = 0
+        self.shared_dir = shared_dir
+        self.publish_interval = publish_interval
+        self._last_publish = 0.0
+        self._endpoint_lock = threading.Lock()
 
-    def record_request_time(self, duration: float):
+    def record_request_time(self, duration: float, endpoint: Optional[str] = None):
         """Registra tempo de uma requisição"""
         try:
             if not isinstance(duration, (int, float)) or duration < 0:
                 logger.warning(f"Duração inválida ignorada: {duration}")
                 return
 
-            self.request_times.append(duration)
+            now = time.time()
+            self.request_sketch.record(duration, now)
+            if endpoint:
+                sketch = self.endpoint_sketches.get(endpoint)
+                if sketch is None:
+                    with self._endpoint_lock:
+                        sketch = self.endpoint_sketches.setdefault(endpoint, WindowedSketch(self.window_seconds, self.slot_count))
+                sketch.record(duration, now)
             self.total_requests += 1
 
-            # Mantém apenas os últimos 1000 registros
-            if len(self.request_times) > 1000:
-                self.request_times = self.request_times[-1000:]
+            if self.shared_dir and now - self._last_publish >= self.publish_interval:
+                self._last_publish = now
+                self.publish_snapshot(now)
 
         except Exception as e:
             logger.error(f"Erro ao registrar tempo de requisição: {e}")
@@ -46,26 +82,111 @@ class PerformanceMonitor:
         """Registra um cache miss"""
         self.cache_misses += 1
 
-    def get_p95_response_time(self) -> float:
-        """Calcula o P95 dos tempos de resposta"""
+    # Snapshots entre workers
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.shared_dir, f"performance_{pid}.json")
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Estado serializável deste processo (sketches vivos + contadores)."""
+        return {
+            "pid": os.getpid(),
+            "total_requests": self.total_requests,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "requests": self.request_sketch.to_dict(now),
+            "endpoints": {endpoint: sketch.to_dict(now) for endpoint, sketch in list(self.endpoint_sketches.items())},
+        }
+
+    def publish_snapshot(self, now: Optional[float] = None) -> None:
+        """Grava o snapshot deste worker no diretório compartilhado (escrita atômica)."""
         try:
-            if not self.request_times:
-                return 0.0
+            os.makedirs(self.shared_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.shared_dir, prefix=".performance_")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.snapshot(now), f, separators=(",", ":"))
+            os.replace(tmp_path, self._snapshot_path(os.getpid()))
+        except Exception as e:
+            logger.warning(f"Erro ao publicar snapshot de performance: {e}")
+
+    def _collect_snapshots(self, now: float) -> List[Dict[str, Any]]:
+        """Snapshot local (sempre atual) + snapshots recentes dos demais workers."""
+        snapshots = [self.snapshot(now)]
+        if not self.shared_dir or not os.path.isdir(self.shared_dir):
+            return snapshots
+
+        own_path = self._snapshot_path(os.getpid())
+        for name in os.listdir(self.shared_dir):
+            if not name.startswith("performance_") or not name.endswith(".json"):
+                continue
+            path = os.path.join(self.shared_dir, name)
+            if path == own_path:
+                continue
+            try:
+                # Workers encerrados (max_requests) continuam valendo até saírem da janela
+                if now - os.path.getmtime(path) > self.window_seconds:
+                    os.remove(path)
+                    continue
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    # Leituras
+
+    def _window_sketches(self) -> Dict[str, Any]:
+        """Sketches da janela (combinados entre workers quando configurado) e contadores."""
+        now = time.time()
+        if not self.shared_dir:
+            return {
+                "requests": self.request_sketch.merged(now),
+                "endpoints": {endpoint: sketch.merged(now) for endpoint, sketch in list(self.endpoint_sketches.items())},
+                "total_requests": self.total_requests,
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "workers": 1,
+            }
+
+        snapshots = self._collect_snapshots(now)
+        endpoint_names = {endpoint for snapshot in snapshots for endpoint in snapshot.get("endpoints", {})}
+        return {
+            "requests": WindowedSketch.merge_dicts([s.get("requests", {}) for s in snapshots], self.window_seconds, now),
+            "endpoints": {
+                endpoint: WindowedSketch.merge_dicts(
+                    [s["endpoints"][endpoint] for s in snapshots if endpoint in s.get("endpoints", {})], self.window_seconds, now
+                )
+                for endpoint in endpoint_names
+            },
+            "total_requests": sum(s.get("total_requests", 0) for s in snapshots),
+            "cache_hits": sum(s.get("cache_hits", 0) for s in snapshots),
+            "cache_misses": sum(s.get("cache_misses", 0) for s in snapshots),
+            "workers": len(snapshots),
+        }
 
-            sorted_times = sorted(self.request_times)
-            p95_index = int(len(sorted_times) * 0.95)
-            return sorted_times[p95_index] if p95_index < len(sorted_times) else sorted_times[-1]
+    def _sketch_for(self, endpoint: Optional[str]) -> LatencySketch:
+        if endpoint is None:
+            return self.request_sketch.merged()
+        sketch = self.endpoint_sketches.get(endpoint)
+        return sketch.merged() if sketch else LatencySketch()
+
+    def get_percentile_response_time(self, quantile: float, endpoint: Optional[str] = None) -> float:
+        """Quantil dos tempos de resposta na janela (segundos)"""
+        try:
+            return self._sketch_for(endpoint).quantile(quantile)
 
         except Exception as e:
-            logger.error(f"Erro ao calcular P95: {e}")
+            logger.error(f"Erro ao calcular percentil {quantile}: {e}")
             return 0.0
 
-    def get_average_response_time(self) -> float:
+    def get_p95_response_time(self, endpoint: Optional[str] = None) -> float:
+        """Calcula o P95 dos tempos de resposta"""
+        return self.get_percentile_response_time(0.95, endpoint)
+
+    def get_average_response_time(self, endpoint: Optional[str] = None) -> float:
         """Calcula tempo médio de resposta"""
         try:
-            if not self.request_times:
-                return 0.0
-            return sum(self.request_times) / len(self.request_times)
+            return self._sketch_for(endpoint).mean
 
         except Exception as e:
             logger.error(f"Erro ao calcular tempo médio: {e}")
@@ -83,20 +204,54 @@ class PerformanceMonitor:
             logger.error(f"Erro ao calcular taxa de cache hit: {e}")
             return 0.0
 
+    @staticmethod
+    def _summarize(sketch: LatencySketch) -> Dict[str, Any]:
+        """Contagem, média e quantis de um sketch, em ms"""
+        quantiles = sketch.quantiles(list(REPORTED_QUANTILES))
+        return {
+            "count": sketch.count,
+            "avg_response_time": round(sketch.mean * 1000, 2),
+            "p50_response_time": round(quantiles[0.5] * 1000, 2),
+            "p95_response_time": round(quantiles[0.95] * 1000, 2),
+            "p99_response_time": round(quantiles[0.99] * 1000, 2),
+            "max_response_time": round(sketch.max * 1000, 2),
+        }
+
     def get_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas completas"""
+        window = self._window_sketches()
+        summary = self._summarize(window["requests"])
+        cache_total = window["cache_hits"] + window["cache_misses"]
         return {
-            "total_requests": self.total_requests,
-            "avg_response_time": round(self.get_average_response_time() * 1000, 2),  # em ms
-            "p95_response_time": round(self.get_p95_response_time() * 1000, 2),  # em ms
-            "cache_hits": self.cache_hits,
-            "cache_misses": self.cache_misses,
-            "cache_hit_rate": round(self.get_cache_hit_rate(), 2),
+            "total_requests": window["total_requests"],
+            "avg_response_time": summary["avg_response_time"],  # em ms
+            "p50_response_time": summary["p50_response_time"],
+            "p95_response_time": summary["p95_response_time"],
+            "p99_response_time": summary["p99_response_time"],
+            "window_requests": summary["count"],
+            "window_seconds": self.window_seconds,
+            "workers": window["workers"],
+            "cache_hits": window["cache_hits"],
+            "cache_misses": window["cache_misses"],
+            "cache_hit_rate": round(window["cache_hits"] / cache_total * 100, 2) if cache_total else 0.0,
+            "endpoints": {endpoint: self._summarize(sketch) for endpoint, sketch in sorted(window["endpoints"].items())},
         }
 
 
+def _create_performance_monitor() -> PerformanceMonitor:
+    try:
+        config_obj = active_config()
+        return PerformanceMonitor(
+            window_seconds=config_obj.PERFORMANCE_WINDOW_SECONDS,
+            shared_dir=config_obj.PERFORMANCE_SHARED_DIR or None,
+        )
+    except Exception as e:
+        logger.warning(f"Configuração de performance indisponível, usando padrões: {e}")
+        return PerformanceMonitor()
+
+
 # Instância global do monitor
-performance_monitor = PerformanceMonitor()
+performance_monitor = _create_performance_monitor()
 
 
 def generate_cache_key(endpoint: str, **params) -> str:
@@ -132,14 +287,15 @@ def monitor_performance(func):
 
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
-            result = func(*args, **kwargs)
+            with tracer.span(f"route.{func.__name__}"):
+                result = func(*args, **kwargs)
             return result
         finally:
-            duration = time.time() - start_time
-            performance_monitor.record_request_time(duration)
+            duration = time.perf_counter() - start_time
+            performance_monitor.record_request_time(duration, func.__name__)
 
             # Log se exceder target P95 configurado
             try:
@@ -198,6 +354,7 @@ def cache_with_filters(timeout: int = 300):
                 cached_result = cache.get(cache_key)
                 if cached_result is not None:
                     performance_monitor.record_cache_hit()
+                    record_cache(CACHE_LAYER_ROUTE, hit=True)
                     logger.debug(f"Cache hit for {cache_key}")
                     return cached_result
             except Exception as e:
@@ -205,6 +362,7 @@ def cache_with_filters(timeout: int = 300):
 
             # Cache miss - executa função
             performance_monitor.record_cache_miss()
+            record_cache(CACHE_LAYER_ROUTE, hit=False)
             logger.debug(f"Cache miss for {cache_key}")
 
             result = func(*args, **kwargs)
@@ -84,6 +84,8 @@ except ImportError:
 
 from config.settings import active_config
 
+from .prometheus_multiprocess import build_multiprocess_registry, generate_multiprocess_latest, multiprocess_dir
+
 logger = logging.getLogger(__name__)
 
 
@@ -94,6 +96,8 @@ class PrometheusMetrics:
         self.enabled = PROMETHEUS_AVAILABLE
         self.registry = registry or CollectorRegistry()
         self.config = active_config()
+        # Workers do gunicorn gravam em arquivos mmap compartilhados (ver utils.prometheus_multiprocess)
+        self.multiprocess_dir = multiprocess_dir() if self.enabled else None
 
         if not self.enabled:
             logger.warning("Métricas Prometheus desabilitadas - prometheus_client não disponível")
@@ -124,6 +128,54 @@ class PrometheusMetrics:
             registry=self.registry,
         )
 
+        self.api_middleware_overhead = Histogram(
+            "glpi_api_middleware_overhead_seconds",
+            "Tempo gasto pelo middleware de observabilidade por requisição, por tier",
+            ["tier"],
+            buckets=[0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1],
+            registry=self.registry,
+        )
+
+        # Custo por requisição da API (ver utils.request_cost)
+        self.request_glpi_calls = Histogram(
+            "glpi_api_request_upstream_calls",
+            "Chamadas ao GLPI por requisição da API",
+            ["endpoint"],
+            buckets=[0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89],
+            registry=self.registry,
+        )
+
+        self.request_glpi_bytes = Histogram(
+            "glpi_api_request_upstream_bytes",
+            "Bytes recebidos do GLPI por requisição da API",
+            ["endpoint"],
+            buckets=[0, 1024, 10240, 102400, 512000, 1048576, 5242880, 20971520, 104857600],
+            registry=self.registry,
+        )
+
+        self.request_rows_decoded = Histogram(
+            "glpi_api_request_rows_decoded",
+            "Linhas decodificadas das respostas do GLPI por requisição da API",
+            ["endpoint"],
+            buckets=[0, 10, 100, 1000, 5000, 10000, 50000, 100000, 500000],
+            registry=self.registry,
+        )
+
+        self.request_serialization_duration = Histogram(
+            "glpi_api_request_serialization_seconds",
+            "Tempo de serialização da resposta por requisição da API",
+            ["endpoint"],
+            buckets=[0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5],
+            registry=self.registry,
+        )
+
+        self.request_cache_lookups = Counter(
+            "glpi_api_request_cache_lookups_total",
+            "Consultas de cache feitas pelas requisições da API, por camada e resultado",
+            ["endpoint", "layer", "result"],
+            registry=self.registry,
+        )
+
         # Métricas de GLPI
         self.glpi_requests_total = Counter(
             "glpi_external_requests_total",
@@ -140,6 +192,21 @@ class PrometheusMetrics:
             registry=self.registry,
         )
 
+        # Métricas de autenticação GLPI
+        self.glpi_auth_total = Counter(
+            "glpi_auth_total",
+            "Total de (re)autenticações no GLPI por resultado",
+            ["result"],
+            registry=self.registry,
+        )
+
+        self.glpi_auth_wait_duration = Histogram(
+            "glpi_auth_wait_duration_seconds",
+            "Tempo de espera pelo lock de reautenticação GLPI em segundos",
+            buckets=[0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 2.0, 5.0, 30.0],
+            registry=self.registry,
+        )
+
         # Métricas de métricas (meta-métricas)
         self.metrics_processing_duration = Histogram(
             "glpi_metrics_processing_duration_seconds",
@@ -164,10 +231,12 @@ class PrometheusMetrics:
         )
 
         # Métricas de sistema
+        # multiprocess_mode: como combinar o gauge entre workers (ignorado fora do modo multiprocesso)
         self.active_connections = Gauge(
             "glpi_active_connections",
             "Número de conexões ativas",
             registry=self.registry,
+            multiprocess_mode="livesum",
         )
 
         self.tickets_total = Gauge(
@@ -175,6 +244,7 @@ class PrometheusMetrics:
             "Total de tickets por status",
             ["status", "level"],
             registry=self.registry,
+            multiprocess_mode="mostrecent",
         )
 
         self.technicians_total = Gauge(
@@ -182,6 +252,7 @@ class PrometheusMetrics:
             "Total de técnicos por nível",
             ["level"],
             registry=self.registry,
+            multiprocess_mode="mostrecent",
         )
 
         # Métricas de erro
@@ -192,6 +263,14 @@ class PrometheusMetrics:
             registry=self.registry,
         )
 
+        # Registros descartados pelo pipeline assíncrono de logs (fila cheia)
+        self.log_records_dropped = Counter(
+            "glpi_log_records_dropped_total",
+            "Total de registros de log descartados por fila cheia, por nível",
+            ["level"],
+            registry=self.registry,
+        )
+
         # Métricas de alertas
         self.alerts_total = Counter(
             "glpi_alerts_total",
@@ -241,8 +320,16 @@ class PrometheusMetrics:
         mock_metric = MockMetric()
         self.api_requests_total = mock_metric  # type: ignore
         self.api_request_duration = mock_metric  # type: ignore
+        self.api_middleware_overhead = mock_metric  # type: ignore
+        self.request_glpi_calls = mock_metric  # type: ignore
+        self.request_glpi_bytes = mock_metric  # type: ignore
+        self.request_rows_decoded = mock_metric  # type: ignore
+        self.request_serialization_duration = mock_metric  # type: ignore
+        self.request_cache_lookups = mock_metric  # type: ignore
         self.glpi_requests_total = mock_metric  # type: ignore
         self.glpi_request_duration = mock_metric  # type: ignore
+        self.glpi_auth_total = mock_metric  # type: ignore
+        self.glpi_auth_wait_duration = mock_metric  # type: ignore
         self.metrics_processing_duration = mock_metric  # type: ignore
         self.metrics_cache_hits = mock_metric  # type: ignore
         self.metrics_cache_misses = mock_metric  # type: ignore
@@ -262,6 +349,28 @@ class PrometheusMetrics:
 
         self.api_request_duration.labels(method=method, endpoint=endpoint).observe(duration)
 
+    def record_middleware_overhead(self, tier: str, duration: float) -> None:
+        """Registra o overhead do middleware de observabilidade (tier basic ou deep)."""
+        if not self.enabled:
+            return
+
+        self.api_middleware_overhead.labels(tier=tier).observe(duration)
+
+    def record_request_cost(self, endpoint: str, cost: Any) -> None:
+        """Registra o custo (``RequestCost``) de uma requisição da API."""
+        if not self.enabled:
+            return
+
+        self.request_glpi_calls.labels(endpoint=endpoint).observe(cost.glpi_calls)
+        self.request_glpi_bytes.labels(endpoint=endpoint).observe(cost.glpi_bytes)
+        self.request_rows_decoded.labels(endpoint=endpoint).observe(cost.rows_decoded)
+        self.request_serialization_duration.labels(endpoint=endpoint).observe(cost.serialization_seconds)
+        for layer, (hits, misses) in cost.cache.items():
+            if hits:
+                self.request_cache_lookups.labels(endpoint=endpoint, layer=layer, result="hit").inc(hits)
+            if misses:
+                self.request_cache_lookups.labels(endpoint=endpoint, layer=layer, result="miss").inc(misses)
+
     def record_glpi_request(self, endpoint: str, status_code: int, duration: float) -> None:
         """Registra uma requisição ao GLPI externo."""
         if not self.enabled:
@@ -271,6 +380,15 @@ class PrometheusMetrics:
 
         self.glpi_request_duration.labels(endpoint=endpoint).observe(duration)
 
+    def record_glpi_auth(self, result: str, wait_duration: float) -> None:
+        """Registra uma (re)autenticação GLPI e o tempo de espera pelo lock."""
+        if not self.enabled:
+            return
+
+        self.glpi_auth_total.labels(result=result).inc()
+
+        self.glpi_auth_wait_duration.observe(wait_duration)
+
     def record_metrics_processing(self, query_type: str, duration: float) -> None:
         """Registra processamento de métricas."""
         if not self.enabled:
@@ -316,6 +434,13 @@ class PrometheusMetrics:
 
         self.errors_total.labels(error_type=error_type, component=component).inc()
 
+    def record_log_dropped(self, level: str) -> None:
+        """Registra um registro de log descartado pelo pipeline assíncrono."""
+        if not self.enabled:
+            return
+
+        self.log_records_dropped.labels(level=level).inc()
+
     def record_alert(self, alert_type: str, severity: str) -> None:
         """Registra um alerta."""
         if not self.enabled:
@@ -350,6 +475,12 @@ class PrometheusMetrics:
         if not self.enabled:
             return "# Prometheus metrics disabled\n"
 
+        if self.multiprocess_dir:
+            # Valores combinados de todos os workers + Info (estático, igual em todos os processos)
+            combined = generate_multiprocess_latest(self.multiprocess_dir)
+            info = generate_latest(self.registry.restricted_registry(["glpi_system_info_info"]))
+            return (combined + info).decode("utf-8")
+
         return generate_latest(self.registry).decode("utf-8")
 
     def push_to_gateway(self, gateway_url: str, job_name: str = "glpi_dashboard") -> None:
@@ -359,7 +490,8 @@ class PrometheusMetrics:
             return
 
         try:
-            push_to_gateway(gateway_url, job=job_name, registry=self.registry)
+            registry = build_multiprocess_registry(self.multiprocess_dir) if self.multiprocess_dir else self.registry
+            push_to_gateway(gateway_url, job=job_name, registry=registry)
             logger.info(f"Métricas enviadas para gateway: {gateway_url}")
         except Exception as e:
             logger.error(f"Erro ao enviar métricas para gateway: {e}")
@@ -0,0 +1,181 @@
+"""Modo multiprocesso das métricas Prometheus (workers do gunicorn).
+
+Com ``PROMETHEUS_MULTIPROC_DIR`` definido antes do primeiro import do
+prometheus_client, cada worker grava seus contadores/histogramas em arquivos
+mmap nesse diretório e o scrape de qualquer worker combina todos eles.
+
+Arquivos de workers encerrados (``max_requests``, crash) são compactados pelo
+master em arquivos ``*_archive.db``: os totais continuam monotônicos e o
+número de arquivos lidos por scrape não cresce com a reciclagem de workers.
+Compactação e leitura são serializadas por um flock no próprio diretório.
+
+Este módulo não importa o prometheus_client no topo: ele é usado pelo
+``gunicorn_config.py`` para definir a variável antes do preload da aplicação.
+"""
+
+import glob
+import os
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+# Marca o processo que já limpou o diretório (reload do config não apaga arquivos vivos)
+_PREPARED_ENV = "GLPI_PROMETHEUS_MULTIPROC_PREPARED"
+
+LOCK_FILENAME = ".lock"
+ARCHIVE_PID = "archive"
+
+# Tipos de arquivo compactáveis -> como combinar valores de workers diferentes
+_COMBINE_MODES = {
+    "counter": "sum",
+    "histogram": "sum",
+    "summary": "sum",
+    "gauge_sum": "sum",
+    "gauge_max": "max",
+    "gauge_min": "min",
+    "gauge_mostrecent": "mostrecent",
+}
+
+
+def multiprocess_dir() -> Optional[str]:
+    """Diretório do modo multiprocesso, se ativo."""
+    path = os.environ.get(MULTIPROC_DIR_ENV)
+    return path if path and os.path.isdir(path) else None
+
+
+def prepare_multiprocess_dir(path: str) -> str:
+    """
+    Cria/limpa o diretório e ativa o modo multiprocesso para este processo e seus filhos.
+
+    Deve rodar no master antes do import da aplicação; arquivos de execuções
+    anteriores são removidos apenas na primeira chamada do processo.
+    """
+    os.makedirs(path, exist_ok=True)
+    if os.environ.get(_PREPARED_ENV) != str(os.getpid()):
+        for stale in glob.glob(os.path.join(path, "*.db")):
+            os.remove(stale)
+        os.environ[_PREPARED_ENV] = str(os.getpid())
+    os.environ[MULTIPROC_DIR_ENV] = path
+    return path
+
+
+@contextmanager
+def _directory_lock(path: str, exclusive: bool) -> Iterator[None]:
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(path, LOCK_FILENAME), "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def build_multiprocess_registry(path: Optional[str] = None) -> Any:
+    """Registry cujo collect combina os arquivos de todos os workers."""
+    from prometheus_client import CollectorRegistry
+    from prometheus_client.multiprocess import MultiProcessCollector
+
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path=path or multiprocess_dir())
+    return registry
+
+
+def generate_multiprocess_latest(path: Optional[str] = None) -> bytes:
+    """Texto de exposição com as métricas combinadas de todos os workers."""
+    from prometheus_client import generate_latest
+
+    path = path or multiprocess_dir()
+    registry = build_multiprocess_registry(path)
+    # Lock compartilhado: a compactação não troca arquivos no meio da leitura
+    with _directory_lock(path, exclusive=False):
+        return generate_latest(registry)
+
+
+def _split_filename(filename: str) -> Tuple[str, str]:
+    """``counter_123.db`` -> ("counter", "123"); ``gauge_livesum_123.db`` -> ("gauge_livesum", "123")."""
+    stem = os.path.basename(filename)[: -len(".db")]
+    kind, _, pid = stem.rpartition("_")
+    return kind, pid
+
+
+def compact_dead_worker(pid: int, path: Optional[str] = None) -> Dict[str, int]:
+    """
+    Limpa os arquivos de um worker encerrado.
+
+    Gauges ``live*`` são removidos (o valor morre com o worker); contadores,
+    histogramas e gauges agregáveis são somados/combinados no arquivo
+    ``<tipo>_archive.db`` e o arquivo do worker é apagado. Retorna
+    {tipo: entradas arquivadas}.
+    """
+    from prometheus_client.mmap_dict import MmapedDict
+    from prometheus_client.multiprocess import mark_process_dead
+
+    path = path or multiprocess_dir()
+    if not path:
+        return {}
+
+    archived: Dict[str, int] = {}
+    with _directory_lock(path, exclusive=True):
+        mark_process_dead(pid, path)
+
+        for filename in glob.glob(os.path.join(path, f"*_{pid}.db")):
+            kind, file_pid = _split_filename(filename)
+            mode = _COMBINE_MODES.get(kind)
+            if mode is None or file_pid != str(pid):
+                continue
+
+            archive_path = os.path.join(path, f"{kind}_{ARCHIVE_PID}.db")
+            combined: Dict[str, Tuple[float, float]] = {}
+            sources = [archive_path, filename] if os.path.exists(archive_path) else [filename]
+            for source in sources:
+                for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(source):
+                    combined[key] = _combine(mode, combined.get(key), value, timestamp)
+
+            # Arquivo novo + rename: leitores nunca veem um archive parcial
+            tmp_path = archive_path + ".tmp"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            archive = MmapedDict(tmp_path)
+            try:
+                for key, (value, timestamp) in combined.items():
+                    archive.write_value(key, value, timestamp)
+            finally:
+                archive.close()
+            os.replace(tmp_path, archive_path)
+            os.remove(filename)
+            archived[kind] = len(combined)
+
+    return archived
+
+
+def _combine(mode: str, current: Optional[Tuple[float, float]], value: float, timestamp: float) -> Tuple[float, float]:
+    if current is None:
+        return value, timestamp
+    current_value, current_timestamp = current
+    if mode == "sum":
+        return current_value + value, max(current_timestamp, timestamp)
+    if mode == "max":
+        return max(current_value, value), max(current_timestamp, timestamp)
+    if mode == "min":
+        return min(current_value, value), max(current_timestamp, timestamp)
+    # mostrecent
+    return (value, timestamp) if timestamp >= current_timestamp else current
+
+
+def multiprocess_file_stats(path: Optional[str] = None) -> Dict[str, Any]:
+    """Quantidade de arquivos por tipo (diagnóstico do diretório)."""
+    path = path or multiprocess_dir()
+    if not path:
+        return {"enabled": False}
+    files = defaultdict(int)
+    for filename in glob.glob(os.path.join(path, "*.db")):
+        files[_split_filename(filename)[0]] += 1
+    return {"enabled": True, "path": path, "files": dict(files)}
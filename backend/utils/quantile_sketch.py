@@ -0,0 +1,200 @@
+"""Sketches de quantis para tempos de resposta.
+
+``LatencySketch`` é um histograma logarítmico (estilo DDSketch/HDR): cada
+valor cai em um bucket cuja largura é proporcional ao próprio valor, então
+qualquer quantil tem erro relativo limitado (1% por padrão), o registro é
+O(1) e dois sketches se combinam somando contagens - inclusive de workers
+diferentes do gunicorn.
+
+``WindowedSketch`` mantém um anel de sketches por fatia de tempo alinhada ao
+epoch; a janela deslizante é a combinação das fatias vivas.
+"""
+
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Valores abaixo disso (em segundos) vão para o bucket zero
+MIN_TRACKED_VALUE = 1e-6
+
+
+class LatencySketch:
+    """Histograma logarítmico mesclável com erro relativo ``relative_accuracy`` nos quantis."""
+
+    __slots__ = ("relative_accuracy", "_gamma", "_log_gamma", "buckets", "zero_count", "count", "total", "min", "max")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Registra um valor (O(1))."""
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        if value <= MIN_TRACKED_VALUE:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        buckets = self.buckets
+        buckets[index] = buckets.get(index, 0) + 1
+
+    def merge(self, other: "LatencySketch") -> "LatencySketch":
+        """Soma as contagens de ``other`` (mesma precisão) neste sketch."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketches com precisões diferentes não podem ser combinados")
+        buckets = self.buckets
+        for index, bucket_count in other.buckets.items():
+            buckets[index] = buckets.get(index, 0) + bucket_count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Valor no quantil ``q`` (0..1); 0.0 se vazio."""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Ponto médio (relativo) do bucket, limitado aos extremos observados
+                value = 2 * self._gamma**index / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def quantiles(self, qs: List[float]) -> Dict[float, float]:
+        """Vários quantis em uma única passada pelos buckets."""
+        result = {q: 0.0 for q in qs}
+        if self.count == 0:
+            return result
+
+        pending = sorted(qs)
+        seen = self.zero_count
+        position = 0
+        while position < len(pending) and pending[position] * (self.count - 1) < seen:
+            position += 1
+
+        for index in sorted(self.buckets):
+            if position >= len(pending):
+                break
+            seen += self.buckets[index]
+            value = min(max(2 * self._gamma**index / (self._gamma + 1), self.min), self.max)
+            while position < len(pending) and pending[position] * (self.count - 1) < seen:
+                result[pending[position]] = value
+                position += 1
+        return result
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forma serializável (JSON) para troca entre processos."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "buckets": {str(index): bucket_count for index, bucket_count in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencySketch":
+        sketch = cls(data.get("relative_accuracy", 0.01))
+        sketch.buckets = {int(index): bucket_count for index, bucket_count in data.get("buckets", {}).items()}
+        sketch.zero_count = data.get("zero_count", 0)
+        sketch.count = data.get("count", 0)
+        sketch.total = data.get("total", 0.0)
+        sketch.min = data["min"] if data.get("min") is not None else math.inf
+        sketch.max = data.get("max", 0.0)
+        return sketch
+
+
+class WindowedSketch:
+    """Janela deslizante de ``slot_count`` fatias de ``slot_seconds``, cada uma com seu sketch."""
+
+    def __init__(self, window_seconds: float = 300, slot_count: int = 10, relative_accuracy: float = 0.01):
+        self.slot_count = slot_count
+        self.slot_seconds = window_seconds / slot_count
+        self.relative_accuracy = relative_accuracy
+        # Fatias alinhadas ao epoch: o mesmo slot_id corresponde ao mesmo intervalo em todos os workers
+        self._slot_ids: List[int] = [-1] * slot_count
+        self._slots: List[LatencySketch] = [LatencySketch(relative_accuracy) for _ in range(slot_count)]
+        self._lock = threading.Lock()
+
+    @property
+    def window_seconds(self) -> float:
+        return self.slot_seconds * self.slot_count
+
+    def _slot_id(self, now: Optional[float]) -> int:
+        return int((time.time() if now is None else now) // self.slot_seconds)
+
+    def record(self, value: float, now: Optional[float] = None) -> None:
+        slot_id = self._slot_id(now)
+        position = slot_id % self.slot_count
+        with self._lock:
+            if self._slot_ids[position] != slot_id:
+                # Fatia expirada: reaproveita a posição do anel
+                self._slot_ids[position] = slot_id
+                self._slots[position] = LatencySketch(self.relative_accuracy)
+            self._slots[position].record(value)
+
+    def _live(self, now: Optional[float]) -> List[Tuple[int, LatencySketch]]:
+        # Chamar com o lock: ``record`` altera os buckets das fatias vivas
+        oldest = self._slot_id(now) - self.slot_count + 1
+        return [(slot_id, sketch) for slot_id, sketch in zip(self._slot_ids, self._slots) if slot_id >= oldest and sketch.count]
+
+    def live_slots(self, now: Optional[float] = None) -> Dict[int, LatencySketch]:
+        """Cópias das fatias dentro da janela, por slot_id."""
+        with self._lock:
+            return {slot_id: LatencySketch(self.relative_accuracy).merge(sketch) for slot_id, sketch in self._live(now)}
+
+    def merged(self, now: Optional[float] = None) -> LatencySketch:
+        """Sketch da janela inteira."""
+        result = LatencySketch(self.relative_accuracy)
+        with self._lock:
+            for _, sketch in self._live(now):
+                result.merge(sketch)
+        return result
+
+    def to_dict(self, now: Optional[float] = None) -> Dict[str, Any]:
+        with self._lock:
+            slots = {str(slot_id): sketch.to_dict() for slot_id, sketch in self._live(now)}
+        return {"slot_seconds": self.slot_seconds, "slots": slots}
+
+    @staticmethod
+    def merge_dicts(snapshots: List[Dict[str, Any]], window_seconds: float, now: Optional[float] = None) -> LatencySketch:
+        """Combina snapshots (``to_dict``) de vários processos, descartando fatias fora da janela."""
+        now = time.time() if now is None else now
+        result: Optional[LatencySketch] = None
+        for snapshot in snapshots:
+            slot_seconds = snapshot.get("slot_seconds") or window_seconds
+            oldest = int(now // slot_seconds) - int(round(window_seconds / slot_seconds)) + 1
+            for slot_id, data in snapshot.get("slots", {}).items():
+                if int(slot_id) < oldest:
+                    continue
+                sketch = LatencySketch.from_dict(data)
+                result = sketch if result is None else result.merge(sketch)
+        return result or LatencySketch()
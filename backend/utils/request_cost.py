@@ -0,0 +1,143 @@
+"""Contabilidade de custo por requisição.
+
+Cada requisição tem um acumulador (propagado por contextvar, como o
+correlation ID, e carregado também pelo ``QueryContext``) que soma as chamadas
+ao GLPI, bytes recebidos, linhas decodificadas, hits/misses por camada de
+cache e o tempo de serialização. No fim da requisição o middleware publica o
+resumo no header ``X-Request-Cost`` e em histogramas Prometheus por endpoint,
+o que deixa regressões como N+1 chamadas ao GLPI visíveis de imediato.
+
+Sem acumulador ativo (scripts, threads de fundo) os registros são ignorados.
+"""
+
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+# Camadas de cache contabilizadas
+CACHE_LAYER_ROUTE = "route"  # cache_with_filters (Flask-Caching)
+CACHE_LAYER_UNIFIED = "unified"  # UnifiedCache
+CACHE_LAYER_SHARED_FETCH = "shared_fetch"  # deduplicação de chamadas entre queries do mesmo plano
+CACHE_LAYER_HIERARCHY = "hierarchy"  # hierarquia de técnicos no adapter
+CACHE_LAYER_FIELD_IDS = "field_ids"  # IDs de campos da search API no adapter
+
+
+class RequestCost:
+    """Acumulador de custo de uma requisição."""
+
+    __slots__ = (
+        "glpi_calls",
+        "glpi_errors",
+        "glpi_bytes",
+        "glpi_seconds",
+        "rows_decoded",
+        "cache",
+        "serialization_seconds",
+        "serialization_bytes",
+    )
+
+    def __init__(self):
+        self.glpi_calls = 0
+        self.glpi_errors = 0
+        self.glpi_bytes = 0
+        self.glpi_seconds = 0.0
+        self.rows_decoded = 0
+        # camada -> [hits, misses]
+        self.cache: Dict[str, List[int]] = {}
+        self.serialization_seconds = 0.0
+        self.serialization_bytes = 0
+
+    def record_glpi_call(self, bytes_received: int, duration: float, rows: int = 0, error: bool = False) -> None:
+        self.glpi_calls += 1
+        self.glpi_bytes += bytes_received
+        self.glpi_seconds += duration
+        self.rows_decoded += rows
+        if error:
+            self.glpi_errors += 1
+
+    def record_cache(self, layer: str, hit: bool) -> None:
+        counts = self.cache.get(layer)
+        if counts is None:
+            counts = self.cache[layer] = [0, 0]
+        counts[0 if hit else 1] += 1
+
+    def record_serialization(self, duration: float, size: int) -> None:
+        self.serialization_seconds += duration
+        self.serialization_bytes += size
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "glpi_calls": self.glpi_calls,
+            "glpi_errors": self.glpi_errors,
+            "glpi_bytes": self.glpi_bytes,
+            "glpi_ms": round(self.glpi_seconds * 1000, 3),
+            "rows_decoded": self.rows_decoded,
+            "cache": {layer: {"hits": hits, "misses": misses} for layer, (hits, misses) in self.cache.items()},
+            "serialization_ms": round(self.serialization_seconds * 1000, 3),
+            "serialization_bytes": self.serialization_bytes,
+        }
+
+    def header_value(self) -> str:
+        """Resumo compacto para header: ``glpi=3; bytes=18230; rows=412; cache.unified=1/2; ser=0.41ms``."""
+        parts = [
+            f"glpi={self.glpi_calls}",
+            f"glpi_ms={self.glpi_seconds * 1000:.1f}",
+            f"bytes={self.glpi_bytes}",
+            f"rows={self.rows_decoded}",
+        ]
+        if self.glpi_errors:
+            parts.append(f"glpi_errors={self.glpi_errors}")
+        # hits/misses por camada
+        parts.extend(f"cache.{layer}={hits}/{misses}" for layer, (hits, misses) in sorted(self.cache.items()))
+        parts.append(f"ser={self.serialization_seconds * 1000:.2f}ms")
+        return "; ".join(parts)
+
+
+_current_cost: ContextVar[Optional[RequestCost]] = ContextVar("request_cost", default=None)
+
+
+def start_request_cost() -> RequestCost:
+    """Abre o acumulador da requisição atual."""
+    cost = RequestCost()
+    _current_cost.set(cost)
+    return cost
+
+
+def finish_request_cost() -> Optional[RequestCost]:
+    """Fecha o acumulador da requisição atual e o devolve (None se não havia)."""
+    cost = _current_cost.get()
+    _current_cost.set(None)
+    return cost
+
+
+def current_request_cost() -> Optional[RequestCost]:
+    return _current_cost.get()
+
+
+def record_glpi_call(bytes_received: int, duration: float, rows: int = 0, error: bool = False) -> None:
+    cost = _current_cost.get()
+    if cost is not None:
+        cost.record_glpi_call(bytes_received, duration, rows, error)
+
+
+def record_cache(layer: str, hit: bool) -> None:
+    cost = _current_cost.get()
+    if cost is not None:
+        cost.record_cache(layer, hit)
+
+
+def record_serialization(duration: float, size: int) -> None:
+    cost = _current_cost.get()
+    if cost is not None:
+        cost.record_serialization(duration, size)
+
+
+def count_rows(payload: Any) -> int:
+    """Linhas de uma resposta do GLPI: lista direta ou a lista em ``data`` (search API)."""
+    if isinstance(payload, list):
+        return len(payload)
+    if isinstance(payload, dict):
+        data = payload.get("data")
+        if isinstance(data, list):
+            return len(data)
+        return 1 if payload else 0
+    return 0
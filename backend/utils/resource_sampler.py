@@ -0,0 +1,181 @@
+"""Amostragem periódica de recursos do processo.
+
+Uma thread de fundo lê RSS, CPU, threads, file descriptors e estatísticas do
+GC em intervalo fixo e guarda as amostras em um buffer circular. Requisições
+não fazem syscalls de psutil: leem a última amostra, os agregados
+(min/max/média) ou a série temporal.
+"""
+
+import gc
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+# Campos numéricos de cada amostra (além de ``timestamp``)
+SAMPLE_FIELDS = (
+    "rss_mb",
+    "vms_mb",
+    "memory_percent",
+    "cpu_percent",
+    "num_threads",
+    "open_fds",
+    "gc_objects_gen0",
+    "gc_objects_gen1",
+    "gc_objects_gen2",
+    "gc_collections",
+    "gc_pause_ms",
+)
+
+
+class ResourceSampler:
+    """Amostrador em thread de fundo com histórico em buffer circular."""
+
+    def __init__(self, interval: float = 5.0, capacity: int = 720):
+        self.interval = interval
+        self.samples: deque = deque(maxlen=capacity)
+        self.peaks: Dict[str, float] = {}
+        self._process = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        # Pausas do GC medidas via gc.callbacks, acumuladas entre amostras
+        self._gc_started_at: Optional[float] = None
+        self._gc_pause_seconds = 0.0
+        self._gc_collections = 0
+
+    # Ciclo de vida
+
+    def ensure_started(self) -> None:
+        """Inicia a thread (ou reinicia após fork do gunicorn); barato quando já está rodando."""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            # psutil.Process guarda o pid: recria no processo filho
+            self._process = psutil.Process() if PSUTIL_AVAILABLE else None
+            if self._gc_callback not in gc.callbacks:
+                gc.callbacks.append(self._gc_callback)
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _run(self) -> None:
+        stop_event = self._stop_event
+        if self._process is not None:
+            # Primeira leitura de cpu_percent apenas inicializa a referência
+            self._process.cpu_percent(None)
+        self.sample_now()
+        while not stop_event.wait(self.interval):
+            self.sample_now()
+
+    def _gc_callback(self, phase: str, info: Dict[str, Any]) -> None:
+        if phase == "start":
+            self._gc_started_at = time.perf_counter()
+        elif self._gc_started_at is not None:
+            self._gc_pause_seconds += time.perf_counter() - self._gc_started_at
+            self._gc_collections += 1
+            self._gc_started_at = None
+
+    # Amostragem
+
+    def sample_now(self) -> Dict[str, Any]:
+        """Lê os recursos do processo e acrescenta a amostra ao histórico."""
+        sample: Dict[str, Any] = {"timestamp": time.time()}
+
+        process = self._process
+        if process is not None:
+            try:
+                with process.oneshot():
+                    memory_info = process.memory_info()
+                    sample["rss_mb"] = memory_info.rss / 1024 / 1024
+                    sample["vms_mb"] = memory_info.vms / 1024 / 1024
+                    sample["memory_percent"] = process.memory_percent()
+                    # Percentual desde a amostra anterior (um intervalo inteiro, não uma requisição)
+                    sample["cpu_percent"] = process.cpu_percent(None)
+                    sample["num_threads"] = process.num_threads()
+                    sample["open_fds"] = process.num_fds() if hasattr(process, "num_fds") else None
+            except (psutil.Error, OSError):
+                pass
+
+        gen0, gen1, gen2 = gc.get_count()
+        sample["gc_objects_gen0"] = gen0
+        sample["gc_objects_gen1"] = gen1
+        sample["gc_objects_gen2"] = gen2
+        sample["gc_collections"] = self._gc_collections
+        sample["gc_pause_ms"] = self._gc_pause_seconds * 1000
+        self._gc_collections = 0
+        self._gc_pause_seconds = 0.0
+
+        self.samples.append(sample)
+        for field in SAMPLE_FIELDS:
+            value = sample.get(field)
+            if value is not None and value > self.peaks.get(field, float("-inf")):
+                self.peaks[field] = value
+        return sample
+
+    # Leituras
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Última amostra (None antes da primeira)."""
+        return self.samples[-1] if self.samples else None
+
+    def _window(self, window_seconds: Optional[float]) -> List[Dict[str, Any]]:
+        samples = list(self.samples)
+        if window_seconds is None:
+            return samples
+        cutoff = time.time() - window_seconds
+        return [sample for sample in samples if sample["timestamp"] >= cutoff]
+
+    def rollups(self, window_seconds: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """min/max/média/última por campo na janela (histórico inteiro se ``window_seconds`` é None)."""
+        samples = self._window(window_seconds)
+        rollups: Dict[str, Dict[str, Any]] = {}
+        for field in SAMPLE_FIELDS:
+            values = [sample[field] for sample in samples if sample.get(field) is not None]
+            if not values:
+                continue
+            rollups[field] = {
+                "min": min(values),
+                "max": max(values),
+                "avg": sum(values) / len(values),
+                "last": values[-1],
+            }
+        return rollups
+
+    def series(self, window_seconds: Optional[float] = None, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Amostras da janela, opcionalmente só com alguns campos."""
+        samples = self._window(window_seconds)
+        if not fields:
+            return samples
+        keep = ["timestamp", *[field for field in fields if field in SAMPLE_FIELDS]]
+        return [{field: sample.get(field) for field in keep} for sample in samples]
+
+    def reset(self) -> None:
+        """Limpa histórico e picos."""
+        self.samples.clear()
+        self.peaks.clear()
+
+    @property
+    def window_capacity_seconds(self) -> float:
+        return self.interval * (self.samples.maxlen or 0)
+
+
+# Instância global
+resource_sampler = ResourceSampler()
@@ -0,0 +1,236 @@
+"""Profiler estatístico sob demanda para os threads do worker.
+
+Uma thread de fundo lê ``sys._current_frames()`` em intervalo fixo e conta
+as pilhas de todos os outros threads. Nada é instrumentado: fora de uma
+sessão o custo é zero, e durante a sessão o intervalo acompanha a média móvel
+do custo das amostras para que ele não passe de ``max_overhead`` (fração do
+tempo de parede) - e volta ao intervalo pedido quando o custo cai.
+
+O resultado traz as pilhas no formato "collapsed" (``frame;frame;frame N``,
+aceito por flamegraph.pl, speedscope e inferno) e o top-N de funções por
+tempo próprio (folha da pilha) e total (presente na pilha).
+
+Só uma sessão roda por processo; pedidos concorrentes recebem
+``ProfilerBusyError``.
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Funções-folha que indicam thread parado esperando (excluídas por padrão)
+IDLE_LEAF_FUNCTIONS = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("socket.py", "accept"),
+    ("socketserver.py", "serve_forever"),
+}
+
+MIN_INTERVAL = 0.001
+# Amostras na média móvel do custo usada pelo teto de overhead
+COST_WINDOW = 16
+MAX_STACK_DEPTH = 128
+
+
+class ProfilerBusyError(RuntimeError):
+    """Já existe uma sessão de profiling neste processo."""
+
+
+def _frame_label(code) -> str:
+    # Sem ';' (separador do formato collapsed) e agregando por função, não por linha
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class ProfileSession:
+    """Uma coleta: amostras acumuladas e parâmetros efetivos."""
+
+    def __init__(self, seconds: float, interval: float, max_overhead: float, include_idle: bool):
+        self.seconds = seconds
+        self.requested_interval = interval
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.thread_samples = 0
+        self.idle_skipped = 0
+        self.sampling_seconds = 0.0
+        self._recent_costs: Deque[float] = deque(maxlen=COST_WINDOW)
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.done = threading.Event()
+        self.error: Optional[str] = None
+
+    def _collect(self, own_ident: int) -> None:
+        frames = sys._current_frames()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in frames.items():
+            if ident == own_ident:
+                continue
+            code = frame.f_code
+            if not self.include_idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAF_FUNCTIONS:
+                self.idle_skipped += 1
+                continue
+
+            labels = []
+            depth = 0
+            while frame is not None and depth < MAX_STACK_DEPTH:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+                depth += 1
+            labels.append(names.get(ident, f"thread-{ident}").replace(";", ":"))
+            labels.reverse()
+            self.stacks[";".join(labels)] += 1
+            self.thread_samples += 1
+        self.samples += 1
+
+    def _adjust_interval(self, cost: float) -> None:
+        """Teto de overhead: intervalo = max(pedido, média móvel do custo / max_overhead)."""
+        if self.max_overhead <= 0:
+            return
+        self._recent_costs.append(cost)
+        average_cost = sum(self._recent_costs) / len(self._recent_costs)
+        self.interval = min(max(self.requested_interval, average_cost / self.max_overhead), self.seconds)
+
+    def run(self) -> None:
+        own_ident = threading.get_ident()
+        deadline = time.perf_counter() + self.seconds
+        try:
+            while True:
+                sample_start = time.perf_counter()
+                if sample_start >= deadline:
+                    break
+                self._collect(own_ident)
+                cost = time.perf_counter() - sample_start
+                self.sampling_seconds += cost
+
+                self._adjust_interval(cost)
+                time.sleep(max(0.0, min(self.interval - cost, deadline - time.perf_counter())))
+        except Exception as e:  # pragma: no cover - defensivo: a thread nunca deve derrubar o worker
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.finished_at = time.time()
+            self.done.set()
+
+    # Resultado
+
+    def collapsed(self) -> List[str]:
+        """Linhas ``pilha contagem``, mais frequentes primeiro."""
+        return [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+
+    def top_functions(self, top_n: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """(top por tempo próprio, top por tempo total), em amostras e percentual."""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]  # primeiro item é o nome do thread
+            if not frames:
+                continue
+            self_counts[frames[-1]] += count
+            for label in set(frames):
+                total_counts[label] += count
+
+        def rows(counter: Counter) -> List[Dict[str, Any]]:
+            total = self.thread_samples or 1
+            return [
+                {"function": label, "samples": count, "percent": round(100.0 * count / total, 2)}
+                for label, count in counter.most_common(top_n)
+            ]
+
+        return rows(self_counts), rows(total_counts)
+
+    def to_dict(self, top_n: int = 20, include_collapsed: bool = True) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        top_self, top_total = self.top_functions(top_n)
+        result = {
+            "pid": os.getpid(),
+            "status": "done" if self.done.is_set() else "running",
+            "error": self.error,
+            "started_at": self.started_at,
+            "seconds": self.seconds,
+            "elapsed_seconds": round(elapsed, 3),
+            "requested_interval_ms": round(self.requested_interval * 1000, 3),
+            "effective_interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "thread_samples": self.thread_samples,
+            "idle_skipped": self.idle_skipped,
+            "overhead_percent": round(100.0 * self.sampling_seconds / elapsed, 3) if elapsed > 0 else 0.0,
+            "top_self": top_self,
+            "top_total": top_total,
+        }
+        if include_collapsed:
+            result["collapsed"] = self.collapsed()
+        return result
+
+
+class SamplingProfiler:
+    """Limita duração, intervalo e concorrência das sessões; guarda a última."""
+
+    def __init__(self, max_seconds: float = 30.0, default_interval: float = 0.01, max_overhead: float = 0.02):
+        self.max_seconds = max_seconds
+        self.default_interval = default_interval
+        self.max_overhead = max_overhead
+        self.last_session: Optional[ProfileSession] = None
+        self._lock = threading.Lock()
+
+    def start(
+        self, seconds: float, interval: Optional[float] = None, include_idle: bool = False
+    ) -> ProfileSession:
+        """Inicia uma sessão em thread de fundo; ``ProfilerBusyError`` se já houver uma rodando."""
+        # NaN passaria por min/max: sessão sem fim (lock preso) ou intervalo zero (loop ocupado)
+        seconds = min(max(seconds, 0.1), self.max_seconds) if math.isfinite(seconds) else self.max_seconds
+        if not interval or not math.isfinite(interval):
+            interval = self.default_interval
+
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("Profiling já em andamento neste worker")
+
+        try:
+            session = ProfileSession(
+                seconds=seconds,
+                interval=min(max(interval, MIN_INTERVAL), seconds),
+                max_overhead=self.max_overhead,
+                include_idle=include_idle,
+            )
+            thread = threading.Thread(target=self._run, args=(session,), name="sampling-profiler", daemon=True)
+            self.last_session = session
+            thread.start()
+        except BaseException:
+            self._lock.release()
+            raise
+        return session
+
+    def _run(self, session: ProfileSession) -> None:
+        try:
+            session.run()
+        finally:
+            self._lock.release()
+
+    def profile(self, seconds: float, interval: Optional[float] = None, include_idle: bool = False) -> ProfileSession:
+        """Executa uma sessão e espera o fim."""
+        session = self.start(seconds, interval, include_idle)
+        session.done.wait(session.seconds + 5)
+        return session
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+
+# Instância global
+sampling_profiler = SamplingProfiler()
+
+
+def configure_profiler(max_seconds: float = 30.0, default_interval: float = 0.01, max_overhead: float = 0.02) -> SamplingProfiler:
+    """Ajusta os limites da instância global a partir da configuração da aplicação."""
+    sampling_profiler.max_seconds = max_seconds
+    sampling_profiler.default_interval = max(default_interval, MIN_INTERVAL)
+    sampling_profiler.max_overhead = max_overhead
+    return sampling_profiler
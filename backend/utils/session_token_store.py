@@ -0,0 +1,460 @@
+"""Store de token de sessão GLPI compartilhado entre processos (workers do gunicorn)"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import active_config
+
+logger = logging.getLogger("session_token_store")
+
+try:
+    import fcntl
+
+    FCNTL_AVAILABLE = True
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    FCNTL_AVAILABLE = False
+
+try:
+    import redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+
+@dataclass
+class SessionTokenRecord:
+    """Token de sessão compartilhado com expiração absoluta (epoch)"""
+
+    token: str
+    created_at: float
+    expires_at: float
+    generation: int = 0
+
+    def remaining(self, now: Optional[float] = None) -> float:
+        return self.expires_at - (now if now is not None else time.time())
+
+
+def session_store_key(glpi_url: str, user_token: Optional[str]) -> str:
+    """Chave do store por instância GLPI + credencial (sem expor o token)"""
+    # Mesma chave com ou sem o sufixo /apirest.php na URL configurada
+    glpi_url = (glpi_url or "").rstrip("/")
+    if glpi_url.endswith("/apirest.php"):
+        glpi_url = glpi_url.rsplit("/apirest.php", 1)[0]
+    digest = hashlib.sha256(f"{glpi_url}|{user_token or ''}".encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+class SessionTokenStore(ABC):
+    """
+    Base do store: um token válido por chave, expiração compartilhada,
+    renovação single-flight (lock entre processos) e invalidação em 401.
+
+    Subclasses implementam apenas _read, _write, _delete_if_token e _create_lock.
+    """
+
+    backend = "base"
+
+    def __init__(self, refresh_margin_seconds: float = 300, lock_timeout_seconds: float = 35):
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self._background_refreshing: set = set()
+        self._background_guard = threading.Lock()
+        # Atualizado pelas threads de requisição e pela renovação em background
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "refreshes": 0,
+            "shared_reuses": 0,
+            "background_refreshes": 0,
+            "invalidations": 0,
+            "lock_timeouts": 0,
+        }
+
+    # Primitivas do backend
+    @abstractmethod
+    def _read(self, key: str) -> Optional[SessionTokenRecord]:
+        """Registro gravado (mesmo expirado) ou None"""
+
+    @abstractmethod
+    def _write(self, key: str, record: SessionTokenRecord) -> None:
+        """Grava o registro de forma atômica para os leitores"""
+
+    @abstractmethod
+    def _delete_if_token(self, key: str, token: str) -> bool:
+        """Apaga o registro apenas se ainda guardar ``token`` (compare-and-delete)"""
+
+    @abstractmethod
+    def _create_lock(self, key: str) -> Any:
+        """Retorna objeto com acquire(timeout) -> bool e release()"""
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    # API pública
+    def get(self, key: str) -> Optional[SessionTokenRecord]:
+        """Registro atual se ainda não expirou"""
+        try:
+            record = self._read(key)
+        except Exception as e:
+            logger.warning(f"Falha ao ler token compartilhado ({self.backend}): {e}")
+            return None
+        if record and record.remaining() > 0:
+            return record
+        return None
+
+    def get_or_refresh(
+        self,
+        key: str,
+        login: Callable[[], Optional[str]],
+        ttl_seconds: float,
+    ) -> Optional[SessionTokenRecord]:
+        """
+        Retorna o token compartilhado, fazendo login apenas se não houver um válido.
+
+        Perto do vencimento o token atual é devolvido e a renovação acontece
+        em background; sem token válido, apenas um processo faz login e os
+        demais esperam o lock e reutilizam o token gravado.
+        """
+        record = self.get(key)
+        if record:
+            self._count("hits")
+            if record.remaining() <= self.refresh_margin_seconds:
+                self.refresh_in_background(key, login, ttl_seconds)
+            return record
+
+        return self._refresh(key, login, ttl_seconds, blocking=True)
+
+    def invalidate(self, key: str, token: Optional[str]) -> bool:
+        """Remove o token se ainda for o gravado (401) - nunca apaga um token mais novo"""
+        if not token:
+            return False
+        try:
+            removed = self._delete_if_token(key, token)
+        except Exception as e:
+            logger.warning(f"Falha ao invalidar token compartilhado ({self.backend}): {e}")
+            return False
+        if removed:
+            self._count("invalidations")
+            logger.info(f"Token de sessão GLPI invalidado no store {self.backend}")
+        return removed
+
+    def refresh_in_background(self, key: str, login: Callable[[], Optional[str]], ttl_seconds: float) -> None:
+        """Renovação proativa; ignora se já houver uma em andamento neste processo"""
+        with self._background_guard:
+            if key in self._background_refreshing:
+                return
+            self._background_refreshing.add(key)
+
+        def run():
+            try:
+                if self._refresh(key, login, ttl_seconds, blocking=False):
+                    self._count("background_refreshes")
+            except Exception as e:
+                logger.warning(f"Renovação em background do token GLPI falhou: {e}")
+            finally:
+                with self._background_guard:
+                    self._background_refreshing.discard(key)
+
+        threading.Thread(target=run, name="glpi-session-refresh", daemon=True).start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {"backend": self.backend, **self.stats}
+
+    def _refresh(
+        self,
+        key: str,
+        login: Callable[[], Optional[str]],
+        ttl_seconds: float,
+        blocking: bool,
+    ) -> Optional[SessionTokenRecord]:
+        lock = self._create_lock(key)
+        acquired = lock.acquire(self.lock_timeout_seconds if blocking else 0)
+        if not acquired:
+            if not blocking:
+                # Outro processo já está renovando
+                return None
+            # Dono do lock travado: segue sem coordenação para não bloquear requisições
+            self._count("lock_timeouts")
+            logger.warning(f"Timeout aguardando lock de sessão GLPI ({self.backend}); autenticando sem coordenação")
+
+        try:
+            # Outro processo pode ter renovado enquanto esperávamos o lock
+            previous = self.get(key)
+            if previous and previous.remaining() > self.refresh_margin_seconds:
+                self._count("shared_reuses")
+                return previous
+
+            token = login()
+            if not token:
+                return None
+
+            now = time.time()
+            record = SessionTokenRecord(
+                token=token,
+                created_at=now,
+                expires_at=now + ttl_seconds,
+                generation=(previous.generation + 1) if previous else 1,
+            )
+            try:
+                self._write(key, record)
+            except Exception as e:
+                logger.warning(f"Falha ao gravar token compartilhado ({self.backend}): {e}")
+            self._count("refreshes")
+            return record
+        finally:
+            if acquired:
+                lock.release()
+
+
+class _ThreadLock:
+    def __init__(self, lock: threading.Lock):
+        self._lock = lock
+
+    def acquire(self, timeout: float) -> bool:
+        if timeout <= 0:
+            return self._lock.acquire(blocking=False)
+        return self._lock.acquire(timeout=timeout)
+
+    def release(self) -> None:
+        self._lock.release()
+
+
+class MemorySessionTokenStore(SessionTokenStore):
+    """Fallback local ao processo (sem /dev/shm nem Redis)"""
+
+    backend = "memory"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._records: Dict[str, SessionTokenRecord] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _read(self, key: str) -> Optional[SessionTokenRecord]:
+        return self._records.get(key)
+
+    def _write(self, key: str, record: SessionTokenRecord) -> None:
+        self._records[key] = record
+
+    def _delete_if_token(self, key: str, token: str) -> bool:
+        with self._guard:
+            record = self._records.get(key)
+            if record and record.token == token:
+                del self._records[key]
+                return True
+        return False
+
+    def _create_lock(self, key: str) -> _ThreadLock:
+        with self._guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        return _ThreadLock(lock)
+
+
+class _FileLock:
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def acquire(self, timeout: float) -> bool:
+        self._fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(self._fd)
+                    self._fd = None
+                    return False
+                time.sleep(0.05)
+
+    def release(self) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class FileSessionTokenStore(SessionTokenStore):
+    """
+    Store em arquivo (tmpfs /dev/shm) com flock.
+
+    Escritas são atômicas (arquivo temporário + os.replace), então leituras não
+    precisam de lock; o flock só serializa renovações e invalidações.
+    """
+
+    backend = "file"
+
+    def __init__(self, directory: str, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"glpi_session_{key}.json")
+
+    def _read(self, key: str) -> Optional[SessionTokenRecord]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return SessionTokenRecord(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError):
+            # Arquivo corrompido/parcial - tratar como ausente
+            return None
+
+    def _write(self, key: str, record: SessionTokenRecord) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".glpi_session_")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(asdict(record), f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _delete_if_token(self, key: str, token: str) -> bool:
+        lock = self._create_lock(key)
+        acquired = lock.acquire(self.lock_timeout_seconds)
+        try:
+            record = self._read(key)
+            if record and record.token == token:
+                os.unlink(self._path(key))
+                return True
+            return False
+        finally:
+            if acquired:
+                lock.release()
+
+    def _create_lock(self, key: str) -> _FileLock:
+        return _FileLock(self._path(key) + ".lock")
+
+
+class _RedisLock:
+    _RELEASE_SCRIPT = "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0"
+
+    def __init__(self, client: Any, key: str, ttl_seconds: float):
+        self.client = client
+        self.key = key
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.owner = uuid.uuid4().hex
+
+    def acquire(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.client.set(self.key, self.owner, nx=True, px=self.ttl_ms):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def release(self) -> None:
+        try:
+            self.client.eval(self._RELEASE_SCRIPT, 1, self.key, self.owner)
+        except Exception as e:
+            logger.warning(f"Falha ao liberar lock de sessão no Redis: {e}")
+
+
+class RedisSessionTokenStore(SessionTokenStore):
+    """Store em Redis: compartilha o token entre hosts, não só entre workers"""
+
+    backend = "redis"
+
+    _DELETE_IF_TOKEN_SCRIPT = (
+        "local v = redis.call('GET', KEYS[1]) "
+        "if v and cjson.decode(v)['token'] == ARGV[1] then return redis.call('DEL', KEYS[1]) end "
+        "return 0"
+    )
+
+    def __init__(self, redis_url: str, key_prefix: str = "glpi_dashboard:", **kwargs):
+        super().__init__(**kwargs)
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self._client = None
+        self._client_pid: Optional[int] = None
+
+    @property
+    def client(self) -> Any:
+        # Conexões não sobrevivem ao fork do gunicorn (preload_app)
+        if self._client is None or self._client_pid != os.getpid():
+            self._client = redis.Redis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+            self._client_pid = os.getpid()
+        return self._client
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.key_prefix}glpi_session:{key}"
+
+    def _read(self, key: str) -> Optional[SessionTokenRecord]:
+        raw = self.client.get(self._redis_key(key))
+        if not raw:
+            return None
+        try:
+            return SessionTokenRecord(**json.loads(raw))
+        except (ValueError, TypeError):
+            return None
+
+    def _write(self, key: str, record: SessionTokenRecord) -> None:
+        ttl = max(int(record.remaining()), 1)
+        self.client.set(self._redis_key(key), json.dumps(asdict(record)), ex=ttl)
+
+    def _delete_if_token(self, key: str, token: str) -> bool:
+        return bool(self.client.eval(self._DELETE_IF_TOKEN_SCRIPT, 1, self._redis_key(key), token))
+
+    def _create_lock(self, key: str) -> _RedisLock:
+        return _RedisLock(self.client, self._redis_key(key) + ":lock", self.lock_timeout_seconds)
+
+
+_store: Optional[SessionTokenStore] = None
+_store_lock = threading.Lock()
+
+
+def _create_store() -> SessionTokenStore:
+    config_obj = active_config()
+    backend = str(getattr(config_obj, "GLPI_SESSION_STORE", "auto")).lower()
+    directory = getattr(config_obj, "GLPI_SESSION_STORE_DIR", "/dev/shm")
+
+    if backend == "redis":
+        if REDIS_AVAILABLE:
+            store = RedisSessionTokenStore(
+                getattr(config_obj, "REDIS_URL", "redis://localhost:6379/0"),
+                key_prefix=getattr(config_obj, "CACHE_KEY_PREFIX", "glpi_dashboard:"),
+            )
+            try:
+                store.client.ping()
+                return store
+            except Exception as e:
+                logger.warning(f"Redis indisponível para o store de sessão GLPI, usando fallback: {e}")
+        else:
+            logger.warning("Pacote redis não instalado, usando fallback para o store de sessão GLPI")
+        backend = "auto"
+
+    if backend in ("auto", "file") and FCNTL_AVAILABLE and os.path.isdir(directory) and os.access(directory, os.W_OK):
+        return FileSessionTokenStore(directory)
+
+    return MemorySessionTokenStore()
+
+
+def get_session_token_store() -> SessionTokenStore:
+    """Store compartilhado do processo (criado sob demanda conforme configuração)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _create_store()
+                logger.info(f"Store de sessão GLPI: {_store.backend}")
+    return _store
@@ -11,8 +11,8 @@ import time
 import uuid
 from contextvars import ContextVar
 from datetime import datetime
-from functools import wraps
-from typing import Any, Dict, List, Optional, Union, Pattern
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple, Union
 from urllib.parse import urlparse, parse_qs
 
 from .prometheus_metrics import prometheus_metrics
@@ -21,6 +21,15 @@ from .prometheus_metrics import prometheus_metrics
 correlation_id_var: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
 operation_context_var: ContextVar[Optional[Dict[str, Any]]] = ContextVar("operation_context", default=None)
 
+# Envolve handlers criados aqui (ex.: pipeline assíncrono de utils.async_logging, quando instalado)
+_handler_wrapper: Optional[Callable[[logging.Handler], logging.Handler]] = None
+
+
+def set_handler_wrapper(wrapper: Optional[Callable[[logging.Handler], logging.Handler]]) -> None:
+    """Define a função aplicada aos handlers criados por ``StructuredLogger``."""
+    global _handler_wrapper
+    _handler_wrapper = wrapper
+
 
 class JSONFormatter(logging.Formatter):
     """Formatter para logs estruturados em JSON."""
@@ -34,7 +43,8 @@ class JSONFormatter(logging.Formatter):
         """Formata o log record em JSON estruturado."""
         # Campos base do log
         log_data = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            # Hora do evento (não da formatação, que pode ocorrer depois no pipeline assíncrono)
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -115,8 +125,6 @@ class JSONFormatter(logging.Formatter):
 class SensitiveDataRedactor:
     """Sistema de redação de dados sensíveis para logs estruturados."""
 
-    # Cache para compilação de padrões regex (otimização de performance)
-    _compiled_patterns_cache = None
     _redaction_enabled = True
     _max_redaction_depth = 10
     _performance_mode = False
@@ -191,6 +199,26 @@ class SensitiveDataRedactor:
         re.compile(r"[a-z0-9]{20,}", re.IGNORECASE),
     ]
 
+    # Todos os padrões de campo em uma única alternância (decisões memoizadas por chave)
+    _FIELD_MATCHERS = [(re.compile(pattern, re.IGNORECASE), placeholder) for pattern, placeholder in SENSITIVE_FIELD_PATTERNS.items()]
+    _FIELD_ALTERNATION = re.compile("|".join(f"(?:{pattern})" for pattern in SENSITIVE_FIELD_PATTERNS), re.IGNORECASE)
+    _FIELD_QUICK_CHECKS = ("password", "token", "secret", "key", "auth")
+
+    # Todos os padrões de valor em uma única alternância: uma busca em vez de uma por padrão
+    _VALUE_ALTERNATION = re.compile("|".join(f"(?:{pattern.pattern})" for pattern in SENSITIVE_VALUE_PATTERNS), re.IGNORECASE)
+
+    # Pré-varredura: condição necessária para qualquer padrão de valor casar (sequências
+    # alfanuméricas longas, prefixos de JWT/UUID, URLs e palavras-chave). Texto sem nenhum
+    # desses gatilhos é limpo e pula a redação de valores.
+    _VALUE_TRIGGERS = re.compile(
+        r"[a-z0-9]{20}|[a-z0-9+/]{40}|ey[a-z0-9]+\.[a-z0-9]|[a-f0-9]{8}-|://|-----begin|service_account"
+        r"|bearer|password|token|key|secret|auth",
+        re.IGNORECASE,
+    )
+
+    # Strings até este tamanho têm o veredito memoizado (mensagens, paths, valores de header repetem muito)
+    _VALUE_MEMO_MAX_LENGTH = 256
+
     # Headers HTTP sensíveis
     SENSITIVE_HEADERS = {
         "authorization",
@@ -268,15 +296,6 @@ class SensitiveDataRedactor:
         cls._performance_mode = performance_mode
         cls._max_redaction_depth = max_depth
 
-        # Em modo de performance, compilar padrões uma vez
-        if performance_mode and cls._compiled_patterns_cache is None:
-            cls._compiled_patterns_cache = {
-                "field_patterns": {
-                    pattern: re.compile(pattern, re.IGNORECASE) for pattern in cls.SENSITIVE_FIELD_PATTERNS.keys()
-                },
-                "value_patterns": cls.SENSITIVE_VALUE_PATTERNS.copy(),
-            }
-
     @classmethod
     def redact_data(cls, data: Any, max_depth: int = None) -> Any:
         """Redacta dados sensíveis de forma recursiva com otimizações."""
@@ -307,13 +326,15 @@ class SensitiveDataRedactor:
     def _redact_dict(cls, data: Dict[str, Any], max_depth: int) -> Dict[str, Any]:
         """Redacta um dicionário."""
         redacted = {}
+        field_decision = cls._field_decision
 
         for key, value in data.items():
             redacted_key = str(key)
 
-            # Verificar se a chave é sensível
-            if cls._is_sensitive_field(redacted_key):
-                redacted[redacted_key] = cls._get_redacted_placeholder(redacted_key, value)
+            # Verificar se a chave é sensível (uma consulta memoizada para decisão e placeholder)
+            sensitive, placeholder = field_decision(redacted_key.lower())
+            if sensitive and cls._redaction_enabled:
+                redacted[redacted_key] = placeholder or cls._fallback_placeholder(value)
             else:
                 redacted[redacted_key] = cls.redact_data(value, max_depth)
 
@@ -324,47 +345,56 @@ class SensitiveDataRedactor:
         """Redacta uma lista."""
         return [cls.redact_data(item, max_depth) for item in data]
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _field_decision(field_lower: str) -> Tuple[bool, Optional[str]]:
+        """(sensível?, placeholder do primeiro padrão que casa) para um nome de campo em minúsculas."""
+        cls = SensitiveDataRedactor
+        if not cls._FIELD_ALTERNATION.match(field_lower):
+            return any(check in field_lower for check in cls._FIELD_QUICK_CHECKS), None
+
+        for pattern_regex, placeholder in cls._FIELD_MATCHERS:
+            if pattern_regex.match(field_lower):
+                return True, placeholder
+        return True, None
+
     @classmethod
     def _is_sensitive_field(cls, field_name: str) -> bool:
-        """Verifica se um nome de campo é sensível (otimizado)."""
+        """Verifica se um nome de campo é sensível (memoizado por nome)."""
         if not cls._redaction_enabled:
             return False
-
-        field_lower = field_name.lower()
-
-        # Otimização: verificação rápida para campos comuns
-        quick_checks = ["password", "token", "secret", "key", "auth"]
-        if any(check in field_lower for check in quick_checks):
-            return True
-
-        # Usa cache compilado se disponível (modo performance)
-        if cls._performance_mode and cls._compiled_patterns_cache:
-            compiled_patterns = cls._compiled_patterns_cache["field_patterns"]
-            for pattern_regex in compiled_patterns.values():
-                if pattern_regex.match(field_lower):
-                    return True
-        else:
-            # Verificação padrão
-            for pattern in cls.SENSITIVE_FIELD_PATTERNS:
-                if re.match(pattern, field_lower):
-                    return True
-
-        return False
+        return cls._field_decision(field_name.lower())[0]
 
     @classmethod
     def _get_redacted_placeholder(cls, field_name: str, value: Any) -> str:
         """Obtém o placeholder apropriado para redação."""
-        field_lower = field_name.lower()
-
-        for pattern, placeholder in cls.SENSITIVE_FIELD_PATTERNS.items():
-            if re.match(pattern, field_lower):
-                return placeholder
+        return cls._field_decision(field_name.lower())[1] or cls._fallback_placeholder(value)
 
+    @staticmethod
+    def _fallback_placeholder(value: Any) -> str:
         # Fallback genérico com preservação parcial para debugging
         if isinstance(value, str) and len(value) > 8:
             return f"{value[:3]}***{value[-3:]}"
         return "***REDACTED***"
 
+    @classmethod
+    def _may_contain_sensitive_value(cls, text: str) -> bool:
+        """Pré-varredura barata: False garante que nenhum padrão de valor casa."""
+        return cls._VALUE_TRIGGERS.search(text) is not None
+
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def _memoized_value_check(value: str) -> bool:
+        cls = SensitiveDataRedactor
+        return cls._VALUE_TRIGGERS.search(value) is not None and cls._VALUE_ALTERNATION.search(value) is not None
+
+    @classmethod
+    def _contains_sensitive_value(cls, value: str) -> bool:
+        """Algum padrão de valor sensível casa com ``value``?"""
+        if len(value) <= cls._VALUE_MEMO_MAX_LENGTH:
+            return cls._memoized_value_check(value)
+        return cls._may_contain_sensitive_value(value) and cls._VALUE_ALTERNATION.search(value) is not None
+
     @classmethod
     def _redact_string_value(cls, value: str) -> str:
         """Redacta valores string que podem conter dados sensíveis (otimizado)."""
@@ -375,21 +405,11 @@ class SensitiveDataRedactor:
         if cls._performance_mode and len(value) > 10000:
             return value
 
-        # Cache de padrões compilados se disponível
-        patterns_to_check = (
-            cls._compiled_patterns_cache["value_patterns"]
-            if cls._performance_mode and cls._compiled_patterns_cache
-            else cls.SENSITIVE_VALUE_PATTERNS
-        )
-
-        # Verificar padrões de valores sensíveis
-        for pattern in patterns_to_check:
-            if pattern.search(value):
-                # Se encontrar padrão sensível, redactar preservando formato
-                if len(value) > 20:
-                    return f"{value[:4]}***REDACTED***{value[-4:]}"
-                else:
-                    return "***REDACTED***"
+        # Se encontrar padrão sensível, redactar preservando formato
+        if cls._contains_sensitive_value(value):
+            if len(value) > 20:
+                return f"{value[:4]}***REDACTED***{value[-4:]}"
+            return "***REDACTED***"
 
         return value
 
@@ -429,6 +449,10 @@ class SensitiveDataRedactor:
         if not isinstance(url, str):
             return url
 
+        # Sem credenciais ("@"), query ("?") nem host IPv6 ("[") não há o que redactar
+        if "@" not in url and "?" not in url and "[" not in url:
+            return url
+
         try:
             parsed = urlparse(url)
 
@@ -479,9 +503,10 @@ class SensitiveDataRedactor:
         for line in lines:
             redacted_line = line
 
-            # Redactar valores sensíveis na linha
-            for pattern in cls.SENSITIVE_VALUE_PATTERNS:
-                redacted_line = pattern.sub("***REDACTED***", redacted_line)
+            # Redactar valores sensíveis na linha (linhas sem gatilhos não têm o que substituir)
+            if cls._may_contain_sensitive_value(redacted_line):
+                for pattern in cls.SENSITIVE_VALUE_PATTERNS:
+                    redacted_line = pattern.sub("***REDACTED***", redacted_line)
 
             # Redactar URLs com credenciais
             redacted_line = cls.redact_url(redacted_line)
@@ -498,9 +523,10 @@ class SensitiveDataRedactor:
 
         redacted_message = message
 
-        # Aplicar redação de valores sensíveis
-        for pattern in cls.SENSITIVE_VALUE_PATTERNS:
-            redacted_message = pattern.sub("***REDACTED***", redacted_message)
+        # Aplicar redação de valores sensíveis (substituições em ordem, só se houver gatilhos)
+        if cls._may_contain_sensitive_value(redacted_message):
+            for pattern in cls.SENSITIVE_VALUE_PATTERNS:
+                redacted_message = pattern.sub("***REDACTED***", redacted_message)
 
         # Redactar URLs com credenciais
         redacted_message = cls.redact_url(redacted_message)
@@ -615,7 +641,7 @@ class StructuredLogger:
         if not self.logger.handlers:
             handler = logging.StreamHandler()
             handler.setFormatter(JSONFormatter())
-            self.logger.addHandler(handler)
+            self.logger.addHandler(_handler_wrapper(handler) if _handler_wrapper else handler)
             self.logger.setLevel(logging.INFO)
 
     def generate_correlation_id(self) -> str:
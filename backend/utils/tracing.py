@@ -0,0 +1,333 @@
+"""Tracer leve, em processo, para decompor o tempo de cada requisição.
+
+Spans são propagados por contextvars: funcionam no caminho síncrono do Flask
+e nas corrotinas do adapter (``asyncio.run`` e tasks copiam o contexto). O
+trace de cada requisição (chaveado pelo correlation ID) vai para um buffer
+circular limitado, é resumido no header ``Server-Timing`` e pode ser
+exportado em JSON compatível com OTLP (uma linha por trace).
+
+Sem trace ativo, ``span`` e ``traced`` não registram nada.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+SERVICE_NAME = "glpi-dashboard-backend"
+SCOPE_NAME = "glpi_dashboard.tracing"
+
+# Caracteres permitidos em nomes do Server-Timing (token do HTTP)
+_TIMING_NAME_INVALID = re.compile(r"[^A-Za-z0-9!#$%&'*+\-.^_`|~]")
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+# Logger da exportação OTLP (arquivo configurado em ``configure_export``; escrita via pipeline de logs)
+export_logger = logging.getLogger("tracing.otlp")
+export_logger.propagate = False
+
+
+class Span:
+    """Intervalo nomeado dentro de um trace."""
+
+    __slots__ = ("name", "span_id", "parent_id", "start", "end", "attributes", "status")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attributes = attributes
+        self.status = "ok"
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class Trace:
+    """Spans de uma requisição; o primeiro é a raiz."""
+
+    __slots__ = ("trace_id", "correlation_id", "spans", "dropped_spans", "max_spans", "start", "start_unix_ns")
+
+    def __init__(self, correlation_id: str, max_spans: int):
+        self.correlation_id = correlation_id
+        self.trace_id = _otlp_trace_id(correlation_id)
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self.max_spans = max_spans
+        self.start = time.perf_counter()
+        self.start_unix_ns = time.time_ns()
+
+    @property
+    def root(self) -> Optional[Span]:
+        return self.spans[0] if self.spans else None
+
+    def add(self, span: Span) -> bool:
+        if len(self.spans) >= self.max_spans:
+            self.dropped_spans += 1
+            return False
+        self.spans.append(span)
+        return True
+
+    def unix_ns(self, perf_time: float) -> int:
+        return self.start_unix_ns + int((perf_time - self.start) * 1e9)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forma legível: spans com offset e duração em ms relativos ao início."""
+        root = self.root
+        return {
+            "trace_id": self.trace_id,
+            "correlation_id": self.correlation_id,
+            "name": root.name if root else None,
+            "duration_ms": round(root.duration_ms, 3) if root else 0.0,
+            "dropped_spans": self.dropped_spans,
+            "spans": [
+                {
+                    "name": span.name,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "start_offset_ms": round((span.start - self.start) * 1000, 3),
+                    "duration_ms": round(span.duration_ms, 3),
+                    "status": span.status,
+                    "attributes": span.attributes,
+                }
+                for span in self.spans
+            ],
+        }
+
+
+def _otlp_trace_id(correlation_id: str) -> str:
+    """Trace ID OTLP (32 hex): o próprio UUID quando o correlation ID é um, senão um hash dele."""
+    compact = correlation_id.replace("-", "").lower()
+    if len(compact) == 32 and all(char in "0123456789abcdef" for char in compact):
+        return compact
+    return hashlib.md5(correlation_id.encode("utf-8")).hexdigest()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """Cria traces/spans e guarda os traces concluídos em um buffer circular."""
+
+    def __init__(self, max_traces: int = 256, max_spans_per_trace: int = 512, enabled: bool = True):
+        self.enabled = enabled
+        self.max_traces = max_traces
+        self.max_spans_per_trace = max_spans_per_trace
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.export_enabled = False
+
+    # Ciclo de vida do trace
+
+    def start_trace(self, correlation_id: str, name: str, **attributes: Any) -> Optional[Trace]:
+        """Abre o trace da requisição atual com um span raiz."""
+        if not self.enabled:
+            return None
+        trace = Trace(correlation_id, self.max_spans_per_trace)
+        root = Span(name, None, attributes)
+        trace.add(root)
+        _current_trace.set(trace)
+        _current_span.set(root)
+        return trace
+
+    def finish_trace(self, **attributes: Any) -> Optional[Trace]:
+        """Fecha o span raiz, guarda o trace no buffer e limpa o contexto."""
+        trace = _current_trace.get()
+        if trace is None:
+            return None
+        root = trace.root
+        if root is not None:
+            root.end = time.perf_counter()
+            root.attributes.update(attributes)
+
+        with self._lock:
+            self._traces[trace.correlation_id] = trace
+            self._traces.move_to_end(trace.correlation_id)
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+
+        _current_trace.set(None)
+        _current_span.set(None)
+
+        if self.export_enabled:
+            self.export(trace)
+        return trace
+
+    def discard_trace(self) -> None:
+        """Limpa o contexto sem guardar (ex.: teardown após erro antes do after_request)."""
+        _current_trace.set(None)
+        _current_span.set(None)
+
+    # Spans
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Span filho do span atual; sem trace ativo não registra nada."""
+        trace = _current_trace.get()
+        if trace is None:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(name, parent.span_id if parent else None, attributes)
+        if not trace.add(span):
+            yield None
+            return
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error.type"] = type(e).__name__
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _current_span.reset(token)
+
+    def traced(self, name: Optional[str] = None) -> Callable:
+        """Decorator que envolve funções síncronas ou corrotinas em um span."""
+
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            if asyncio.iscoroutinefunction(func):
+
+                @wraps(func)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    with self.span(span_name):
+                        return await func(*args, **kwargs)
+
+                return async_wrapper
+
+            @wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    @staticmethod
+    def current_trace() -> Optional[Trace]:
+        return _current_trace.get()
+
+    # Consulta e exportação
+
+    def get_trace(self, correlation_id: str) -> Optional[Trace]:
+        return self._traces.get(correlation_id)
+
+    def recent_trace_ids(self, limit: int = 50) -> List[str]:
+        with self._lock:
+            return list(self._traces.keys())[-limit:][::-1]
+
+    @staticmethod
+    def server_timing(trace: Trace, max_entries: int = 12) -> str:
+        """Valor do header Server-Timing: duração total por nome de span (ms), mais lentos primeiro."""
+        totals: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        for span in trace.spans[1:]:
+            name = _TIMING_NAME_INVALID.sub("_", span.name)
+            totals[name] = totals.get(name, 0.0) + span.duration_ms
+            counts[name] = counts.get(name, 0) + 1
+
+        entries = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:max_entries]
+        parts = [
+            f'{name};dur={duration:.2f}' + (f';desc="{counts[name]}x"' if counts[name] > 1 else "")
+            for name, duration in entries
+        ]
+        root = trace.root
+        if root is not None:
+            parts.append(f"total;dur={root.duration_ms:.2f}")
+        return ", ".join(parts)
+
+    @staticmethod
+    def to_otlp(traces: List[Trace]) -> Dict[str, Any]:
+        """Traces no formato JSON do OTLP (ExportTraceServiceRequest)."""
+        spans = []
+        for trace in traces:
+            for span in trace.spans:
+                end = span.end if span.end is not None else time.perf_counter()
+                otlp_span = {
+                    "traceId": trace.trace_id,
+                    "spanId": span.span_id,
+                    "name": span.name,
+                    "kind": 2 if span.parent_id is None else 1,  # SERVER para a raiz, INTERNAL nos demais
+                    "startTimeUnixNano": str(trace.unix_ns(span.start)),
+                    "endTimeUnixNano": str(trace.unix_ns(end)),
+                    "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+                    "status": {"code": 2 if span.status == "error" else 1},
+                }
+                if span.parent_id:
+                    otlp_span["parentSpanId"] = span.parent_id
+                spans.append(otlp_span)
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                    "scopeSpans": [{"scope": {"name": SCOPE_NAME}, "spans": spans}],
+                }
+            ]
+        }
+
+    def configure_export(self, path: str, max_bytes: int = 10485760, backup_count: int = 3) -> None:
+        """Exporta cada trace concluído como uma linha JSON OTLP em ``path`` (arquivo rotativo)."""
+        from logging.handlers import RotatingFileHandler
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        export_logger.handlers = [handler]
+        export_logger.setLevel(logging.INFO)
+        self.export_enabled = True
+
+    def export(self, trace: Trace) -> None:
+        export_logger.info(json.dumps(self.to_otlp([trace]), separators=(",", ":"), default=str))
+
+
+# Instância global
+tracer = Tracer()
+
+
+def configure_tracing(
+    enabled: bool = True,
+    max_traces: int = 256,
+    max_spans_per_trace: int = 512,
+    export_path: Optional[str] = None,
+) -> Tracer:
+    """Ajusta a instância global a partir da configuração da aplicação."""
+    tracer.enabled = enabled
+    tracer.max_traces = max_traces
+    tracer.max_spans_per_trace = max_spans_per_trace
+    if enabled and export_path:
+        tracer.configure_export(export_path)
+    return tracer